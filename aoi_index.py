@@ -0,0 +1,109 @@
+import numpy as np
+
+OUTSIDE_AOI_TYPE = "Outside"
+GAP_AOI_TYPE = "Gap"  # Marks where tracking stopped; see metrics_engine.py
+
+# Integer codes for AOI categories, ordered like the timeline's y-axis (gap markers last)
+AOI_CODE_TYPES = ("Outside", "Distraction", "Productive", GAP_AOI_TYPE)
+AOI_TYPE_CODES = {aoi_type: code for code, aoi_type in enumerate(AOI_CODE_TYPES)}
+
+
+def _sorted_aoi_rects(aoi_list):
+    # Smallest area first; sorted() is stable so equal areas keep definition order,
+    # matching the sort the per-sample hit test used to do.
+    return sorted(
+        (tuple(aoi['rect_screen_coords']) + (aoi['type'],) for aoi in aoi_list),
+        key=lambda rect: (rect[2] - rect[0]) * (rect[3] - rect[1])
+    )
+
+
+def classify_gaze_batch(raw_x, raw_y, aoi_list, _sorted_rects=None):
+    """Returns a uint8 array of AOI_TYPE_CODES for whole arrays of gaze coordinates.
+
+    Overlaps resolve to the smallest AOI, like AOIIndex.lookup.
+    """
+    raw_x = np.asarray(raw_x, dtype=np.float64)
+    raw_y = np.asarray(raw_y, dtype=np.float64)
+    codes = np.full(raw_x.shape, AOI_TYPE_CODES[OUTSIDE_AOI_TYPE], dtype=np.uint8)
+    rects = _sorted_rects if _sorted_rects is not None else _sorted_aoi_rects(aoi_list)
+    # Paint largest to smallest so the smallest containing AOI is written last
+    for x1, y1, x2, y2, aoi_type in reversed(rects):
+        inside = (raw_x >= x1) & (raw_x <= x2) & (raw_y >= y1) & (raw_y <= y2)
+        codes[inside] = AOI_TYPE_CODES.get(aoi_type, AOI_TYPE_CODES[OUTSIDE_AOI_TYPE])
+    return codes
+
+
+def reclassify_raw_log(raw_log, aoi_list):
+    """Returns a copy of a saved raw_log with aoi_status recomputed for a new AOI layout."""
+    if not raw_log:
+        return []
+    codes = classify_gaze_batch([entry['raw_x'] for entry in raw_log], [entry['raw_y'] for entry in raw_log], aoi_list)
+    return [dict(entry, aoi_status=AOI_CODE_TYPES[code]) for entry, code in zip(raw_log, codes.tolist())]
+
+
+class AOIIndex:
+    # Uniform grid over the bounding box of all AOIs (screen coordinates).
+    # Each cell stores either the resolved AOI type, when the smallest candidate covers
+    # the whole cell, or the candidates overlapping it sorted by area, so a lookup
+    # touches one cell and usually returns without scanning anything.
+    def __init__(self, aoi_list, grid_size=64):
+        self.aoi_list = list(aoi_list)
+        self.default_type = OUTSIDE_AOI_TYPE
+        self._cells = []
+        self._rects = []
+        self._columns = self._rows = 0
+        if not self.aoi_list:
+            self.min_x = self.min_y = 0.0
+            self.max_x = self.max_y = -1.0  # Empty bounds: every lookup is outside
+            return
+
+        self._rects = rects = _sorted_aoi_rects(self.aoi_list)
+        self.min_x = min(rect[0] for rect in rects); self.max_x = max(rect[2] for rect in rects)
+        self.min_y = min(rect[1] for rect in rects); self.max_y = max(rect[3] for rect in rects)
+
+        self._columns = max(1, min(grid_size, int(self.max_x - self.min_x) or 1))
+        self._rows = max(1, min(grid_size, int(self.max_y - self.min_y) or 1))
+        cell_w = (self.max_x - self.min_x) / self._columns or 1.0
+        cell_h = (self.max_y - self.min_y) / self._rows or 1.0
+        self._inv_cell_w = 1.0 / cell_w
+        self._inv_cell_h = 1.0 / cell_h
+        eps_x, eps_y = cell_w * 1e-6, cell_h * 1e-6  # Absorb float rounding at cell edges
+
+        for row in range(self._rows):
+            cy1 = self.min_y + row * cell_h - eps_y
+            cy2 = self.min_y + (row + 1) * cell_h + eps_y
+            for col in range(self._columns):
+                cx1 = self.min_x + col * cell_w - eps_x
+                cx2 = self.min_x + (col + 1) * cell_w + eps_x
+                candidates = tuple(rect for rect in rects if rect[0] <= cx2 and rect[2] >= cx1 and rect[1] <= cy2 and rect[3] >= cy1)
+                if not candidates:
+                    self._cells.append(self.default_type)
+                else:
+                    x1, y1, x2, y2, aoi_type = candidates[0]
+                    if x1 <= cx1 and y1 <= cy1 and x2 >= cx2 and y2 >= cy2:
+                        self._cells.append(aoi_type)  # Smallest candidate covers the whole cell
+                    else:
+                        self._cells.append(candidates)
+
+    def __len__(self):
+        return len(self.aoi_list)
+
+    def lookup(self, x, y):
+        """Returns the type of the smallest AOI containing (x, y), or "Outside"."""
+        if not (self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y):
+            return self.default_type
+        col = int((x - self.min_x) * self._inv_cell_w)
+        row = int((y - self.min_y) * self._inv_cell_h)
+        if col >= self._columns: col = self._columns - 1
+        if row >= self._rows: row = self._rows - 1
+        cell = self._cells[row * self._columns + col]
+        if cell.__class__ is str:
+            return cell
+        for x1, y1, x2, y2, aoi_type in cell:
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                return aoi_type
+        return self.default_type
+
+    def classify_batch(self, raw_x, raw_y):
+        """Vectorized lookup for arrays of samples; returns AOI_TYPE_CODES as uint8."""
+        return classify_gaze_batch(raw_x, raw_y, self.aoi_list, _sorted_rects=self._rects)
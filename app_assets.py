@@ -0,0 +1,76 @@
+"""Startup-sensitive resources for the Tk app: lazily imported chart modules and a cached logo."""
+import os
+import threading
+import tkinter as tk
+
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
+ASSET_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".focusflow", "cache")
+
+_chart_modules = None
+_logo_images = {}
+
+
+class ChartModules:
+    # The few names the report window needs from matplotlib and report_charts
+    def __init__(self):
+        from matplotlib import rcParams
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from report_charts import draw_attention_timeline, draw_dwell_pie, draw_timeline_small_multiples, draw_trend_chart
+        self.rcParams = rcParams
+        self.Figure = Figure
+        self.FigureCanvasTkAgg = FigureCanvasTkAgg
+        self.draw_attention_timeline = draw_attention_timeline
+        self.draw_dwell_pie = draw_dwell_pie
+        self.draw_trend_chart = draw_trend_chart
+        self.draw_timeline_small_multiples = draw_timeline_small_multiples
+
+
+def load_chart_modules():
+    """Imports the chart stack on first use (or returns the already imported one); call on the Tk thread."""
+    global _chart_modules
+    if _chart_modules is None:
+        _chart_modules = ChartModules()
+    return _chart_modules
+
+
+def _import_matplotlib_core():
+    # Nothing here touches Tk; the Tk backend is imported by load_chart_modules on the main thread
+    import matplotlib
+    import matplotlib.figure
+
+
+def prewarm_chart_modules():
+    """Imports matplotlib and its Figure on a daemon thread, so the first report pays less import cost."""
+    if _chart_modules is not None:
+        return None
+    thread = threading.Thread(target=_import_matplotlib_core, name="ChartPrewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def _logo_cache_path(max_size):
+    return os.path.join(ASSET_CACHE_DIR, f"logo_{max_size[0]}x{max_size[1]}.png")
+
+
+def load_logo_image(max_size=(200, 100), logo_path=LOGO_PATH):
+    """Returns the logo scaled to fit max_size as a Tk image; raises FileNotFoundError if there is no logo."""
+    if max_size in _logo_images:
+        return _logo_images[max_size]
+    cache_path = _logo_cache_path(max_size)
+    logo_mtime = os.path.getmtime(logo_path)
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= logo_mtime:
+        # Tk 8.6 reads PNG natively, so a cached thumbnail needs no PIL import
+        image = tk.PhotoImage(file=cache_path)
+    else:
+        from PIL import Image, ImageTk
+        img = Image.open(logo_path)
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        try:
+            os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+            img.save(cache_path, format="PNG")
+        except OSError as e:
+            print(f"Could not cache logo thumbnail: {e}")
+        image = ImageTk.PhotoImage(img)
+    _logo_images[max_size] = image
+    return image
@@ -0,0 +1,77 @@
+"""N-way comparison: loading summaries of many sessions vs loading the full reports.
+
+Writes N synthetic .ffs sessions, then loads them for comparison serially and with worker
+processes, and reports how much data each approach keeps in the parent process.
+
+Run from the repository root:  python -m benchmarks.bench_comparison --sessions 16 --hours 1
+"""
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from metrics_engine import compute_session_log_metrics
+from session_comparison import load_comparison_summaries
+from session_file import write_session_file
+from session_library import load_report_file
+from session_log import SessionLog, report_to_json_dict
+
+
+def write_sessions(directory, count, samples, as_json=False, seed=0):
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        codes = rng.integers(0, 3, samples // 30).repeat(30)
+        log = SessionLog.from_columns(np.arange(len(codes)) / 60.0, rng.uniform(0, 1920, len(codes)),
+                                      rng.uniform(0, 1080, len(codes)), codes)
+        report = compute_session_log_metrics(log)
+        report["raw_log"] = log
+        paths.append(os.path.join(directory, f"session_{i:03d}.{'json' if as_json else 'ffs'}"))
+        if as_json:
+            with open(paths[-1], 'w') as f:
+                json.dump(report_to_json_dict(report), f)
+        else:
+            write_session_file(paths[-1], report)
+    return paths
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--hours", type=float, default=1.0, help="Length of each session at 60 Hz")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Compare JSON reports instead of .ffs files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        samples = int(args.hours * 3600 * 60)
+        paths = write_sessions(tmp, args.sessions, samples, args.json)
+
+        full_reports, full_time = timed(lambda: [load_report_file(path) for path in paths])
+        full_bytes = sum(report["raw_log"].nbytes for report in full_reports)
+        del full_reports
+        serial, serial_time = timed(load_comparison_summaries, paths, 1)
+        parallel, parallel_time = timed(load_comparison_summaries, paths, args.workers)
+        assert all("error" not in summary for summary in parallel)
+        assert [summary["focus_bouts"] for summary in serial] == [summary["focus_bouts"] for summary in parallel]
+        summary_bytes = len(pickle.dumps(parallel))
+
+        print(f"{args.sessions} {'JSON' if args.json else '.ffs'} sessions x {samples:,} samples")
+        print(f"full reports          {full_time * 1000:8.1f} ms, {full_bytes / 2**20:8.2f} MiB of samples in the parent")
+        print(f"summaries, serial     {serial_time * 1000:8.1f} ms")
+        print(f"summaries, parallel   {parallel_time * 1000:8.1f} ms, {summary_bytes / 2**10:8.1f} KiB in the parent "
+              f"({summary_bytes / args.sessions / 2**10:.1f} KiB/session)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Records/sec for the gaze XML decoders (ElementTree vs fast byte-level path).
+
+Run from the repository root:  python -m benchmarks.bench_decoder [--corpus captured.xmllines]
+"""
+import argparse
+import time
+
+from benchmarks.gaze_corpus import load_corpus
+from gaze_decoder import ALL_EXTRA_FIELDS, TIMESTAMP_FIELDS, make_gaze_decoder
+
+
+def time_decoder(decoder, corpus, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for record in corpus:
+            decoder.decode(record)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="File with one captured XML record per line (default: synthetic records)")
+    parser.add_argument("--records", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.records)
+    print(f"{len(corpus)} records")
+
+    # Both decoders must agree before their speed means anything
+    mismatches = 0
+    for extra_fields in (ALL_EXTRA_FIELDS, TIMESTAMP_FIELDS):
+        reference, fast = make_gaze_decoder("etree", extra_fields), make_gaze_decoder("fast", extra_fields)
+        mismatches += sum(1 for record in corpus if reference.decode(record) != fast.decode(record))
+    print(f"decoder mismatches: {mismatches}")
+
+    for extra_fields, label in (((), "gaze only"), (TIMESTAMP_FIELDS, "with timestamp"),
+                                (ALL_EXTRA_FIELDS, "with all extras")):
+        rates = {name: time_decoder(make_gaze_decoder(name, extra_fields), corpus, args.repeat) for name in ("etree", "fast")}
+        print(f"[{label}]")
+        for name, rate in rates.items():
+            print(f"  {name:6s} {rate:>12,.0f} records/s")
+        print(f"  speedup: {rates['fast'] / rates['etree']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
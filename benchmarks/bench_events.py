@@ -0,0 +1,100 @@
+"""Fixation / AOI-dwell event log vs. raw samples: size, build cost and metric parity.
+
+Uses the 60 Hz webcam simulation from bench_filters (One Euro + I-VT, AOI held through
+saccades), builds the event log online and offline, and compares the stored size and
+the metrics / timeline cost of the events with those of the raw samples. The metrics
+must match to floating-point rounding.
+
+Run from the repository root:  python -m benchmarks.bench_events --hours 2
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from aoi_index import AOI_TYPE_CODES, AOIIndex
+from benchmarks.bench_filters import AOI_LIST, synthetic_gaze
+from event_log import EventLog, EventLogBuilder
+from gaze_filters import hold_fixation_codes, make_gaze_filter
+from metrics_engine import compute_session_log_metrics
+from report_charts import session_log_runs
+from session_file import write_session_file
+from session_log import SessionLog
+
+
+def assert_close(a, b, path="metrics"):
+    if isinstance(a, dict):
+        for key in a:
+            assert_close(a[key], b[key], f"{path}.{key}")
+    elif isinstance(a, list):
+        assert len(a) == len(b), (path, len(a), len(b))
+        for x, y in zip(a, b):
+            assert_close(x, y, path)
+    else:
+        assert math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9), (path, a, b)
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def file_size(report):
+    fd, path = tempfile.mkstemp(suffix=".ffs")
+    os.close(fd)
+    try:
+        write_session_file(path, report)
+        return os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=2.0)
+    args = parser.parse_args()
+
+    timestamps, noisy_x, noisy_y, _, _ = synthetic_gaze(args.hours * 3600)
+    gaze_filter = make_gaze_filter("one_euro", "ivt")
+    filtered = [gaze_filter.process(t, x, y) for t, x, y in zip(timestamps.tolist(), noisy_x.tolist(), noisy_y.tolist())]
+    xs, ys, fixations = (np.array(column) for column in zip(*filtered))
+    codes = hold_fixation_codes(AOIIndex(AOI_LIST).classify_batch(xs, ys), fixations, AOI_TYPE_CODES["Outside"])
+    session_log = SessionLog.from_columns(timestamps, xs, ys, codes)
+    print(f"{len(session_log):,} samples ({args.hours:g} h at 60 Hz)")
+
+    builder = EventLogBuilder()
+    start = time.perf_counter()
+    builder.extend(timestamps.tolist(), xs.tolist(), ys.tolist(), codes.tolist(), fixations.tolist())
+    online_s = time.perf_counter() - start
+    events = builder.finish()
+    offline_s, offline = timed(lambda: EventLog.from_samples(timestamps, xs, ys, codes, fixations))
+    assert len(offline) == len(events)
+    dwell_events = EventLog.from_samples(timestamps, xs, ys, codes)
+    print(f"events: {len(events):,} fixation/saccade events, {len(dwell_events):,} AOI dwells; "
+          f"online {online_s / len(session_log) * 1e6:.2f} us/sample, offline {offline_s * 1e3:.1f} ms")
+
+    raw_metrics_s, reference = timed(lambda: compute_session_log_metrics(session_log))
+    raw_runs_s, raw_runs = timed(lambda: session_log_runs(session_log, 2000))
+    raw_size = file_size({"raw_log": session_log, **reference})
+    print(f"{'raw samples':>16}: {session_log.nbytes / 1e6:8.2f} MB in memory, {raw_size / 1e6:8.2f} MB .ffs, "
+          f"metrics {raw_metrics_s * 1e3:7.1f} ms, timeline {raw_runs_s * 1e3:6.1f} ms")
+    for name, log in (("fixation events", events), ("AOI dwells", dwell_events)):
+        metrics_s, metrics = timed(lambda: compute_session_log_metrics(log.to_session_log()))
+        runs_s, runs = timed(lambda: session_log_runs(log.to_session_log(), 2000))
+        assert_close(reference, metrics)
+        assert all(np.allclose(a, b) for a, b in zip(raw_runs, runs)), "timeline runs differ"
+        size = file_size({"raw_log": log.to_session_log(), "event_log": log, "raw_samples_kept": False, **reference})
+        print(f"{name:>16}: {log.nbytes / 1e6:8.2f} MB in memory, {size / 1e6:8.2f} MB .ffs "
+              f"({raw_size / size:5.0f}x smaller), metrics {metrics_s * 1e3:7.1f} ms, timeline {runs_s * 1e3:6.1f} ms")
+    print("metrics and timeline identical to the raw samples")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Gaze filter stage: per-sample cost and AOI flicker at region borders.
+
+Simulates a 60 Hz webcam tracker: fixations (Gaussian jitter around a target, several of
+them right on the border between a Productive and a Distraction AOI) joined by short
+saccades. Reports the cost of each filter pipeline per sample and how many AOI
+transitions the classified stream has, compared with the noise-free gaze path.
+
+Run from the repository root:  python -m benchmarks.bench_filters --seconds 600
+"""
+import argparse
+import time
+
+import numpy as np
+
+from aoi_index import AOI_TYPE_CODES, AOIIndex
+from gaze_filters import FIXATION_DETECTORS, GAZE_SMOOTHERS, hold_fixation_codes, make_gaze_filter
+from metrics_engine import compute_session_metrics
+
+SCREEN_W, SCREEN_H = 1920, 1080
+AOI_LIST = [{'rect_screen_coords': (0, 0, 960, SCREEN_H), 'type': "Productive"},
+            {'rect_screen_coords': (960, 0, SCREEN_W, SCREEN_H), 'type': "Distraction"}]
+
+
+def synthetic_gaze(seconds, rate_hz=60.0, jitter_px=25.0, seed=0):
+    """Returns (timestamps, noisy x, noisy y, true x, true y)."""
+    rng = np.random.default_rng(seed)
+    count = int(seconds * rate_hz)
+    true_x, true_y = np.empty(count), np.empty(count)
+    i, x, y = 0, SCREEN_W / 4, SCREEN_H / 2
+    while i < count:
+        # Half of the fixations sit within 40 px of the AOI border
+        target_x = 960 + rng.uniform(-40, 40) if rng.random() < 0.5 else rng.uniform(0, SCREEN_W)
+        target_y = rng.uniform(100, SCREEN_H - 100)
+        saccade = min(count - i, 3)
+        true_x[i:i + saccade] = np.linspace(x, target_x, saccade + 1)[1:]
+        true_y[i:i + saccade] = np.linspace(y, target_y, saccade + 1)[1:]
+        i += saccade
+        fixation = min(count - i, int(rng.uniform(0.2, 1.5) * rate_hz))
+        true_x[i:i + fixation], true_y[i:i + fixation] = target_x, target_y
+        i += fixation
+        x, y = target_x, target_y
+    timestamps = np.arange(count) / rate_hz
+    noisy_x = true_x + rng.normal(0, jitter_px, count)
+    noisy_y = true_y + rng.normal(0, jitter_px, count)
+    return timestamps, noisy_x, noisy_y, true_x, true_y
+
+
+def transitions(timestamps, codes):
+    metrics = compute_session_metrics(timestamps, codes)
+    return metrics["transitions"]["P_to_D"] + metrics["transitions"]["D_to_P"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=600.0)
+    args = parser.parse_args()
+
+    timestamps, noisy_x, noisy_y, true_x, true_y = synthetic_gaze(args.seconds)
+    index = AOIIndex(AOI_LIST)
+    true_codes = index.classify_batch(true_x, true_y)
+    samples = list(zip(timestamps.tolist(), noisy_x.tolist(), noisy_y.tolist()))
+    raw_codes = index.classify_batch(noisy_x, noisy_y)
+    print(f"{len(samples):,} samples; noise-free path: {transitions(timestamps, true_codes)} transitions; "
+          f"raw: {transitions(timestamps, raw_codes)} transitions, {np.mean(raw_codes == true_codes) * 100:.1f}% correct AOI")
+
+    for smoothing in GAZE_SMOOTHERS:
+        for detector in FIXATION_DETECTORS:
+            gaze_filter = make_gaze_filter(smoothing, detector)
+            if gaze_filter is None:
+                continue
+            process = gaze_filter.process
+            start = time.perf_counter()
+            filtered = [process(t, x, y) for t, x, y in samples]
+            elapsed = time.perf_counter() - start
+            xs, ys, fixations = (np.array(column) for column in zip(*filtered))
+            codes = index.classify_batch(xs, ys)
+            held = hold_fixation_codes(codes, fixations, AOI_TYPE_CODES["Outside"])
+            print(f"{smoothing:>8} + {detector:<4} {elapsed / len(samples) * 1e6:6.2f} us/sample, "
+                  f"fixation {fixations.mean() * 100:5.1f}%, transitions {transitions(timestamps, codes):5d} "
+                  f"({np.mean(codes == true_codes) * 100:.1f}% correct), holding AOI through saccades "
+                  f"{transitions(timestamps, held):5d} ({np.mean(held == true_codes) * 100:.1f}% correct)")
+
+
+if __name__ == "__main__":
+    main()
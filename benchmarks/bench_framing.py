@@ -0,0 +1,71 @@
+"""Frames/sec for the GazeFlow length-prefixed framing, legacy reader vs buffered reader.
+
+Run from the repository root:  python -m benchmarks.bench_framing
+"""
+import argparse
+import socket
+import threading
+import time
+
+from benchmarks.gaze_corpus import make_gaze_record
+from gaze_client import LengthPrefixedFrameReader, get_7bit_encoded_int_bytes, read_length_prefixed_string
+
+
+def encode_frames(frame_count):
+    payload = bytearray()
+    for i in range(frame_count):
+        data = make_gaze_record(i).encode('utf-8')
+        payload += get_7bit_encoded_int_bytes(len(data))
+        payload += data
+    return bytes(payload)
+
+
+def _feed(sock, payload):
+    sock.sendall(payload)
+    sock.shutdown(socket.SHUT_WR)
+
+
+def run_legacy(payload, frame_count):
+    reader_sock, writer_sock = socket.socketpair()
+    feeder = threading.Thread(target=_feed, args=(writer_sock, payload))
+    start = time.perf_counter()
+    feeder.start()
+    for _ in range(frame_count):
+        read_length_prefixed_string(reader_sock)
+    elapsed = time.perf_counter() - start
+    feeder.join(); reader_sock.close(); writer_sock.close()
+    return elapsed
+
+
+def run_buffered(payload, frame_count):
+    reader_sock, writer_sock = socket.socketpair()
+    feeder = threading.Thread(target=_feed, args=(writer_sock, payload))
+    frame_reader = LengthPrefixedFrameReader(reader_sock)
+    start = time.perf_counter()
+    feeder.start()
+    received = 0
+    while received < frame_count:
+        received += len(frame_reader.read_frames())
+    elapsed = time.perf_counter() - start
+    feeder.join(); reader_sock.close(); writer_sock.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = encode_frames(args.frames)
+    print(f"{args.frames} frames, {len(payload) / args.frames:.1f} bytes/frame")
+    results = {}
+    for name, runner in (("legacy recv(1) reader", run_legacy), ("buffered recv_into reader", run_buffered)):
+        best = min(runner(payload, args.frames) for _ in range(args.repeat))
+        results[name] = args.frames / best
+        print(f"{name:28s} {results[name]:>12,.0f} frames/s")
+    print(f"speedup: {results['buffered recv_into reader'] / results['legacy recv(1) reader']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Focus indicator: per-sample cost and overlay redraws, FocusIndicator vs. the old list rebuild.
+
+The old indicator logic rebuilt its list of recent AOI changes with a comprehension on
+every sample and the overlay canvas was reconfigured on every tick. This replays a
+synthetic 60 Hz AOI stream (steady dwells mixed with flickering stretches) through both,
+checks they produce the same colors, and counts how many canvas updates each would issue
+at a 30 ms UI tick.
+
+Run from the repository root:  python -m benchmarks.bench_indicator --minutes 60
+"""
+import argparse
+import time
+
+import numpy as np
+
+from focus_indicator import FocusIndicator
+
+STATUSES = ("Productive", "Distraction", "Outside")
+
+
+class ListRebuildIndicator:
+    # The previous main_app logic, kept here as the baseline
+    def __init__(self):
+        self.last_status, self.time_in_status, self.last_change, self.transition_times = "Outside", 0.0, 0.0, []
+
+    def update(self, status, now):
+        if status != self.last_status:
+            self.last_change, self.time_in_status, self.last_status = now, 0.0, status
+            self.transition_times.append(now)
+        else:
+            self.time_in_status = now - self.last_change
+        color = "gray"
+        if status == "Productive":
+            color = "green" if self.time_in_status > 5.0 else "#90EE90"
+        elif status == "Distraction":
+            color = "red" if self.time_in_status > 3.0 else "orange"
+        self.transition_times = [t for t in self.transition_times if now - t < 10.0]
+        if len(self.transition_times) >= 4:
+            color = "yellow"
+        elif status == "Outside":
+            color = "#A9A9A9" if self.time_in_status > 5.0 else "#D3D3D3"
+        return color
+
+
+def synthetic_statuses(minutes, rate_hz=60.0, seed=0):
+    """Alternates steady dwells (2-60 s) with flickering stretches (status changes every few samples)."""
+    rng = np.random.default_rng(seed)
+    count = int(minutes * 60 * rate_hz)
+    statuses = []
+    while len(statuses) < count:
+        if rng.random() < 0.3:
+            for _ in range(int(rng.uniform(2, 20) * rate_hz / 4)):
+                statuses.extend([STATUSES[rng.integers(3)]] * int(rng.integers(1, 8)))
+        else:
+            statuses.extend([STATUSES[rng.integers(3)]] * int(rng.uniform(2, 60) * rate_hz))
+    return statuses[:count], np.arange(count) / rate_hz
+
+
+def replay(update, statuses, timestamps, tick_samples):
+    """Returns (colors per sample, canvas updates per tick if redrawing every tick, only on change)."""
+    colors, changes, shown = [], 0, None
+    for start in range(0, len(statuses), tick_samples):
+        color = None
+        for status, now in zip(statuses[start:start + tick_samples], timestamps[start:start + tick_samples]):
+            color = update(status, now)
+            colors.append(color)
+        if color != shown:
+            changes, shown = changes + 1, color
+    return colors, -(-len(statuses) // tick_samples), changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=float, default=60.0)
+    args = parser.parse_args()
+
+    statuses, timestamps = synthetic_statuses(args.minutes)
+    timestamps = timestamps.tolist()
+    print(f"{len(statuses):,} samples ({args.minutes:g} min at 60 Hz)")
+    results = {}
+    for name, indicator in (("list rebuild", ListRebuildIndicator()), ("FocusIndicator", FocusIndicator())):
+        start = time.perf_counter()
+        colors, ticks, changes = replay(indicator.update, statuses, timestamps, tick_samples=2)
+        elapsed = time.perf_counter() - start
+        results[name] = colors
+        print(f"{name:>15}: {elapsed / len(statuses) * 1e6:6.2f} us/sample; canvas updates: {ticks:,} every tick, "
+              f"{changes:,} on color change")
+    assert results["list rebuild"] == results["FocusIndicator"], "indicator colors differ"
+    print("colors identical")
+
+
+if __name__ == "__main__":
+    main()
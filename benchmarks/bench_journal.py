@@ -0,0 +1,76 @@
+"""Write overhead of the session journal per sample, as seen by the UI thread.
+
+Feeds batches the size of one 30 ms UI tick (60 Hz tracker -> 2 samples) through
+SessionJournal for each fsync policy, and compares with writing and syncing every
+batch synchronously on the calling thread.
+
+Run from the repository root:  python -m benchmarks.bench_journal --samples 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from session_file import SessionFileReader, SessionFileWriter
+from session_journal import FSYNC_POLICIES, SessionJournal
+
+
+def synthetic_batches(sample_count, batch_size, seed=0):
+    rng = np.random.default_rng(seed)
+    batches = []
+    for start in range(0, sample_count, batch_size):
+        count = min(batch_size, sample_count - start)
+        batches.append(((np.arange(start, start + count) / 60.0).tolist(), rng.uniform(0, 1920, count).tolist(),
+                        rng.uniform(0, 1080, count).tolist(), rng.integers(0, 3, count).tolist()))
+    return batches
+
+
+def run_journal(path, batches, fsync_policy, flush_interval_s):
+    journal = SessionJournal(path, flush_interval_s=flush_interval_s, fsync_policy=fsync_policy)
+    start = time.perf_counter()
+    for batch in batches:
+        journal.append_samples(*batch)
+    caller_time = time.perf_counter() - start
+    journal.close({})
+    return caller_time, time.perf_counter() - start, journal.flush_count
+
+
+def run_synchronous(path, batches, fsync):
+    writer = SessionFileWriter(path)
+    start = time.perf_counter()
+    for batch in batches:
+        writer.append_samples(*batch)
+        writer.flush(fsync=fsync)
+    caller_time = time.perf_counter() - start
+    writer.close({})
+    return caller_time, time.perf_counter() - start, len(batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=2, help="Samples per UI tick")
+    parser.add_argument("--flush-interval", type=float, default=0.05, help="Journal flush interval in seconds")
+    parser.add_argument("--sync-batches", type=int, default=2000, help="Batches used for the synchronous fsync baseline")
+    args = parser.parse_args()
+
+    batches = synthetic_batches(args.samples, args.batch)
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [(f"journal fsync={policy}", lambda path, p=policy: run_journal(path, batches, p, args.flush_interval), len(batches))
+                for policy in FSYNC_POLICIES]
+        runs.append(("synchronous flush", lambda path: run_synchronous(path, batches, False), len(batches)))
+        runs.append(("synchronous flush+fsync", lambda path: run_synchronous(path, batches[:args.sync_batches], True),
+                     min(len(batches), args.sync_batches)))
+        for label, run, batch_count in runs:
+            path = os.path.join(tmp, f"{label.replace(' ', '_').replace('=', '_')}.ffs")
+            caller_time, total_time, flushes = run(path)
+            samples = sum(len(batch[0]) for batch in batches[:batch_count])
+            assert SessionFileReader(path).sample_count == samples
+            print(f"{label:<26} caller {caller_time / samples * 1e6:7.2f} us/sample, "
+                  f"total {total_time / samples * 1e6:7.2f} us/sample, {flushes} flushes")
+
+
+if __name__ == "__main__":
+    main()
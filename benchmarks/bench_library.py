@@ -0,0 +1,80 @@
+"""Session library: indexing, incremental re-indexing and filtered queries over many sessions.
+
+Compares "all sessions in the last week with productive % > 60" answered from the SQLite
+catalog with opening every saved JSON report.
+
+Run from the repository root:  python -m benchmarks.bench_library --sessions 2000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from metrics_engine import compute_session_log_metrics
+from session_library import SessionLibrary, days_ago
+from session_log import SessionLog, report_to_json_dict
+
+
+def write_sessions(directory, count, samples, seed=0):
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    for i in range(count):
+        # Sticky AOI states so sessions have realistic runs and different productive shares
+        productive_share = rng.uniform(0.2, 0.9)
+        codes = np.where(rng.random(samples // 30) < productive_share, 2, rng.integers(0, 2, samples // 30)).repeat(30)
+        log = SessionLog.from_columns(np.arange(len(codes)) / 60.0, rng.uniform(0, 1920, len(codes)),
+                                      rng.uniform(0, 1080, len(codes)), codes)
+        report = compute_session_log_metrics(log)
+        report.update(raw_log=log, session_start_time=now - rng.uniform(0, 30) * 86400, report_generated_timestamp=now)
+        with open(os.path.join(directory, f"session_{i:05d}.json"), 'w') as f:
+            json.dump(report_to_json_dict(report), f)
+
+
+def scan_files(directory, since, min_productive):
+    matches = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'r') as f:
+            report = json.load(f)
+        if report["session_start_time"] >= since and report["dwell_percentages"]["Productive"] >= min_productive:
+            matches.append(name)
+    return matches
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--samples", type=int, default=600, help="Samples per session")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        session_dir = os.path.join(tmp, "sessions")
+        os.makedirs(session_dir)
+        write_sessions(session_dir, args.sessions, args.samples)
+        since = days_ago(7)
+
+        scanned, scan_time = timed(scan_files, session_dir, since, 60.0)
+        with SessionLibrary(os.path.join(tmp, "library.sqlite3")) as library:
+            (indexed, _), index_time = timed(library.index_directory, session_dir)
+            (reindexed, _), reindex_time = timed(library.index_directory, session_dir)
+            total, count_time = timed(library.count, since=since, min_productive=60.0)
+            page, query_time = timed(library.query, since=since, min_productive=60.0, limit=50, offset=50)
+            assert total == len(scanned)
+
+        print(f"{args.sessions} sessions, {total} match (last 7 days, productive >= 60%)")
+        print(f"open every file      {scan_time * 1000:9.1f} ms")
+        print(f"initial index        {index_time * 1000:9.1f} ms  ({indexed} files read)")
+        print(f"incremental re-index {reindex_time * 1000:9.1f} ms  ({reindexed} files read)")
+        print(f"count + page 2       {(count_time + query_time) * 1000:9.2f} ms  ({len(page)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Timing of the vectorized session metrics engine against the original per-sample loops.
+
+The golden-output checks live in tests/test_metrics_golden.py.
+
+Run from the repository root:  python -m benchmarks.bench_metrics
+"""
+import argparse
+import time
+
+import numpy as np
+
+from aoi_index import AOI_CODE_TYPES
+from metrics_engine import compute_session_metrics
+from tests.reference_metrics import reference_session_metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=10_000_000, help="Session length for the timing run")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    timestamps = np.cumsum(rng.choice([0.0, 1/30, 1/30, 2/30], size=args.samples))
+    aoi_codes = np.repeat(rng.integers(0, 3, size=args.samples // 200 + 1, dtype=np.uint8), 200)[:args.samples]
+    start = time.perf_counter()
+    compute_session_metrics(timestamps, aoi_codes)
+    elapsed = time.perf_counter() - start
+    print(f"engine: {args.samples:,} samples in {elapsed * 1000:.0f} ms")
+
+    reference_log = [{'timestamp': ts, 'aoi_status': AOI_CODE_TYPES[code]}
+                     for ts, code in zip(timestamps[:500_000].tolist(), aoi_codes[:500_000].tolist())]
+    start = time.perf_counter()
+    reference_session_metrics(reference_log)
+    elapsed = time.perf_counter() - start
+    print(f"reference loops: {len(reference_log):,} samples in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Cost of the hot-path instrumentation (perf_stats.py), off and on.
+
+The per-call part times the guard every instrumented stage runs (`if stats: ...`) with
+instrumentation off and on. The end-to-end part replays the same synthetic trace through
+the stand-in server and the live pipeline (bench_replay.replay_session) without and with
+a PerfStats attached, alternating runs, and prints the stage table it collected.
+
+Run from the repository root:  python -m benchmarks.bench_perf_stats --minutes 20 --runs 3
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from benchmarks.bench_replay import replay_session
+from gaze_server import SyntheticGazeTrace
+from perf_stats import PerfStats
+
+
+def guarded_stage_cost(stats, calls=1_000_000):
+    """Seconds per instrumented stage boundary with the given stats (None = off)."""
+    stage_start = time.perf_counter()
+    start = time.perf_counter()
+    for _ in range(calls):
+        if stats: stage_start = stats.lap("stage", stage_start)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=float, default=20.0)
+    parser.add_argument("--rate", type=float, default=60.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"stage boundary: {guarded_stage_cost(None) * 1e9:6.1f} ns off, "
+          f"{guarded_stage_cost(PerfStats()) * 1e9:6.1f} ns on")
+
+    throughput = {"off": [], "on": []}
+    stats = None
+    for _ in range(args.runs):
+        for mode in ("off", "on"):
+            stats = PerfStats() if mode == "on" else None
+            with contextlib.redirect_stdout(io.StringIO()):  # The client's connection messages
+                result = replay_session(SyntheticGazeTrace(args.minutes * 60, args.rate), None, perf_stats=stats)
+            throughput[mode].append(result["samples_logged"] / result["elapsed_s"])
+    off, on = statistics.median(throughput["off"]), statistics.median(throughput["on"])
+    print(f"end to end ({args.minutes:g} min at {args.rate:g} Hz, median of {args.runs}): "
+          f"{off:,.0f} samples/s off, {on:,.0f} on ({(off - on) / off * 100:+.1f}% overhead)")
+
+    snapshot = stats.snapshot()
+    print(f"last run: {snapshot['samples']:,} samples, {snapshot['ticks']:,} ticks, max queue depth "
+          f"{snapshot['max_queue_depth']:,}, {snapshot['late_samples']:,} late, {snapshot['dropped_samples']:,} dropped")
+    for stage, summary in snapshot["stages"].items():
+        print(f"{stage:>12}: {summary['count']:>8,} x  mean {summary['mean_ms']:7.3f} ms  "
+              f"p95 {summary['p95_ms']:7.3f} ms  max {summary['max_ms']:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""AOI preview rendering: Tk calls per second, per-tick redraw vs. PreviewRenderer.
+
+Replays 60 Hz webcam gaze (bench_filters' simulation, One Euro filtered) through a 30 ms
+UI tick. The old loop made five Tk calls every tick (winfo_width, winfo_height, coords,
+itemconfig, status label) and deleted and recreated every AOI item on each resize.
+PreviewRenderer is run on a real Tk canvas when a display is available, otherwise on a
+recorder that counts the canvas calls it receives (the counts are the same; timings
+are then only meaningful for the Python side).
+
+Run from the repository root:  python -m benchmarks.bench_preview --seconds 300
+"""
+import argparse
+import time
+import tkinter as tk
+
+from aoi_index import AOIIndex
+from benchmarks.bench_filters import AOI_LIST, SCREEN_H, SCREEN_W, synthetic_gaze
+from gaze_filters import make_gaze_filter
+from perf_stats import RateCounter
+from preview_renderer import PreviewRenderer
+
+UI_TICK_S = 0.030
+OLD_CALLS_PER_TICK = 5
+
+
+class CallRecorder:
+    # Stands in for tk.Canvas without a display; returns item ids and counts nothing itself
+    def __init__(self, width, height):
+        self._size, self._next_id = (width, height), 1
+
+    def _create(self, *args, **kwargs):
+        self._next_id += 1
+        return self._next_id
+
+    create_oval = create_rectangle = create_text = _create
+
+    def winfo_width(self):
+        return self._size[0]
+
+    def winfo_height(self):
+        return self._size[1]
+
+    def coords(self, *args, **kwargs):
+        pass
+
+    itemconfig = delete = tag_raise = coords
+
+
+class ResizeEvent:
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+
+
+def make_canvas(width, height):
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None, CallRecorder(width, height)
+    canvas = tk.Canvas(root, width=width, height=height)
+    canvas.pack()
+    root.update()
+    return root, canvas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=300.0)
+    parser.add_argument("--max-fps", type=float, default=24.0)
+    parser.add_argument("--resizes", type=int, default=20, help="Window resizes spread over the run")
+    args = parser.parse_args()
+
+    timestamps, noisy_x, noisy_y, _, _ = synthetic_gaze(args.seconds)
+    gaze_filter = make_gaze_filter("one_euro", "ivt")
+    filtered = [gaze_filter.process(t, x, y)[:2] for t, x, y in zip(timestamps.tolist(), noisy_x.tolist(), noisy_y.tolist())]
+    index = AOIIndex(AOI_LIST)
+    ticks = int(args.seconds / UI_TICK_S)
+    aois = AOI_LIST * 4  # A few more items to move on resize
+    old_calls = ticks * OLD_CALLS_PER_TICK + args.resizes * (1 + 2 + 2 * len(aois))
+    print(f"{ticks:,} UI ticks over {args.seconds:g} s; per-tick redraw: {old_calls / args.seconds:7.1f} Tk calls/s")
+
+    root, canvas = make_canvas(640, 360)
+    counter = RateCounter()
+    renderer = PreviewRenderer(canvas, SCREEN_W, SCREEN_H, ("Arial", 8, "bold"), args.max_fps, 1.0, counter)
+    renderer.on_configure(ResizeEvent(640, 360))
+    renderer.set_aois(aois)
+    start_calls, sample_i, drawn = counter.total, 0, 0
+    resize_every = max(1, ticks // max(1, args.resizes))
+    start = time.perf_counter()
+    for tick in range(ticks):
+        now = (tick + 1) * UI_TICK_S
+        while sample_i + 1 < len(timestamps) and timestamps[sample_i + 1] <= now:
+            sample_i += 1
+        if tick % resize_every == resize_every - 1:
+            width = 640 + (tick // resize_every) % 2 * 160
+            renderer.on_configure(ResizeEvent(width, width * 9 // 16))
+        if renderer.frame_due(now):
+            x, y = filtered[sample_i]
+            if renderer.draw_gaze(x, y, index.lookup(x, y), now):
+                drawn += 1
+                counter.add()  # Status label
+        if root is not None:
+            root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    calls = counter.total - start_calls
+    print(f"PreviewRenderer ({args.max_fps:g} fps cap): {calls / args.seconds:7.1f} Tk calls/s, {drawn:,} frames redrawn, "
+          f"{elapsed / ticks * 1e6:.1f} us/tick{'' if root else ' (no display: canvas calls recorded only)'}")
+    print(f"{old_calls / max(calls, 1):.1f}x fewer Tk calls")
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Connection outages: reconnect latency and gap-aware session metrics.
+
+Streams a real-time synthetic trace from the GazeFlow stand-in server, takes the server
+down --outages times for --outage-s seconds each, and brings it back on the same port.
+The ingest thread reconnects with ReconnectBackoff and pushes a gap marker for each loss;
+the UI-tick loop here logs samples and markers the way FocusFlowApp does (including the
+GAP_AFTER_S stall check). Reports how long each reconnect took after the server was back,
+and the session metrics with the gaps excluded next to what the same samples give without
+markers (each outage counted as dwell of the last sample before it). --save writes the
+logged session as a .ffs file (tests/data/recorded_session.ffs was recorded this way).
+
+Run from the repository root:  python -m benchmarks.bench_reconnect --outages 3 --outage-s 2
+"""
+import argparse
+import contextlib
+import io
+import threading
+import time
+
+import numpy as np
+
+from aoi_index import AOI_TYPE_CODES, GAP_AOI_TYPE, AOIIndex
+from benchmarks.bench_replay import AOI_LIST
+from gaze_client import GazeFlowClient
+from gaze_ingest import SAMPLE_TIME, GazeIngestThread, GazeRingBuffer, ReconnectBackoff, is_gap_marker
+from gaze_server import GazeFlowServer, SyntheticGazeTrace
+from metrics_engine import StreamingSessionMetrics, compute_session_log_metrics
+from session_file import write_session_file
+from session_log import SessionLog
+
+UI_TICK_S = 0.030
+GAP_AFTER_S = 1.0
+
+
+def run_outages(outages, outage_s, up_s, rate_hz=60.0):
+    trace = SyntheticGazeTrace((outages + 1) * (up_s + outage_s) + 60, rate_hz, dropouts_per_min=0)
+    index, log = AOIIndex(AOI_LIST), SessionLog()
+    metrics = StreamingSessionMetrics(log.category_table)
+    gap_code = AOI_TYPE_CODES[GAP_AOI_TYPE]
+    server = GazeFlowServer(trace).start()
+    port = server.address[1]
+    restarts = []  # time.time() at which the server was listening again
+
+    def take_down():
+        nonlocal server
+        for _ in range(outages):
+            time.sleep(up_s)
+            server.stop()
+            time.sleep(outage_s)
+            server = GazeFlowServer(trace, port=port).start()
+            restarts.append(time.time())
+
+    client = GazeFlowClient(*server.address)
+    if not client.connect():
+        raise RuntimeError("Could not connect to the stand-in server.")
+    ring_buffer = GazeRingBuffer()
+    ingest = GazeIngestThread(client, ring_buffer, reconnect=ReconnectBackoff(0.1, 1.0))
+    start = time.time()
+    ingest.start()
+    controller = threading.Thread(target=take_down, daemon=True)
+    controller.start()
+
+    gap_open, last_sample_time, first_after_gap = True, None, []
+
+    def log_gap(gap_start):
+        nonlocal gap_open
+        if not gap_open:
+            log.append(gap_start - start, np.nan, np.nan, GAP_AOI_TYPE)
+            metrics.update(gap_start - start, gap_code)
+            gap_open = True
+
+    while controller.is_alive() or time.time() < restarts[-1] + up_s:
+        stretch = []
+        for sample in ring_buffer.drain() + [None]:
+            if sample is None or is_gap_marker(sample):
+                if stretch:
+                    receive_times, xs, ys, _ = zip(*stretch)
+                    codes = index.classify_batch(xs, ys).tolist()
+                    timestamps = [t - start for t in receive_times]
+                    log.extend(timestamps, xs, ys, codes)
+                    metrics.update_batch(timestamps, codes)
+                    if gap_open and last_sample_time is not None:
+                        first_after_gap.append(receive_times[0])
+                    gap_open, last_sample_time, stretch = False, receive_times[-1], []
+                if sample is not None:
+                    log_gap(sample[SAMPLE_TIME])
+            else:
+                stretch.append(sample)
+        if not gap_open and time.time() - last_sample_time > GAP_AFTER_S:
+            log_gap(last_sample_time)
+        time.sleep(UI_TICK_S)
+    ingest.stop()
+    server.stop()
+    return log, metrics, restarts, first_after_gap, ingest.reconnect_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--outages", type=int, default=3)
+    parser.add_argument("--outage-s", type=float, default=2.0)
+    parser.add_argument("--up-s", type=float, default=3.0, help="Seconds of streaming before and after each outage")
+    parser.add_argument("--save", default=None, help="Write the logged session to this .ffs file")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):  # The client's connection messages
+        log, metrics, restarts, first_after_gap, reconnects = run_outages(args.outages, args.outage_s, args.up_s)
+    latencies = [first - restart for restart, first in zip(restarts, first_after_gap)]
+    print(f"{args.outages} outages of {args.outage_s:g} s: {reconnects} reconnects, first sample "
+          f"{np.mean(latencies) * 1e3:.0f} ms (max {max(latencies) * 1e3:.0f} ms) after the server was back")
+
+    with_gaps = compute_session_log_metrics(log)
+    assert with_gaps["gaps"] == metrics.current_metrics()["gaps"], "streaming metrics diverged"
+    samples = ~np.isnan(log.raw_x)
+    without_markers = compute_session_log_metrics(SessionLog.from_columns(
+        log.timestamps[samples], log.raw_x[samples], log.raw_y[samples], log.aoi_codes[samples], log.category_table))
+    if args.save:
+        write_session_file(args.save, dict(with_gaps, raw_log=log), compress=True)
+    print(f"{with_gaps['gaps']['count']} gaps logged, {with_gaps['gaps']['total_duration']:.2f} s excluded "
+          f"({args.outages * args.outage_s:g} s of outages plus reconnect time)")
+    for name, result in (("with gap markers", with_gaps), ("without markers", without_markers)):
+        dwell = result["dwell_times"]
+        print(f"{name:>17}: session {result['session_duration']:6.2f} s, productive {dwell['Productive']:6.2f} s, "
+              f"distraction {dwell['Distraction']:6.2f} s, outside {dwell['Outside']:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
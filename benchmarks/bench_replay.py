@@ -0,0 +1,121 @@
+"""End-to-end replay: GazeFlow stand-in server -> GazeFlowClient -> ingest thread -> session pipeline.
+
+Streams a synthetic (or recorded) trace through a real socket and runs what the UI tick
+does with each drained batch: AOI classification, holding the AOI through saccades, the
+event log and the streaming metrics. Reports the throughput, the samples lost anywhere
+on the way, and checks the streaming metrics against a full pass over the logged samples.
+
+Run from the repository root:  python -m benchmarks.bench_replay --hours 8 --speed 0
+"""
+import argparse
+import time
+
+from aoi_index import AOI_TYPE_CODES, AOIIndex
+from event_log import EventLogBuilder
+from gaze_client import GazeFlowClient
+from gaze_filters import hold_fixation_codes, make_gaze_filter
+from gaze_ingest import GazeIngestThread, GazeRingBuffer
+from gaze_server import GazeFlowServer, RecordedGazeTrace, SyntheticGazeTrace
+from metrics_engine import StreamingSessionMetrics, compute_session_log_metrics
+from session_log import SessionLog
+from tracker_clock import TRACKER_TIMESTAMP_SCALE, TrackerClock
+
+AOI_LIST = [{'rect_screen_coords': (0, 0, 960, 1080), 'type': "Productive"},
+            {'rect_screen_coords': (960, 0, 1920, 540), 'type': "Distraction"}]
+UI_TICK_S = 0.030
+PLAUSIBLE_EVENTS_PER_MIN = (10.0, 1000.0)  # Fixations last 0.2-1.5 s; far outside this the timeline is broken
+
+
+class TraceTimeline:
+    # Stands in for TrackerClock when replaying as fast as possible: a sample goes on the timeline
+    # at its trace Timestamp, since its receive time only says how fast the pipeline ran
+    def reset(self):
+        pass
+
+    def to_host(self, tracker_timestamp, receive_time):
+        return tracker_timestamp * TRACKER_TIMESTAMP_SCALE
+
+
+def replay_session(trace, speed=None, aoi_list=AOI_LIST, ring_capacity=1 << 16, perf_stats=None):
+    """Runs a whole trace through the live pipeline; returns its counters and the session state it built."""
+    index = AOIIndex(aoi_list)
+    session_log = SessionLog()
+    events = EventLogBuilder()
+    metrics = StreamingSessionMetrics(session_log.category_table)
+    last_fixation_code = AOI_TYPE_CODES["Outside"]
+    ticks = 0
+
+    with GazeFlowServer(trace, speed=speed) as server:
+        client = GazeFlowClient(*server.address)
+        client.perf_stats = perf_stats
+        if not client.connect():
+            raise RuntimeError("Could not connect to the stand-in server.")
+        ring_buffer = GazeRingBuffer(ring_capacity)
+        # Trace timestamps only follow the host clock at a fixed replay speed
+        tracker_clock = TrackerClock(TRACKER_TIMESTAMP_SCALE / speed) if speed else TraceTimeline()
+        ingest = GazeIngestThread(client, ring_buffer, make_gaze_filter("one_euro", "ivt"), perf_stats,
+                                  tracker_clock=tracker_clock, sample_period=1.0 / getattr(trace, "rate_hz", 60.0))
+        # Session time is trace time in both modes: sample times are host times at a fixed speed
+        origin, time_scale = (ingest.host_clock.now(), speed) if speed else (0.0, 1.0)
+        start = time.perf_counter()
+        ingest.start()
+        while ingest.is_alive() or len(ring_buffer):
+            if perf_stats:
+                perf_stats.start_tick(time.monotonic())
+                stage_start = time.perf_counter()
+            samples = ring_buffer.drain()
+            if perf_stats: perf_stats.record_drain(samples, ring_buffer.dropped_count, time.time())
+            if samples:
+                sample_times, xs, ys, fixations = zip(*samples)
+                codes = hold_fixation_codes(index.classify_batch(xs, ys), fixations, last_fixation_code).tolist()
+                last_fixation_code = codes[-1]
+                if perf_stats: stage_start = perf_stats.lap("aoi_lookup", stage_start)
+                timestamps = [(t - origin) * time_scale for t in sample_times]
+                session_log.extend(timestamps, xs, ys, codes)
+                events.extend(timestamps, xs, ys, codes, fixations)
+                metrics.update_batch(timestamps, codes)
+                if perf_stats: perf_stats.lap("session_log", stage_start)
+                ticks += 1
+            else:
+                time.sleep(UI_TICK_S if speed else 0.001)
+        elapsed = time.perf_counter() - start
+        frames_sent = server.frames_sent
+
+    return {"frames_sent": frames_sent, "samples_logged": len(session_log), "ring_dropped": ring_buffer.dropped_count,
+            "ticks": ticks, "elapsed_s": elapsed, "session_log": session_log, "event_builder": events,
+            "session_metrics": metrics}
+
+
+def check_plausible(event_count, session_metrics):
+    """Raises AssertionError when a replayed session's event rate says its timeline is broken."""
+    minutes = session_metrics["session_duration"] / 60.0
+    low, high = PLAUSIBLE_EVENTS_PER_MIN
+    assert minutes > 0 and low <= event_count / minutes <= high, \
+        f"implausible replay: {event_count:,} events over {session_metrics['session_duration']:.1f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=8.0)
+    parser.add_argument("--rate", type=float, default=60.0)
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay speed factor; 0 = as fast as possible")
+    parser.add_argument("--replay", default=None, help="Replay this saved session instead of a synthetic trace")
+    args = parser.parse_args()
+
+    trace = RecordedGazeTrace(args.replay) if args.replay else SyntheticGazeTrace(args.hours * 3600, args.rate)
+    result = replay_session(trace, args.speed or None)
+    streaming = result["session_metrics"].current_metrics()
+    full = compute_session_log_metrics(result["session_log"])
+    assert streaming["transitions"] == full["transitions"], "streaming metrics diverged"
+    assert streaming["focus_bouts"]["count"] == full["focus_bouts"]["count"], "streaming metrics diverged"
+    event_count = len(result['event_builder'].finish())
+    print(f"{result['frames_sent']:,} samples sent, {result['samples_logged']:,} logged, "
+          f"{result['ring_dropped']:,} dropped in the ring buffer, {event_count:,} events, {result['ticks']:,} ticks")
+    print(f"{result['elapsed_s']:.1f} s wall time, {result['samples_logged'] / result['elapsed_s']:,.0f} samples/s "
+          f"(productive {full['dwell_percentages']['Productive']:.1f}% over {full['session_duration']:.1f} s of session time)")
+    assert result["frames_sent"] == result["samples_logged"] + result["ring_dropped"], "samples lost"
+    check_plausible(event_count, full)
+
+
+if __name__ == "__main__":
+    main()
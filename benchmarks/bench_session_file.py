@@ -0,0 +1,77 @@
+"""File size and load time: indented JSON reports vs the binary .ffs session container.
+
+Run from the repository root:  python -m benchmarks.bench_session_file --hours 8
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from aoi_index import AOI_CODE_TYPES
+from metrics_engine import compute_session_log_metrics
+from session_file import SessionFileReader, read_session_file, read_session_summary, write_session_file
+from session_log import SessionLog, report_from_json_dict, report_to_json_dict
+
+
+def synthetic_report(count, rate_hz=60.0, seed=0):
+    rng = np.random.default_rng(seed)
+    log = SessionLog.from_columns(np.arange(count) / rate_hz, rng.uniform(0, 1920, count), rng.uniform(0, 1080, count),
+                                  rng.integers(0, len(AOI_CODE_TYPES), count))
+    report = compute_session_log_metrics(log)
+    report["raw_log"] = log
+    return report
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def write_json(path, report):
+    with open(path, 'w') as f:
+        json.dump(report_to_json_dict(report), f, indent=4)
+
+
+def read_json(path):
+    with open(path, 'r') as f:
+        return report_from_json_dict(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=1.0, help="Session length at 60 Hz")
+    parser.add_argument("--json-hours", type=float, default=0.25, help="Length used for the (slow) JSON baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_count = int(args.json_hours * 3600 * 60)
+        json_report = synthetic_report(json_count)
+        json_path = os.path.join(tmp, "session.json")
+        _, json_write = timed(write_json, json_path, json_report)
+        _, json_read = timed(read_json, json_path)
+        json_bytes = os.path.getsize(json_path)
+        print(f"JSON     {json_count:>10,} samples: {json_bytes / json_count:6.1f} B/sample, "
+              f"write {json_write * 1000:8.1f} ms, load {json_read * 1000:8.1f} ms")
+
+        count = int(args.hours * 3600 * 60)
+        report = synthetic_report(count)
+        for compress in (False, True):
+            path = os.path.join(tmp, f"session_{int(compress)}.ffs")
+            _, write_time = timed(write_session_file, path, report, compress=compress)
+            loaded, read_time = timed(read_session_file, path)
+            _, summary_time = timed(read_session_summary, path)
+            assert np.array_equal(loaded["raw_log"].timestamps, report["raw_log"].timestamps)
+            assert np.array_equal(loaded["raw_log"].aoi_codes, report["raw_log"].aoi_codes)
+            assert SessionFileReader(path).is_finished
+            label = "FFS+zlib" if compress else "FFS"
+            print(f"{label:<8} {count:>10,} samples: {os.path.getsize(path) / count:6.1f} B/sample, "
+                  f"write {write_time * 1000:8.1f} ms, load {read_time * 1000:8.1f} ms, summary {summary_time * 1000:.2f} ms")
+            del loaded
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Memory per sample: list of per-sample dicts vs the columnar SessionLog.
+
+Run from the repository root:  python -m benchmarks.bench_session_log
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from aoi_index import AOI_CODE_TYPES
+from session_log import AOI_CODE_DTYPE, COORD_DTYPE, TIMESTAMP_DTYPE, SessionLog
+
+
+def synthetic_samples(count, seed=0):
+    rnd = random.Random(seed)
+    return [(i / 60.0, rnd.uniform(0, 1920), rnd.uniform(0, 1080), rnd.choice(AOI_CODE_TYPES)) for i in range(count)]
+
+
+def measure(build, samples):
+    tracemalloc.start()
+    start = time.perf_counter()
+    log = build(samples)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return log, current, peak, elapsed
+
+
+def build_dict_log(samples):
+    log = []
+    for timestamp, raw_x, raw_y, aoi_status in samples:
+        # The live loop creates fresh float objects per sample; "+ 0.0" does the same here
+        log.append({'timestamp': timestamp + 0.0, 'raw_x': raw_x + 0.0, 'raw_y': raw_y + 0.0, 'aoi_status': aoi_status})
+    return log
+
+
+def build_session_log(samples):
+    log = SessionLog()
+    for timestamp, raw_x, raw_y, aoi_status in samples:
+        log.append(timestamp, raw_x, raw_y, aoi_status)
+    return log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    samples = synthetic_samples(args.samples)
+    for name, build in (("list of dicts", build_dict_log), ("SessionLog", build_session_log)):
+        log, current, peak, elapsed = measure(build, samples)
+        print(f"{name:14s} {current / args.samples:8.1f} B/sample retained, {peak / args.samples:8.1f} B/sample peak, "
+              f"{args.samples / elapsed:>12,.0f} appends/s")
+        del log
+    payload = np.dtype(TIMESTAMP_DTYPE).itemsize + 2 * np.dtype(COORD_DTYPE).itemsize + np.dtype(AOI_CODE_DTYPE).itemsize
+    print(f"SessionLog payload: {payload} B/sample (float64 timestamp, 2x float32 coords, uint8 AOI code)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Import time and time-to-first-frame of the Tk app.
+
+Runs each measurement in a fresh interpreter. Import costs come from `python -X importtime`
+(cumulative microseconds per top-level module); time-to-first-frame covers interpreter start,
+imports, theme loading and building FocusFlowApp up to the first root.update(), and is
+compared against TARGET_FIRST_FRAME_S. The first-frame part needs a display.
+
+Run from the repository root:  python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+TARGET_FIRST_FRAME_S = 1.0
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_FRAME_SCRIPT = """
+import os, sys, time
+import tkinter as tk
+import main_app
+root = tk.Tk()
+themes = os.path.join(os.path.dirname(main_app.__file__), "themes")
+try:
+    root.tk.call("lappend", "auto_path", themes)
+    root.tk.call("source", os.path.join(themes, "azure.tcl"))
+    root.tk.call("set_theme", "dark")
+except tk.TclError:
+    pass
+app = main_app.FocusFlowApp(root)
+root.update()
+print(time.perf_counter())
+root.destroy()
+"""
+
+
+def import_times(statement):
+    """Returns {module: cumulative us} for the top-level imports made by statement."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if len(name) - len(name.lstrip()) == 1:  # Nested imports are indented further
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def first_frame_time():
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", FIRST_FRAME_SCRIPT], cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+    # perf_counter is system-wide on Linux/Windows/macOS, so the child's reading is comparable
+    return float(result.stdout.split()[-1]) - start, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, statement in (("main_app (lazy charts)", "import main_app"),
+                             ("main_app + chart stack", "import main_app, app_assets; app_assets.load_chart_modules()")):
+        runs = [import_times(statement) for _ in range(args.runs)]
+        total = statistics.median(sum(run.values()) for run in runs)
+        heaviest = sorted(runs[-1].items(), key=lambda item: -item[1])[:5]
+        print(f"{label:<24} imports {total / 1000:7.1f} ms   heaviest: "
+              + ", ".join(f"{name} {us / 1000:.0f} ms" for name, us in heaviest))
+
+    frame_times, error = [], None
+    for _ in range(args.runs):
+        elapsed, error = first_frame_time()
+        if elapsed is None:
+            break
+        frame_times.append(elapsed)
+    if frame_times:
+        median = statistics.median(frame_times)
+        verdict = "OK" if median <= TARGET_FIRST_FRAME_S else "OVER TARGET"
+        print(f"time to first frame      {median * 1000:7.1f} ms   (target {TARGET_FIRST_FRAME_S * 1000:.0f} ms: {verdict})")
+    else:
+        print(f"time to first frame      skipped ({error})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Sample timestamps: receive-time stamping vs the tracker clock (TrackerClock).
+
+Simulates a tracker sampling at --rates Hz on a clock that runs --drift-ppm fast, and a
+host that reads the socket every --read-ms (plus exponentially distributed scheduling and
+network delay), stamping samples at the read (the HostClock receive time), spread between
+the previous read and this one at least the nominal period apart (GazeIngestThread without
+Timestamps), or from their tracker Timestamp through TrackerClock. Gaze alternates between
+AOIs in dwells of 0.1-2 s. Reports, per rate, the jitter of the sample intervals, the error of the stamps
+against the true sample times (mean and spread), the estimated drift, and the largest
+dwell-time error of the session metrics against the true sample times. With the tracker
+clock most of that error is the delay of the first reads, before the offset has settled
+(once per connection).
+
+Run from the repository root:  python -m benchmarks.bench_timestamps --minutes 10
+"""
+import argparse
+
+import numpy as np
+
+from aoi_index import AOI_TYPE_CODES
+from gaze_ingest import batch_sample_spacing
+from metrics_engine import compute_session_metrics
+from tracker_clock import TRACKER_TIMESTAMP_SCALE, TrackerClock
+
+HOST_EPOCH = 1.7e9  # Host times are time.time() based
+TRACKER_START_S = 12_345.0  # The tracker clock started long before the session
+
+
+def simulate_session(minutes, rate_hz, drift_ppm, read_ms, delay_ms, seed=0):
+    """True sample times, tracker timestamps (ms), receive times and AOI codes of one session."""
+    rng = np.random.default_rng(seed)
+    true_times = np.arange(0.0, minutes * 60.0, 1.0 / rate_hz)
+    tracker_ms = (TRACKER_START_S + true_times * (1.0 + drift_ppm * 1e-6)) * 1e3
+    # A sample is read at the first socket read after it arrived (transport delay of >= 1 ms)
+    arrivals = true_times + 1e-3 + rng.exponential(delay_ms * 1e-3, len(true_times))
+    reads = np.arange(0.0, true_times[-1] + 1.0, read_ms * 1e-3)
+    reads += rng.exponential(delay_ms * 1e-3, len(reads))
+    reads = np.maximum.accumulate(reads)
+    receive_times = reads[np.minimum(np.searchsorted(reads, arrivals), len(reads) - 1)]
+    receive_times = np.maximum.accumulate(receive_times)  # One socket delivers in order
+
+    dwell_ends = np.cumsum(rng.uniform(0.1, 2.0, int(minutes * 60 / 0.1) + 1))
+    codes = [AOI_TYPE_CODES["Productive"], AOI_TYPE_CODES["Distraction"], AOI_TYPE_CODES["Outside"]]
+    aoi_codes = np.array(codes)[np.searchsorted(dwell_ends, true_times) % len(codes)]
+    return true_times + HOST_EPOCH, tracker_ms, receive_times + HOST_EPOCH, aoi_codes
+
+
+def spread_stamps(receive_times, sample_period):
+    """Receive times spread out per read the way GazeIngestThread stamps samples without a Timestamp."""
+    read_times, first_indices, counts = np.unique(receive_times, return_index=True, return_counts=True)
+    stamps = np.empty_like(receive_times)
+    previous_read = read_times[0]
+    for read_time, first, count in zip(read_times.tolist(), first_indices.tolist(), counts.tolist()):
+        spacing = batch_sample_spacing(previous_read, read_time, count, sample_period)
+        stamps[first:first + count] = np.maximum(read_time + np.arange(1 - count, 1) * spacing,
+                                                 stamps[first - 1] if first else -np.inf)
+        previous_read = read_time
+    return stamps
+
+
+def stamp_quality(stamps, true_times, rate_hz, aoi_codes, true_dwell):
+    errors = stamps - true_times
+    interval_jitter = np.std(np.diff(stamps) - 1.0 / rate_hz)
+    dwell = compute_session_metrics(stamps - stamps[0], aoi_codes)["dwell_times"]
+    dwell_error = max(abs(dwell[name] - true_dwell[name]) for name in true_dwell)
+    return {"interval_jitter_ms": interval_jitter * 1e3, "mean_error_ms": np.mean(errors) * 1e3,
+            "error_spread_ms": np.std(errors) * 1e3, "dwell_error_s": dwell_error}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--rates", type=float, nargs="+", default=[60.0, 120.0, 250.0, 1000.0])
+    parser.add_argument("--drift-ppm", type=float, default=50.0, help="How fast the tracker clock runs")
+    parser.add_argument("--read-ms", type=float, default=8.0, help="Interval between socket reads")
+    parser.add_argument("--delay-ms", type=float, default=2.0, help="Mean scheduling/network delay")
+    args = parser.parse_args()
+
+    print(f"{args.minutes:g} min sessions, tracker clock {args.drift_ppm:+g} ppm, reads every {args.read_ms:g} ms "
+          f"+ {args.delay_ms:g} ms mean delay")
+    print(f"{'rate':>7} {'stamped at':>10} {'interval jitter':>16} {'error mean':>11} {'error spread':>13} "
+          f"{'max dwell error':>16} {'drift estimate':>15}")
+    for rate_hz in args.rates:
+        true_times, tracker_ms, receive_times, aoi_codes = simulate_session(
+            args.minutes, rate_hz, args.drift_ppm, args.read_ms, args.delay_ms)
+        true_dwell = compute_session_metrics(true_times - true_times[0], aoi_codes)["dwell_times"]
+        clock = TrackerClock(TRACKER_TIMESTAMP_SCALE)
+        tracker_stamps = np.array([clock.to_host(ts, rt) for ts, rt in zip(tracker_ms.tolist(), receive_times.tolist())])
+        for label, stamps, drift in (("receive", receive_times, ""), ("spread", spread_stamps(receive_times, 1.0 / rate_hz), ""),
+                                     ("tracker", tracker_stamps, f"{clock.drift_ppm:+.1f} ppm")):
+            quality = stamp_quality(stamps, true_times, rate_hz, aoi_codes, true_dwell)
+            print(f"{rate_hz:>5g}Hz {label:>10} {quality['interval_jitter_ms']:>13.3f} ms "
+                  f"{quality['mean_error_ms']:>8.2f} ms {quality['error_spread_ms']:>10.3f} ms "
+                  f"{quality['dwell_error_s'] * 1e3:>13.1f} ms {drift:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Trend charts from rollups: catalog updates and rendering over a long session history.
+
+Adds synthetic session summaries to a session library one at a time (each add updates
+that day's rollup), then loads the daily/weekly rollups and renders a trend chart with
+the Agg backend. Target: a 1000-session history renders in under TARGET_RENDER_S.
+
+Run from the repository root:  python -m benchmarks.bench_trends --sessions 1000
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+
+from focusflow import render_trend_chart
+from session_library import SessionLibrary
+from trends import trend_series
+
+TARGET_RENDER_S = 1.0
+
+
+def synthetic_summary(rng):
+    duration = rng.uniform(600, 7200)
+    productive, distraction = duration * rng.uniform(0.3, 0.8), duration * rng.uniform(0.05, 0.3)
+    outside = max(0.0, duration - productive - distraction)
+    bouts, latencies = int(rng.integers(1, 30)), int(rng.integers(0, 10))
+    return {
+        "session_duration": duration,
+        "dwell_times": {"Productive": productive, "Distraction": distraction, "Outside": outside},
+        "dwell_percentages": {"Productive": 100 * productive / duration, "Distraction": 100 * distraction / duration,
+                              "Outside": 100 * outside / duration},
+        "transitions": {"P_to_D": int(rng.integers(0, 200)), "D_to_P": int(rng.integers(0, 200))},
+        "focus_bouts": {"count": bouts, "avg_duration": productive / bouts, "max_duration": productive / bouts * 2},
+        "re_engagement_latency": {"count": latencies, "avg_latency": rng.uniform(1, 20) if latencies else 0},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365, help="Days the history is spread over")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp, SessionLibrary(os.path.join(tmp, "library.sqlite3")) as library:
+        summaries = [(f"/sessions/s{i:05d}.ffs", synthetic_summary(rng), now - rng.uniform(0, args.days) * 86400)
+                     for i in range(args.sessions)]
+        start = time.perf_counter()
+        for path, summary, started_at in summaries:
+            library.add_session(path, summary, started_at)
+        add_time = time.perf_counter() - start
+
+        # Rollups must agree with summing the per-session summaries directly
+        total_bouts = sum(summary["focus_bouts"]["count"] for _, summary, _ in summaries)
+        assert sum(row["bout_count"] for row in library.trend_rollups("day")) == total_bouts
+        total_bout_time = sum(s["focus_bouts"]["count"] * s["focus_bouts"]["avg_duration"] for _, s, _ in summaries)
+        assert math.isclose(sum(row["bout_total_s"] for row in library.trend_rollups("week")), total_bout_time)
+
+        for period in ("day", "week"):
+            start = time.perf_counter()
+            periods, values = trend_series(library.trend_rollups(period), "avg_bout_duration")
+            query_time = time.perf_counter() - start
+            render_trend_chart(periods, values, "avg_bout_duration", period, os.path.join(tmp, f"trend_{period}.png"))
+            total_time = time.perf_counter() - start
+            verdict = "OK" if total_time <= TARGET_RENDER_S else "OVER TARGET"
+            print(f"{args.sessions} sessions per {period:<4}: {len(periods):4d} points, rollup query {query_time * 1000:6.2f} ms, "
+                  f"query + render {total_time * 1000:7.1f} ms ({verdict})")
+        print(f"adding sessions one by one (incl. rollup update): {add_time / args.sessions * 1000:.3f} ms/session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""GazeFlow-shaped XML records shared by the benchmarks."""
+
+
+def make_gaze_record(i):
+    # Same shape as the XML records GazePointer sends over the GazeFlow API
+    return (f"<GazeData><GazeX>{960 + (i % 400) * 0.37:.2f}</GazeX><GazeY>{540 - (i % 300) * 0.41:.2f}</GazeY>"
+            f"<HeadX>{0.012 * (i % 50):.3f}</HeadX><HeadY>{-0.004 * (i % 70):.3f}</HeadY><HeadZ>0.612</HeadZ>"
+            f"<HeadYaw>{(i % 20) - 10:.2f}</HeadYaw><HeadPitch>{(i % 12) - 6:.2f}</HeadPitch><HeadRoll>0.85</HeadRoll>"
+            f"</GazeData>")
+
+
+def load_corpus(path=None, count=10_000):
+    """Returns captured records (one XML record per line in `path`) or synthetic ones."""
+    if path:
+        with open(path, 'rb') as f:
+            return [line.strip() for line in f if line.strip()]
+    return [make_gaze_record(i).encode('utf-8') for i in range(count)]
@@ -0,0 +1,192 @@
+"""End-to-end benchmark suite: ingest, AOI classification, report metrics and chart rendering.
+
+Each scenario is one synthetic session (length x sample rate x AOI count) and runs in a
+fresh process, so its peak RSS is its own:
+
+- ingest: the trace is replayed through the GazeFlow stand-in server, the client, the
+  ingest thread and the UI-tick pipeline (bench_replay.replay_session), as fast as the
+  pipeline takes it, with samples on the timeline at their trace Timestamp; reported as
+  samples/s. A run whose event rate is implausible fails.
+- classify: AOIIndex.classify_batch over the logged samples, samples/s.
+- report: FocusFlowApp.generate_session_metrics_data on the replayed session state (the
+  end-of-session latency), plus the full metrics pass it falls back to.
+- charts: the report's dwell pie and attention timeline rendered with the Agg backend
+  (focusflow.render_report_charts), so no display is needed.
+
+Results are written as JSON (environment + one entry per scenario); --compare prints the
+change of every number against an earlier results file.
+
+Run from the repository root:  python -m benchmarks.suite --preset quick
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESULTS_DIR = os.path.join(REPO_ROOT, "benchmark-results")
+SCREEN_W, SCREEN_H = 1920, 1080
+PRESETS = {
+    # (lengths in minutes, sample rates in Hz, AOI counts)
+    "quick": ((1, 10), (60,), (2, 8)),
+    "full": ((1, 10, 60, 480), (30, 60, 120), (2, 8, 32)),
+}
+# Which way is better for each reported number (for --compare)
+HIGHER_IS_BETTER = {"ingest_samples_per_s", "classify_samples_per_s"}
+
+
+def aoi_grid(count, screen_size=(SCREEN_W, SCREEN_H)):
+    """count AOIs tiling the screen in a near-square grid, alternating Productive and Distraction."""
+    columns = max(1, int(round(count ** 0.5)))
+    rows = -(-count // columns)
+    width, height = screen_size[0] / columns, screen_size[1] / rows
+    return [{'rect_screen_coords': (int(i % columns * width), int(i // columns * height),
+                                    int((i % columns + 1) * width), int((i // columns + 1) * height)),
+             'type': "Productive" if i % 2 == 0 else "Distraction"}
+            for i in range(count)]
+
+
+def scenario_name(minutes, rate_hz, aoi_count):
+    return f"{minutes:g}min_{rate_hz:g}hz_{aoi_count}aoi"
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def run_scenario(minutes, rate_hz, aoi_count, seed=0):
+    """Runs one scenario (meant for a fresh worker process); returns its result dict."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import numpy as np
+
+    from aoi_index import AOIIndex
+    from benchmarks.bench_replay import check_plausible, replay_session
+    from focusflow import render_report_charts
+    from gaze_server import SyntheticGazeTrace
+    from main_app import FocusFlowApp
+    from metrics_engine import compute_session_log_metrics
+
+    result = {"name": scenario_name(minutes, rate_hz, aoi_count), "minutes": minutes, "rate_hz": rate_hz,
+              "aoi_count": aoi_count, "baseline_rss_mb": peak_rss_mb()}
+    aoi_list = aoi_grid(aoi_count)
+
+    with contextlib.redirect_stdout(io.StringIO()):  # The client's connection messages
+        replay = replay_session(SyntheticGazeTrace(minutes * 60, rate_hz, seed=seed), None, aoi_list)
+    session_log = replay["session_log"]
+    result.update(samples=len(session_log), samples_lost=replay["frames_sent"] - len(session_log),
+                  ingest_s=replay["elapsed_s"], ingest_samples_per_s=len(session_log) / replay["elapsed_s"])
+
+    index = AOIIndex(aoi_list)
+    xs, ys = np.asarray(session_log.raw_x), np.asarray(session_log.raw_y)
+    start = time.perf_counter()
+    index.classify_batch(xs, ys)
+    result["classify_samples_per_s"] = len(xs) / (time.perf_counter() - start)
+
+    app_state = SimpleNamespace(session_data_log=session_log, session_event_builder=replay["event_builder"],
+                                session_metrics=replay["session_metrics"], KEEP_RAW_SAMPLES=True,
+                                session_start_time=time.time() - minutes * 60, aoi_list=aoi_list)
+    start = time.perf_counter()
+    report_data = FocusFlowApp.generate_session_metrics_data(app_state)
+    result["report_latency_s"] = time.perf_counter() - start
+    result["events"] = len(report_data["event_log"])
+    check_plausible(result["events"], report_data)
+    start = time.perf_counter()
+    compute_session_log_metrics(session_log)
+    result["full_metrics_pass_s"] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        render_report_charts(report_data, os.path.join(out_dir, "report"))
+        result["chart_render_s"] = time.perf_counter() - start
+
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def environment_info():
+    import matplotlib
+    import numpy as np
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(), "numpy": np.__version__, "matplotlib": matplotlib.__version__,
+            "platform": platform.platform(), "cpu_count": os.cpu_count(), "git_commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare_results(baseline, current):
+    """Prints the change of every shared number, per scenario present in both runs."""
+    baseline_scenarios = {scenario["name"]: scenario for scenario in baseline["scenarios"]}
+    print(f"\nvs. {baseline['environment'].get('git_commit') or 'baseline'} "
+          f"({baseline['environment'].get('timestamp', '?')}); + is better")
+    for scenario in current["scenarios"]:
+        old = baseline_scenarios.get(scenario["name"])
+        if old is None:
+            continue
+        changes = []
+        for key in ("ingest_samples_per_s", "classify_samples_per_s", "report_latency_s", "full_metrics_pass_s",
+                    "chart_render_s", "peak_rss_mb"):
+            if not old.get(key) or key not in scenario:
+                continue
+            change = (scenario[key] - old[key]) / old[key] * 100
+            changes.append(f"{key} {change if key in HIGHER_IS_BETTER else -change:+.1f}%")
+        print(f"{scenario['name']:>22}: " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--lengths", type=float, nargs="+", help="Session lengths in minutes (overrides the preset)")
+    parser.add_argument("--rates", type=float, nargs="+", help="Sample rates in Hz (overrides the preset)")
+    parser.add_argument("--aois", type=int, nargs="+", help="AOI counts (overrides the preset)")
+    parser.add_argument("--output", default=None, help="Results file (default: benchmark-results/suite_<time>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    lengths, rates, aoi_counts = PRESETS[args.preset]
+    lengths, rates, aoi_counts = args.lengths or lengths, args.rates or rates, args.aois or aoi_counts
+    results = {"environment": environment_info(), "scenarios": []}
+    print(f"{len(lengths) * len(rates) * len(aoi_counts)} scenarios")
+    print(f"{'scenario':>22} {'samples':>11} {'ingest/s':>10} {'classify/s':>11} {'report':>9} "
+          f"{'full pass':>9} {'charts':>8} {'peak RSS':>9}")
+    spawn = multiprocessing.get_context("spawn")
+    for minutes in lengths:
+        for rate_hz in rates:
+            for aoi_count in aoi_counts:
+                # One process per scenario: ru_maxrss only ever grows
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    scenario = pool.submit(run_scenario, minutes, rate_hz, aoi_count).result()
+                results["scenarios"].append(scenario)
+                print(f"{scenario['name']:>22} {scenario['samples']:>11,} {scenario['ingest_samples_per_s']:>10,.0f} "
+                      f"{scenario['classify_samples_per_s']:>11,.0f} {scenario['report_latency_s'] * 1e3:>7.1f}ms "
+                      f"{scenario['full_metrics_pass_s'] * 1e3:>7.1f}ms {scenario['chart_render_s']:>7.2f}s "
+                      f"{scenario['peak_rss_mb']:>6.0f} MB")
+                if scenario["samples_lost"]:
+                    print(f"{'':>22} {scenario['samples_lost']:,} samples lost")
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"suite_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
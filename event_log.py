@@ -0,0 +1,234 @@
+"""Fixation / AOI-dwell event log: the sample stream collapsed into runs of one AOI and fixation label."""
+import numpy as np
+
+from aoi_index import AOI_CODE_TYPES
+from session_log import SessionLog, as_session_log
+
+EVENT_COLUMNS = (
+    ("start", np.float64), ("second", np.float64), ("end", np.float64), ("end_interval", np.float64),
+    ("x", np.float32), ("y", np.float32), ("aoi_code", np.uint8), ("is_fixation", np.uint8),
+    ("sample_count", np.uint32),
+)
+EVENT_COLUMN_NAMES = tuple(name for name, _ in EVENT_COLUMNS)
+
+
+class EventLog:
+    # Columnar, growable storage for events (same layout idea as SessionLog). Besides start/end,
+    # AOI, label, centroid and sample count, each event keeps `second` (the time of its second
+    # sample: a bout after a significant distraction ended by a Productive sample opens at the
+    # next one) and `end_interval` (the interval before its last sample: the session's last
+    # sample lasts that long), so metric_samples() gives the metrics of the full sample stream.
+    def __init__(self, capacity=256, category_table=AOI_CODE_TYPES):
+        capacity = max(1, capacity)
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in EVENT_COLUMNS}
+        self._size = 0
+        self.category_table = list(category_table)
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def column(self, name):
+        """Zero-copy view of one column (valid until the next append grows the log)."""
+        return self._columns[name][:self._size]
+
+    def _reserve(self, extra):
+        required = self._size + extra
+        capacity = len(self._columns["start"])
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2)
+        for name, old_column in self._columns.items():
+            new_column = np.empty(new_capacity, dtype=old_column.dtype)
+            new_column[:self._size] = old_column[:self._size]
+            self._columns[name] = new_column
+
+    def append(self, start, second, end, end_interval, x, y, aoi_code, is_fixation, sample_count):
+        self._reserve(1)
+        i = self._size
+        for name, value in zip(EVENT_COLUMN_NAMES, (start, second, end, end_interval, x, y, aoi_code, is_fixation, sample_count)):
+            self._columns[name][i] = value
+        self._size = i + 1
+
+    def extend(self, columns):
+        """Appends events given as a {column name: array} mapping (or another EventLog)."""
+        if isinstance(columns, EventLog):
+            columns = {name: columns.column(name) for name in EVENT_COLUMN_NAMES}
+        count = len(columns["start"])
+        self._reserve(count)
+        for name in EVENT_COLUMN_NAMES:
+            self._columns[name][self._size:self._size + count] = columns[name]
+        self._size += count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("EventLog only supports slicing; use column() for values.")
+        start, stop, step = index.indices(self._size)
+        if step != 1:
+            raise ValueError("EventLog slices must be contiguous.")
+        # Slices share memory with this log, like SessionLog slices
+        return EventLog.from_columns({name: self._columns[name][start:stop] for name in EVENT_COLUMN_NAMES},
+                                     self.category_table)
+
+    @classmethod
+    def from_columns(cls, columns, category_table=AOI_CODE_TYPES):
+        """Wraps existing column arrays (e.g. memory-mapped ones) without copying when dtypes match."""
+        log = cls.__new__(cls)
+        log._columns = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in EVENT_COLUMNS}
+        log._size = len(log._columns["start"])
+        log.category_table = list(category_table)
+        return log
+
+    @classmethod
+    def from_samples(cls, timestamps, raw_x, raw_y, aoi_codes, fixation_mask=None, category_table=AOI_CODE_TYPES):
+        """Vectorized conversion of a whole sample stream (same events as EventLogBuilder)."""
+        t = np.asarray(timestamps, dtype=np.float64)
+        n = len(t)
+        if n == 0:
+            return cls(category_table=category_table)
+        codes = np.asarray(aoi_codes, dtype=np.uint8)
+        fixation = np.ones(n, dtype=np.uint8) if fixation_mask is None else np.asarray(fixation_mask, dtype=np.uint8)
+        changed = (codes[1:] != codes[:-1]) | (fixation[1:] != fixation[:-1])
+        starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+        ends = np.append(starts[1:], n) - 1
+        counts = ends - starts + 1
+        intervals = np.concatenate(([0.0], np.diff(t)))
+        xs = np.add.reduceat(np.asarray(raw_x, dtype=np.float64), starts) / counts
+        ys = np.add.reduceat(np.asarray(raw_y, dtype=np.float64), starts) / counts
+        return cls.from_columns({
+            "start": t[starts], "second": t[np.minimum(starts + 1, ends)], "end": t[ends], "end_interval": intervals[ends],
+            "x": xs, "y": ys, "aoi_code": codes[starts], "is_fixation": fixation[starts], "sample_count": counts,
+        }, category_table)
+
+    def metric_samples(self):
+        """(timestamps, aoi_codes, x, y) of the few samples per event that determine the session metrics."""
+        n = len(self)
+        start, second, end = self.column("start"), self.column("second"), self.column("end")
+        counts = self.column("sample_count").astype(np.int64)
+        # Per event: its first sample, its second one and its last one (when they exist)
+        keep = np.stack([np.ones(n, dtype=bool), counts >= 2, counts >= 3], axis=1)
+        times = np.stack([start, second, end], axis=1)
+        event_index = np.repeat(np.arange(n), 3).reshape(n, 3)
+        timestamps, owners = times[keep], event_index[keep]
+        if n and counts[-1] >= 4:
+            # The session's second-to-last sample lies inside the last event
+            timestamps = np.append(timestamps, end[-1] - self.column("end_interval")[-1])
+            owners = np.append(owners, n - 1)
+            timestamps[-2:] = timestamps[-2:][::-1]
+        return (timestamps, self.column("aoi_code")[owners], self.column("x")[owners], self.column("y")[owners])
+
+    def to_session_log(self):
+        """A SessionLog of metric_samples() with the event centroids as positions, for charts and metrics."""
+        timestamps, codes, xs, ys = self.metric_samples()
+        return SessionLog.from_columns(timestamps, xs, ys, codes, self.category_table)
+
+    def to_records(self):
+        """Returns the events as a list of dicts for the JSON report format."""
+        columns = [self.column(name).tolist() for name in EVENT_COLUMN_NAMES]
+        table = self.category_table
+        records = []
+        for values in zip(*columns):
+            record = dict(zip(EVENT_COLUMN_NAMES, values))
+            record["aoi_status"] = table[record.pop("aoi_code")]
+            record["is_fixation"] = bool(record["is_fixation"])
+            records.append(record)
+        return records
+
+    @classmethod
+    def from_records(cls, records, category_table=AOI_CODE_TYPES):
+        log = cls(capacity=len(records), category_table=category_table)
+        codes = {category: code for code, category in enumerate(log.category_table)}
+        for record in records:
+            if record["aoi_status"] not in codes:
+                codes[record["aoi_status"]] = len(log.category_table)
+                log.category_table.append(record["aoi_status"])
+            log.append(record["start"], record["second"], record["end"], record["end_interval"], record["x"], record["y"],
+                       codes[record["aoi_status"]], record["is_fixation"], record["sample_count"])
+        return log
+
+    @property
+    def sample_count(self):
+        """Number of gaze samples the events were collapsed from."""
+        return int(self.column("sample_count").sum())
+
+    @property
+    def nbytes(self):
+        return self._size * sum(np.dtype(dtype).itemsize for _, dtype in EVENT_COLUMNS)
+
+
+class EventLogBuilder:
+    # Online event detection: O(1) per sample, closed events are appended to self.events
+    def __init__(self, category_table=AOI_CODE_TYPES, split_on_fixation=True):
+        self.events = EventLog(category_table=category_table)
+        self.split_on_fixation = split_on_fixation
+        self.sample_count = 0
+        self._closed_reported = 0
+        self._open = None  # [start, second, end, end_interval, sum_x, sum_y, code, is_fixation, count]
+        self._last_timestamp = None
+
+    def append(self, timestamp, x, y, aoi_code, is_fixation=True):
+        is_fixation = bool(is_fixation) if self.split_on_fixation else True
+        interval = timestamp - self._last_timestamp if self._last_timestamp is not None else 0.0
+        self._last_timestamp = timestamp
+        self.sample_count += 1
+        event = self._open
+        if event is not None and event[6] == aoi_code and event[7] == is_fixation:
+            if event[8] == 1:
+                event[1] = timestamp
+            event[2] = timestamp
+            event[3] = interval
+            event[4] += x
+            event[5] += y
+            event[8] += 1
+            return
+        if event is not None:
+            self._close(event)
+        self._open = [timestamp, timestamp, timestamp, interval, x, y, aoi_code, is_fixation, 1]
+
+    def extend(self, timestamps, raw_x, raw_y, aoi_codes, fixation_flags=None):
+        append = self.append
+        if fixation_flags is None:
+            for timestamp, x, y, code in zip(timestamps, raw_x, raw_y, aoi_codes):
+                append(timestamp, x, y, code)
+        else:
+            for timestamp, x, y, code, is_fixation in zip(timestamps, raw_x, raw_y, aoi_codes, fixation_flags):
+                append(timestamp, x, y, code, is_fixation)
+
+    def _close(self, event):
+        start, second, end, end_interval, sum_x, sum_y, code, is_fixation, count = event
+        self.events.append(start, second, end, end_interval, sum_x / count, sum_y / count, code, is_fixation, count)
+
+    def pop_closed(self):
+        """Events closed since the last call (e.g. to stream them to the session journal)."""
+        closed = self.events[self._closed_reported:len(self.events)]
+        self._closed_reported = len(self.events)
+        return closed
+
+    def current_log(self):
+        """All events so far, including the one still open (the builder keeps running)."""
+        log = EventLog(capacity=len(self.events) + 1, category_table=self.events.category_table)
+        log.extend(self.events)
+        if self._open is not None:
+            start, second, end, end_interval, sum_x, sum_y, code, is_fixation, count = self._open
+            log.append(start, second, end, end_interval, sum_x / count, sum_y / count, code, is_fixation, count)
+        return log
+
+    def finish(self):
+        """Closes the open event and returns the complete EventLog."""
+        if self._open is not None:
+            self._close(self._open)
+            self._open = None
+        return self.events
+
+
+def report_metric_log(report_data):
+    """The smallest SessionLog that reproduces a report's metrics and timeline.
+
+    That is the event log's metric samples when the report has events, otherwise its raw_log.
+    """
+    event_log = report_data.get("event_log")
+    if event_log is not None and len(event_log):
+        return event_log.to_session_log()
+    return as_session_log(report_data.get("raw_log"))
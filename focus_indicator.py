@@ -0,0 +1,59 @@
+"""Real-time focus indicator of the session overlay."""
+from collections import deque
+
+INDICATOR_IDLE_COLOR = "gray"
+
+INDICATOR_COLORS = {
+    # status: (color before the threshold, color after it)
+    "Productive": ("#90EE90", "green"),
+    "Distraction": ("orange", "red"),
+    "Outside": ("#D3D3D3", "#A9A9A9"),
+}
+FRAGMENTED_COLOR = "yellow"
+
+
+class FocusIndicator:
+    # State machine fed one AOI status per sample; O(1) amortized per update. Rules, in priority order:
+    # fragmented_transitions or more AOI changes within transition_window_s: yellow; otherwise the
+    # status color, switching to its second color once the status lasted longer than its threshold.
+    # The color only changes at a rule boundary, so callers redraw only when it differs.
+    def __init__(self, consistent_focus_s=5.0, significant_distraction_s=3.0, lingering_outside_s=5.0,
+                 transition_window_s=10.0, fragmented_transitions=4):
+        self.thresholds = {"Productive": consistent_focus_s, "Distraction": significant_distraction_s,
+                           "Outside": lingering_outside_s}
+        self.transition_window_s = transition_window_s
+        self.fragmented_transitions = fragmented_transitions
+        self.reset()
+
+    def reset(self, now=0.0, status="Outside"):
+        self.status = status
+        self.status_since = now
+        self.transition_times = deque()
+        self.color = INDICATOR_IDLE_COLOR
+
+    def update(self, aoi_status, now):
+        """Feeds one sample's AOI status at time now (seconds); returns the indicator color."""
+        if aoi_status != self.status:
+            self.status = aoi_status
+            self.status_since = now
+            self.transition_times.append(now)
+
+        # Drop AOI changes that left the window (each one is dropped exactly once)
+        transition_times = self.transition_times
+        while transition_times and now - transition_times[0] >= self.transition_window_s:
+            transition_times.popleft()
+
+        if len(transition_times) >= self.fragmented_transitions:
+            self.color = FRAGMENTED_COLOR
+        elif aoi_status in INDICATOR_COLORS:
+            self.color = INDICATOR_COLORS[aoi_status][now - self.status_since > self.thresholds[aoi_status]]
+        else:
+            self.color = INDICATOR_IDLE_COLOR
+        return self.color
+
+    def update_batch(self, aoi_statuses, timestamps):
+        """Feeds a batch of samples in order; returns the color after the last one."""
+        update = self.update
+        for aoi_status, now in zip(aoi_statuses, timestamps):
+            update(aoi_status, now)
+        return self.color
@@ -0,0 +1,289 @@
+"""Headless FocusFlow tools (python -m focusflow <command> -h)."""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from event_log import report_metric_log
+from metrics_engine import compute_session_log_metrics
+from report_charts import DWELL_PIE_COLORS, draw_attention_timeline, draw_dwell_pie, draw_timeline_small_multiples, draw_trend_chart
+from gaze_server import DEFAULT_GAZEFLOW_PORT, GazeFlowServer, RecordedGazeTrace, SyntheticGazeTrace
+from session_comparison import comparison_table, load_comparison_summaries
+from session_file import DEFAULT_SESSION_DIR, SESSION_FILE_EXTENSION
+from session_library import DEFAULT_LIBRARY_PATH, SORT_COLUMNS, SessionLibrary, days_ago, load_report_file, session_day
+from trends import TREND_METRICS, TREND_PERIODS, trend_series
+
+CHART_BG_COLOR = "#ffffff"
+CHART_TEXT_COLOR = "black"
+CHART_GRID_COLOR = "#cccccc"
+CHART_FONT_SIZE_SMALL = 7
+
+
+def _collect_report_paths(inputs):
+    # Accepts report files, directories of reports and glob patterns
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.json")) + glob.glob(os.path.join(item, f"*{SESSION_FILE_EXTENSION}"))))
+        elif any(ch in item for ch in "*?["):
+            paths.extend(sorted(glob.glob(item)))
+        else:
+            paths.append(item)
+    return paths
+
+
+def _save_figure(fig, path):
+    FigureCanvasAgg(fig)
+    fig.savefig(path, facecolor=CHART_BG_COLOR)
+
+
+def render_report_charts(report_data, output_stem, image_format="png", dpi=90):
+    """Renders the dwell pie and attention timeline of a report; returns the written paths."""
+    fig_pie = Figure(figsize=(4.8, 3.8), dpi=dpi, facecolor=CHART_BG_COLOR)
+    ax_pie = fig_pie.add_subplot(111)
+    pie_colors = draw_dwell_pie(ax_pie, report_data['dwell_times'], CHART_TEXT_COLOR, CHART_BG_COLOR,
+                                "black", CHART_FONT_SIZE_SMALL)
+    ax_pie.set_title('Dwell Time Distribution', color=CHART_TEXT_COLOR)
+    fig_pie.tight_layout(pad=0.5)
+    pie_path = f"{output_stem}_pie.{image_format}"
+    _save_figure(fig_pie, pie_path)
+
+    fig_timeline = Figure(figsize=(5.2, 3.8), dpi=dpi, facecolor=CHART_BG_COLOR)
+    ax_timeline = fig_timeline.add_subplot(111)
+    draw_attention_timeline(ax_timeline, report_metric_log(report_data), pie_colors, CHART_TEXT_COLOR, CHART_GRID_COLOR)
+    ax_timeline.set_title('Attention Timeline', color=CHART_TEXT_COLOR)
+    fig_timeline.tight_layout(pad=0.5)
+    timeline_path = f"{output_stem}_timeline.{image_format}"
+    _save_figure(fig_timeline, timeline_path)
+    return [pie_path, timeline_path]
+
+
+def process_report_file(path, out_dir, image_format="png", write_metrics=True):
+    """Loads one saved report, recomputes its metrics and renders its charts (runs in a worker)."""
+    report_data = load_report_file(path)
+    if "raw_log" not in report_data:
+        raise ValueError("Report file has no raw_log.")
+
+    metrics = compute_session_log_metrics(report_metric_log(report_data))
+    if metrics is None:
+        raise ValueError("Report has fewer than two samples.")
+    report_data.update(metrics)
+
+    output_stem = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0])
+    written = render_report_charts(report_data, output_stem, image_format)
+    if write_metrics:
+        metrics_path = f"{output_stem}_metrics.json"
+        with open(metrics_path, 'w') as f:
+            json.dump(metrics, f, indent=4)
+        written.append(metrics_path)
+    return {"path": path, "outputs": written, "session_duration": metrics["session_duration"],
+            "productive_pct": metrics["dwell_percentages"]["Productive"], "focus_bouts": metrics["focus_bouts"]["count"]}
+
+
+def _process_report_safely(args):
+    path = args[0]
+    try:
+        return process_report_file(*args)
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+
+def run_report_command(args):
+    paths = _collect_report_paths(args.inputs)
+    if not paths:
+        print("No report files found.")
+        return 1
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    jobs = [(path, args.out_dir, args.format, not args.no_metrics) for path in paths]
+    if args.workers == 1 or len(jobs) == 1:
+        failures = _print_results(map(_process_report_safely, jobs))
+    else:
+        workers = args.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            failures = _print_results(executor.map(_process_report_safely, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+    print(f"{len(paths) - failures}/{len(paths)} reports rendered to {args.out_dir}")
+    return 1 if failures else 0
+
+
+def _print_results(results):
+    failures = 0
+    for result in results:
+        if "error" in result:
+            failures += 1
+            print(f"FAILED {result['path']}: {result['error']}")
+        else:
+            print(f"{result['path']}: {result['session_duration']:.1f}s, "
+                  f"{result['productive_pct']:.1f}% productive, {result['focus_bouts']} bouts")
+    return failures
+
+
+def run_library_index_command(args):
+    with SessionLibrary(args.db) as library:
+        for directory in args.directories or [DEFAULT_SESSION_DIR]:
+            indexed, removed = library.index_directory(directory, recursive=args.recursive)
+            print(f"{directory}: {indexed} indexed, {removed} removed")
+        print(f"{library.count()} sessions in {args.db}")
+    return 0
+
+
+def run_library_list_command(args):
+    filters = {"since": days_ago(args.days) if args.days is not None else None, "min_productive": args.min_productive}
+    with SessionLibrary(args.db) as library:
+        total = library.count(**filters)
+        rows = library.query(order_by=args.sort, limit=args.page_size, offset=(args.page - 1) * args.page_size, **filters)
+    for row in rows:
+        print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['started_at']))}  "
+              f"{(row['session_duration'] or 0) / 60:6.1f} min  {row['productive_pct'] or 0:5.1f}% productive  "
+              f"{row['focus_bout_count'] or 0:3d} bouts  {row['path']}")
+    pages = max(1, -(-total // args.page_size))
+    print(f"page {args.page}/{pages}, {total} matching sessions")
+    return 0
+
+
+def render_trend_chart(periods, values, metric, period, path, dpi=90):
+    label = TREND_METRICS[metric][0]
+    fig = Figure(figsize=(8.5, 4.2), dpi=dpi, facecolor=CHART_BG_COLOR)
+    ax = fig.add_subplot(111)
+    draw_trend_chart(ax, periods, values, label, "#5cb85c", CHART_TEXT_COLOR, CHART_GRID_COLOR)
+    ax.set_title(f"{label} per {period}", color=CHART_TEXT_COLOR)
+    fig.tight_layout(pad=0.8)
+    _save_figure(fig, path)
+
+
+def run_trends_command(args):
+    since_day = session_day(days_ago(args.days)) if args.days is not None else None
+    with SessionLibrary(args.db) as library:
+        periods, values = trend_series(library.trend_rollups(args.period, since_day), args.metric)
+    for period, value in zip(periods, values):
+        print(f"{period}  {value:10.2f}")
+    if args.out:
+        render_trend_chart(periods, values, args.metric, args.period, args.out)
+        print(f"Trend chart written to {args.out}")
+    return 0
+
+
+def run_compare_command(args):
+    paths = _collect_report_paths(args.inputs)
+    if len(paths) < 2:
+        print("Need at least two sessions to compare.")
+        return 1
+    summaries = load_comparison_summaries(paths, args.workers)
+    failed = [summary for summary in summaries if "error" in summary]
+    for summary in failed:
+        print(f"FAILED {summary['path']}: {summary['error']}")
+    summaries = [summary for summary in summaries if "error" not in summary]
+    if not summaries:
+        return 1
+
+    names = [summary["name"] for summary in summaries]
+    label_width = max(len(label) for label, _ in comparison_table([]))
+    column_width = max(10, max(len(name) for name in names) + 2)
+    print(" " * label_width + "".join(name.rjust(column_width) for name in names))
+    for label, values in comparison_table(summaries):
+        print(label.ljust(label_width) + "".join(value.rjust(column_width) for value in values))
+
+    if args.out:
+        fig = Figure(figsize=(9, 1.0 + 0.45 * len(summaries)), dpi=90, facecolor=CHART_BG_COLOR)
+        draw_timeline_small_multiples(fig, [summary["timeline"] for summary in summaries], names, DWELL_PIE_COLORS,
+                                      CHART_TEXT_COLOR, CHART_GRID_COLOR)
+        fig.tight_layout(pad=0.5)
+        _save_figure(fig, args.out)
+        print(f"Comparison timelines written to {args.out}")
+    return 1 if failed else 0
+
+
+def run_serve_command(args):
+    if args.replay:
+        trace = RecordedGazeTrace(args.replay)
+        description = f"replaying {args.replay}"
+    else:
+        trace = SyntheticGazeTrace(args.hours * 3600, args.rate, args.seed, dropouts_per_min=args.dropouts_per_min)
+        description = f"synthetic {args.hours:g} h trace at {args.rate:g} Hz"
+    speed = args.speed or None
+    server = GazeFlowServer(trace, args.host, args.port, speed, args.app_key, args.loop).start()
+    host, port = server.address
+    print(f"GazeFlow stand-in listening on {host}:{port}, {description}, "
+          f"{'as fast as the client reads' if speed is None else f'{speed:g}x real time'}. Ctrl+C stops.")
+    try:
+        while not server.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"Sent {server.frames_sent:,} samples over {server.connections} connection(s).")
+    return 0
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="focusflow", description="Headless FocusFlow tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report_parser = subparsers.add_parser("report", help="Recompute metrics and render charts for saved reports")
+    report_parser.add_argument("inputs", nargs="+", help="Report JSON or .ffs session files, directories or glob patterns")
+    report_parser.add_argument("--out-dir", default="reports", help="Directory for the rendered charts (default: reports)")
+    report_parser.add_argument("--format", choices=("png", "svg"), default="png", help="Chart image format")
+    report_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    report_parser.add_argument("--no-metrics", action="store_true", help="Do not write the recomputed metrics JSON")
+    report_parser.set_defaults(handler=run_report_command)
+
+    library_parser = subparsers.add_parser("library", help="Index and query the catalog of saved sessions")
+    library_parser.add_argument("--db", default=DEFAULT_LIBRARY_PATH, help="Catalog database path")
+    library_commands = library_parser.add_subparsers(dest="library_command", required=True)
+    index_parser = library_commands.add_parser("index", help="Incrementally (re-)index directories of saved sessions")
+    index_parser.add_argument("directories", nargs="*", help=f"Directories to index (default: {DEFAULT_SESSION_DIR})")
+    index_parser.add_argument("--recursive", action="store_true", help="Also index subdirectories")
+    index_parser.set_defaults(handler=run_library_index_command)
+    list_parser = library_commands.add_parser("list", help="List indexed sessions, newest first")
+    list_parser.add_argument("--days", type=float, default=None, help="Only sessions started in the last N days")
+    list_parser.add_argument("--min-productive", type=float, default=None, help="Minimum productive percentage")
+    list_parser.add_argument("--sort", choices=SORT_COLUMNS, default="started_at", help="Sort column (descending)")
+    list_parser.add_argument("--page", type=int, default=1)
+    list_parser.add_argument("--page-size", type=int, default=50)
+    list_parser.set_defaults(handler=run_library_list_command)
+
+    trends_parser = subparsers.add_parser("trends", help="Show a metric over time from the library rollups")
+    trends_parser.add_argument("--db", default=DEFAULT_LIBRARY_PATH, help="Catalog database path")
+    trends_parser.add_argument("--metric", choices=TREND_METRICS, default="avg_bout_duration")
+    trends_parser.add_argument("--period", choices=TREND_PERIODS, default="day")
+    trends_parser.add_argument("--days", type=float, default=None, help="Only the last N days")
+    trends_parser.add_argument("--out", default=None, help="Also render the chart to this image file")
+    trends_parser.set_defaults(handler=run_trends_command)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare the metrics and timelines of several sessions")
+    compare_parser.add_argument("inputs", nargs="+", help="Session files, directories or glob patterns")
+    compare_parser.add_argument("--out", default=None, help="Render the timelines as small multiples to this image file")
+    compare_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    compare_parser.set_defaults(handler=run_compare_command)
+
+    serve_parser = subparsers.add_parser("serve", help="Run a local GazeFlow stand-in server (synthetic or recorded gaze)")
+    serve_parser.add_argument("--replay", default=None, help="Stream the samples of this saved session instead")
+    serve_parser.add_argument("--hours", type=float, default=1.0, help="Synthetic trace length")
+    serve_parser.add_argument("--rate", type=float, default=60.0, help="Synthetic sample rate in Hz (max. 1000)")
+    serve_parser.add_argument("--seed", type=int, default=0)
+    serve_parser.add_argument("--dropouts-per-min", type=float, default=0.5, help="Tracker dropouts per minute")
+    serve_parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor; 0 sends as fast as possible")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_GAZEFLOW_PORT)
+    serve_parser.add_argument("--app-key", default=None, help="Only accept this AppKey (default: any)")
+    serve_parser.add_argument("--loop", action="store_true", help="Start the trace over when it ends")
+    serve_parser.set_defaults(handler=run_serve_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
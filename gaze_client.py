@@ -1,5 +1,6 @@
 import socket
-import xml.etree.ElementTree as ET
+import time
+from gaze_decoder import TIMESTAMP_FIELDS, make_gaze_decoder
 
 # Helper to read a 7-bit encoded integer (for string length) from the socket
 def read_7bit_encoded_int(sock):
@@ -65,19 +66,105 @@ def write_length_prefixed_string(sock, s):
     sock.sendall(len_bytes)
     sock.sendall(str_bytes)
 
+class LengthPrefixedFrameReader:
+    # Buffered reader for 7-bit length-prefixed frames.
+    # Receives large chunks into one reusable bytearray with recv_into and parses
+    # lengths and payloads straight out of it, so a single syscall can yield many frames.
+    def __init__(self, sock, buffer_size=65536):
+        self.sock = sock
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0  # First byte not yet parsed
+        self._end = 0    # One past the last byte received
+
+    def _next_frame(self):
+        # Returns the next complete payload as bytes, or None if more data is needed
+        buf = self._buffer
+        pos = self._start
+        end = self._end
+        num = 0
+        shift = 0
+        while True:
+            if pos >= end:
+                return None
+            byte_val = buf[pos]
+            pos += 1
+            num |= (byte_val & 0x7F) << shift
+            shift += 7
+            if (byte_val & 0x80) == 0:
+                break
+            if shift > 35:
+                raise ValueError("Frame length prefix too long, protocol error.")
+        if end - pos < num:
+            # Make sure the whole frame will fit once the rest of it arrives
+            if pos - self._start + num > len(buf):
+                self._grow(pos - self._start + num)
+            return None
+        self._start = pos + num
+        return bytes(self._view[pos:pos + num])
+
+    def _grow(self, min_size):
+        new_buffer = bytearray(max(min_size, len(self._buffer) * 2))
+        pending = self._end - self._start
+        new_buffer[:pending] = self._view[self._start:self._end]
+        self._view.release()
+        self._buffer = new_buffer
+        self._view = memoryview(new_buffer)
+        self._start, self._end = 0, pending
+
+    def _fill(self):
+        # Compact the unparsed tail to the front, then receive into the free space
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif self._end == len(self._buffer):
+            pending = self._end - self._start
+            self._view[:pending] = self._view[self._start:self._end]
+            self._start, self._end = 0, pending
+        received = self.sock.recv_into(self._view[self._end:])
+        if not received:
+            raise ConnectionAbortedError("Socket closed while reading frame")
+        self._end += received
+
+    def read_frame(self):
+        """Returns the next frame payload, receiving only when the buffer runs dry."""
+        while True:
+            frame = self._next_frame()
+            if frame is not None:
+                return frame
+            self._fill()
+
+    def read_frames(self):
+        """Returns every complete frame available, blocking for at most one recv."""
+        frames = []
+        frame = self._next_frame()
+        if frame is None:
+            self._fill()
+            frame = self._next_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = self._next_frame()
+        return frames
+
+
 class GazeFlowClient:
     # Follow instructions from GazePointer API documentation
-    def __init__(self, host="127.0.0.1", port=43333, app_key="AppKeyDemo"):
+    def __init__(self, host="127.0.0.1", port=43333, app_key="AppKeyDemo", decoder=None):
         self.host = host
         self.port = port
         self.app_key = app_key
+        # Any object with decode(xml_bytes) -> dict; see gaze_decoder.py. The tracker Timestamp
+        # is decoded by default so the ingest thread can stamp samples with it (tracker_clock.py).
+        self.decoder = decoder if decoder is not None else make_gaze_decoder("fast", TIMESTAMP_FIELDS)
         self.sock = None
+        self.frame_reader = None
         self.is_connected = False
+        self.perf_stats = None  # perf_stats.PerfStats while instrumentation is on
 
     def connect(self):
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.connect((self.host, self.port))
+            self.frame_reader = LengthPrefixedFrameReader(self.sock)
             print(f"Connected to GazePointer on {self.host}:{self.port}")
 
             # 1. Send ResultFormat ("xml")
@@ -90,7 +177,7 @@ class GazeFlowClient:
             print(f"Sent AppKey: {self.app_key}")
 
             # 3. Receive connectionInfo
-            connection_info = read_length_prefixed_string(self.sock)
+            connection_info = self.frame_reader.read_frame().decode('utf-8')
             print(f"Received connection info: {connection_info}")
 
             if connection_info.startswith("ok"):
@@ -107,57 +194,88 @@ class GazeFlowClient:
             self.disconnect()
             return False
 
+    def _parse_gaze_xml(self, xml_data):
+        # 5. Parse XML data
+        return self.decoder.decode(xml_data)
+
     def receive_gaze_data(self):
         if not self.is_connected or not self.sock:
             return None
         
+        stats = self.perf_stats
         try:
+            if stats: read_start = time.perf_counter()
             # 4. Receive XML data string (length-prefixed)
-            xml_data_str = read_length_prefixed_string(self.sock)
+            xml_data = self.frame_reader.read_frame()
 
-            # 5. Parse XML data
-            if not xml_data_str:
+            if not xml_data:
                 print("Received empty data string, possible disconnect.")
                 self.disconnect()
                 return None
 
-            root = ET.fromstring(xml_data_str)
-            
-            gaze_x_elem = root.find('GazeX')
-            gaze_y_elem = root.find('GazeY')
-            
-            gaze_data = {}
-            if gaze_x_elem is not None and gaze_y_elem is not None:
-                gaze_data['GazeX'] = float(gaze_x_elem.text)
-                gaze_data['GazeY'] = float(gaze_y_elem.text)
-            else:
-                # Handle cases where GazeX/GazeY might be missing
-                print("Warning: GazeX or GazeY not found in XML data.")
-                return None
-
+            if not stats:
+                return self._parse_gaze_xml(xml_data)
+            parse_start = stats.lap("socket_read", read_start)
+            gaze_data = self._parse_gaze_xml(xml_data)
+            stats.lap("xml_parse", parse_start)
             return gaze_data
 
-        except ConnectionAbortedError as e:
+        except OSError as e:
+            # ConnectionAbortedError, resets and reads on a socket closed by another thread
             print(f"Connection aborted while receiving data: {e}")
             self.disconnect()
             return None
-        except ET.ParseError as e:
-            print(f"Error parsing XML data: {e}")
-            print(f"Problematic XML string: '{xml_data_str}'")
-            return None
         except Exception as e:
             print(f"Error receiving or parsing gaze data: {e}")
             return None
 
+    def receive_gaze_batch(self):
+        """Returns the gaze samples from every frame delivered by a single socket read."""
+        if not self.is_connected or not self.sock:
+            return None
+
+        stats = self.perf_stats
+        try:
+            if stats: read_start = time.perf_counter()
+            xml_frames = self.frame_reader.read_frames()
+            if stats: parse_start = stats.lap("socket_read", read_start)
+        except OSError as e:
+            print(f"Connection aborted while receiving data: {e}")
+            self.disconnect()
+            return None
+        except Exception as e:
+            # A framing error leaves the stream out of sync, so there is no way to resume
+            print(f"Error receiving gaze data: {e}")
+            self.disconnect()
+            return None
+
+        gaze_batch = []
+        for xml_data in xml_frames:
+            if not xml_data:
+                print("Received empty data string, possible disconnect.")
+                self.disconnect()
+                break
+            try:
+                gaze_data = self._parse_gaze_xml(xml_data)
+            except Exception as e:
+                print(f"Error parsing gaze data: {e}")
+                continue
+            if gaze_data is not None:
+                gaze_batch.append(gaze_data)
+        if stats: stats.lap("xml_parse", parse_start)
+        return gaze_batch
+
 
     def disconnect(self):
         self.is_connected = False
-        if self.sock:
+        # Detach the socket first; the ingest thread and the UI thread may both call this
+        sock, self.sock = self.sock, None
+        self.frame_reader = None
+        if sock:
             try:
-                self.sock.shutdown(socket.SHUT_RDWR)
+                sock.shutdown(socket.SHUT_RDWR)
             except OSError:
                 pass
             finally:
-                self.sock.close()
-                self.sock = None
+                sock.close()
                 print("Disconnected from GazeFlowAPI.")
\ No newline at end of file
@@ -0,0 +1,115 @@
+import re
+import xml.etree.ElementTree as ET
+
+# Fields GazeFlow sends besides GazeX/GazeY; request them through extra_fields
+HEAD_POSE_FIELDS = ('HeadX', 'HeadY', 'HeadZ', 'HeadYaw', 'HeadPitch', 'HeadRoll')
+TIMESTAMP_FIELDS = ('Timestamp',)
+VALIDITY_FIELDS = ('Valid',)
+ALL_EXTRA_FIELDS = HEAD_POSE_FIELDS + TIMESTAMP_FIELDS + VALIDITY_FIELDS
+MAX_FIELD_PATTERNS = 2  # Up to this many extras are searched for one by one instead of scanning all leaves
+
+
+def _convert_field_value(text):
+    # Numbers become floats, "true"/"false" become bools, anything else stays text
+    try:
+        return float(text)  # float() accepts bytes and surrounding whitespace directly
+    except ValueError:
+        pass
+    if isinstance(text, (bytes, bytearray, memoryview)):
+        text = bytes(text).decode('utf-8')
+    text = text.strip()
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    return text
+
+
+class ElementTreeGazeDecoder:
+    # Reference decoder: builds the full XML tree for every record
+    def __init__(self, extra_fields=()):
+        self.extra_fields = tuple(extra_fields)
+
+    def decode(self, xml_data):
+        try:
+            root = ET.fromstring(bytes(xml_data) if isinstance(xml_data, memoryview) else xml_data)
+        except ET.ParseError as e:
+            print(f"Error parsing XML data: {e}")
+            print(f"Problematic XML string: '{xml_data}'")
+            return None
+
+        gaze_x_elem = root.find('GazeX')
+        gaze_y_elem = root.find('GazeY')
+
+        gaze_data = {}
+        if gaze_x_elem is not None and gaze_y_elem is not None:
+            gaze_data['GazeX'] = float(gaze_x_elem.text)
+            gaze_data['GazeY'] = float(gaze_y_elem.text)
+        else:
+            # Handle cases where GazeX/GazeY might be missing
+            print("Warning: GazeX or GazeY not found in XML data.")
+            return None
+
+        for field_name in self.extra_fields:
+            field_elem = root.find(field_name)
+            if field_elem is not None and field_elem.text is not None:
+                gaze_data[field_name] = _convert_field_value(field_elem.text)
+        return gaze_data
+
+
+class FastGazeDecoder:
+    # Zero-tree decoder for the known GazeFlow record shape.
+    # Precompiled byte patterns pull the values straight out of the receive buffer;
+    # anything they cannot handle is passed to the ElementTree decoder.
+    _GAZE_PATTERN = re.compile(rb"<GazeX>\s*([^<]*?)\s*</GazeX>\s*<GazeY>\s*([^<]*?)\s*</GazeY>")
+    _LEAF_PATTERN = re.compile(rb"<(\w+)>([^<]*)</")
+
+    def __init__(self, extra_fields=()):
+        self.extra_fields = tuple(extra_fields)
+        self._extra_names = {field_name.encode('ascii'): field_name for field_name in self.extra_fields}
+        # A few extras (e.g. just the Timestamp): one precompiled search per field beats a scan over every leaf
+        self._field_patterns = [(field_name, re.compile(rb"<%s>([^<]*)</" % field_name.encode('ascii')))
+                                for field_name in self.extra_fields] if len(self.extra_fields) <= MAX_FIELD_PATTERNS else None
+        self.fallback_decoder = ElementTreeGazeDecoder(extra_fields)
+        self.fallback_count = 0
+
+    def decode(self, xml_data):
+        if isinstance(xml_data, str):
+            xml_data = xml_data.encode('utf-8')
+        match = self._GAZE_PATTERN.search(xml_data)
+        if match is None:
+            return self._fallback(xml_data)
+        try:
+            gaze_data = {'GazeX': float(match.group(1)), 'GazeY': float(match.group(2))}
+        except ValueError:
+            return self._fallback(xml_data)
+
+        if self._field_patterns is not None:
+            for field_name, pattern in self._field_patterns:
+                field_match = pattern.search(xml_data, match.end())
+                if field_match is None:
+                    field_match = pattern.search(xml_data, 0, match.start())
+                if field_match is not None:
+                    gaze_data[field_name] = _convert_field_value(field_match.group(1))
+        elif self._extra_names:
+            # One scan over the leaf elements picks up every requested extra
+            for leaf_name, leaf_text in self._LEAF_PATTERN.findall(xml_data):
+                field_name = self._extra_names.get(leaf_name)
+                if field_name is not None and field_name not in gaze_data:
+                    gaze_data[field_name] = _convert_field_value(leaf_text)
+        return gaze_data
+
+    def _fallback(self, xml_data):
+        self.fallback_count += 1
+        return self.fallback_decoder.decode(xml_data)
+
+
+GAZE_DECODERS = {
+    "fast": FastGazeDecoder,
+    "etree": ElementTreeGazeDecoder,
+}
+
+
+def make_gaze_decoder(name="fast", extra_fields=()):
+    if name not in GAZE_DECODERS:
+        raise ValueError(f"Unknown gaze decoder '{name}'. Choose from: {', '.join(GAZE_DECODERS)}")
+    return GAZE_DECODERS[name](extra_fields)
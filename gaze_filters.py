@@ -0,0 +1,186 @@
+"""Streaming gaze filters that run on the ingest thread, before AOI hit-testing."""
+import math
+
+import numpy as np
+
+NOMINAL_SAMPLE_RATE_HZ = 60.0  # Used when consecutive samples share a timestamp (one socket read)
+
+
+def _sample_dt(timestamp, last_timestamp, nominal_dt):
+    if last_timestamp is None:
+        return nominal_dt
+    dt = timestamp - last_timestamp
+    return dt if dt > 0 else nominal_dt
+
+
+# --- Smoothers ---
+
+class ExponentialSmoother:
+    # Plain exponential moving average; alpha=1 passes samples through unchanged
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._y = None
+
+    def smooth(self, timestamp, x, y):
+        if self._x is None:
+            self._x, self._y = x, y
+        else:
+            alpha = self.alpha
+            self._x += alpha * (x - self._x)
+            self._y += alpha * (y - self._y)
+        return self._x, self._y
+
+
+class OneEuroFilter:
+    # One Euro filter (Casiez et al. 2012): strong smoothing while the gaze rests, little lag when it moves.
+    # min_cutoff (Hz) sets the jitter reduction at rest, beta how fast the cutoff rises with speed (px/s).
+    def __init__(self, min_cutoff=0.5, beta=0.007, d_cutoff=1.0, nominal_rate_hz=NOMINAL_SAMPLE_RATE_HZ):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.nominal_dt = 1.0 / nominal_rate_hz
+        self.reset()
+
+    def reset(self):
+        self._last_timestamp = None
+        self._x = self._y = None
+        self._dx = self._dy = 0.0
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def smooth(self, timestamp, x, y):
+        if self._x is None:
+            self._last_timestamp, self._x, self._y = timestamp, x, y
+            return x, y
+        dt = _sample_dt(timestamp, self._last_timestamp, self.nominal_dt)
+        self._last_timestamp = timestamp
+
+        # Smoothed speed drives the cutoff of the position filter
+        alpha_d = self._alpha(self.d_cutoff, dt)
+        self._dx += alpha_d * ((x - self._x) / dt - self._dx)
+        self._dy += alpha_d * ((y - self._y) / dt - self._dy)
+        cutoff = self.min_cutoff + self.beta * math.hypot(self._dx, self._dy)
+        alpha = self._alpha(cutoff, dt)
+        self._x += alpha * (x - self._x)
+        self._y += alpha * (y - self._y)
+        return self._x, self._y
+
+
+# --- Fixation detectors ---
+
+class VelocityThresholdDetector:
+    # I-VT: a sample is part of a fixation while the point-to-point speed stays below the threshold (px/s).
+    # The default is set for webcam trackers, whose jitter alone reaches ~1500 px/s at 60 Hz.
+    def __init__(self, velocity_threshold=2500.0, nominal_rate_hz=NOMINAL_SAMPLE_RATE_HZ):
+        self.velocity_threshold = velocity_threshold
+        self.nominal_dt = 1.0 / nominal_rate_hz
+        self.reset()
+
+    def reset(self):
+        self._last = None
+
+    def is_fixation(self, timestamp, x, y):
+        last = self._last
+        self._last = (timestamp, x, y)
+        if last is None:
+            return True
+        dt = _sample_dt(timestamp, last[0], self.nominal_dt)
+        return math.hypot(x - last[1], y - last[2]) <= self.velocity_threshold * dt
+
+
+class DispersionThresholdDetector:
+    # Streaming I-DT: a fixation is a run of samples whose bounding box (width + height) stays within
+    # max_dispersion px for at least min_duration_s. The window only grows until the dispersion is
+    # exceeded and then restarts at the current sample, so the running min/max make each step O(1).
+    # Labels are not revised afterwards: the first min_duration_s of a fixation are reported as saccade.
+    def __init__(self, max_dispersion=150.0, min_duration_s=0.1):
+        self.max_dispersion = max_dispersion
+        self.min_duration_s = min_duration_s
+        self.reset()
+
+    def reset(self):
+        self._start_time = None
+        self._min_x = self._max_x = self._min_y = self._max_y = 0.0
+
+    def is_fixation(self, timestamp, x, y):
+        if self._start_time is None:
+            self._restart(timestamp, x, y)
+            return False
+        min_x, max_x = min(self._min_x, x), max(self._max_x, x)
+        min_y, max_y = min(self._min_y, y), max(self._max_y, y)
+        if (max_x - min_x) + (max_y - min_y) > self.max_dispersion:
+            self._restart(timestamp, x, y)
+            return False
+        self._min_x, self._max_x, self._min_y, self._max_y = min_x, max_x, min_y, max_y
+        return timestamp - self._start_time >= self.min_duration_s
+
+    def _restart(self, timestamp, x, y):
+        self._start_time = timestamp
+        self._min_x = self._max_x = x
+        self._min_y = self._max_y = y
+
+
+GAZE_SMOOTHERS = {
+    "none": None,
+    "ema": ExponentialSmoother,
+    "one_euro": OneEuroFilter,
+}
+
+FIXATION_DETECTORS = {
+    "none": None,
+    "ivt": VelocityThresholdDetector,
+    "idt": DispersionThresholdDetector,
+}
+
+
+class GazeFilterPipeline:
+    # Smoother then fixation detector; either stage may be None. process() returns the filtered
+    # position and whether the sample belongs to a fixation (True) or a saccade (False).
+    def __init__(self, smoother=None, detector=None):
+        self.smoother = smoother
+        self.detector = detector
+
+    def reset(self):
+        for stage in (self.smoother, self.detector):
+            if stage is not None:
+                stage.reset()
+
+    def process(self, timestamp, x, y):
+        """Returns (x, y, is_fixation) for one sample."""
+        if self.smoother is not None:
+            x, y = self.smoother.smooth(timestamp, x, y)
+        is_fixation = self.detector.is_fixation(timestamp, x, y) if self.detector is not None else True
+        return x, y, is_fixation
+
+
+def make_gaze_filter(smoothing="none", detector="none"):
+    """Builds a GazeFilterPipeline from GAZE_SMOOTHERS/FIXATION_DETECTORS names (None if both are "none")."""
+    if smoothing not in GAZE_SMOOTHERS:
+        raise ValueError(f"Unknown gaze smoothing '{smoothing}'. Choose from: {', '.join(GAZE_SMOOTHERS)}")
+    if detector not in FIXATION_DETECTORS:
+        raise ValueError(f"Unknown fixation detector '{detector}'. Choose from: {', '.join(FIXATION_DETECTORS)}")
+    smoother_class, detector_class = GAZE_SMOOTHERS[smoothing], FIXATION_DETECTORS[detector]
+    if smoother_class is None and detector_class is None:
+        return None
+    return GazeFilterPipeline(smoother_class() if smoother_class else None, detector_class() if detector_class else None)
+
+
+def hold_fixation_codes(aoi_codes, fixation_mask, initial_code):
+    """Replaces the AOI code of every saccade sample with the code of the last fixation sample before it.
+
+    Samples before the first fixation get initial_code. Works on whole arrays, so metrics
+    can be computed on fixations only: compute_session_metrics(t, hold_fixation_codes(...)).
+    """
+    codes = np.asarray(aoi_codes)
+    fixation_mask = np.asarray(fixation_mask, dtype=bool)
+    last_fixation = np.where(fixation_mask, np.arange(len(codes)), -1)
+    np.maximum.accumulate(last_fixation, out=last_fixation)
+    held = np.where(last_fixation >= 0, codes[np.maximum(last_fixation, 0)], initial_code)
+    return held.astype(codes.dtype, copy=False)
@@ -0,0 +1,200 @@
+import random
+import threading
+import time
+
+from tracker_clock import HostClock
+
+# Sample tuple layout pushed into the ring buffer: (sample_time, gaze_x, gaze_y, is_fixation)
+SAMPLE_TIME, SAMPLE_X, SAMPLE_Y, SAMPLE_FIXATION = 0, 1, 2, 3
+MAX_SAMPLE_SPACING_S = 0.1  # Samples of one read are never spread further apart than this (10 Hz)
+
+
+def gap_marker(gap_start):
+    """A ring buffer entry saying no samples arrive from gap_start until the next sample."""
+    return (gap_start, float("nan"), float("nan"), None)
+
+
+def is_gap_marker(sample):
+    return sample[SAMPLE_FIXATION] is None
+
+
+def batch_sample_spacing(previous_receive_time, receive_time, count, sample_period=0.0):
+    """Spacing that spreads count samples of one socket read evenly back towards the previous read.
+
+    Never less than sample_period (the tracker's nominal one): a read that delivers samples
+    faster than the tracker takes them (an accelerated replay) does not squeeze them together.
+    """
+    if count < 1:
+        return sample_period
+    window = min(receive_time - previous_receive_time, count * MAX_SAMPLE_SPACING_S)
+    return max(window / count, sample_period)
+
+
+class ReconnectBackoff:
+    # Exponential backoff between reconnect attempts: initial_s, multiplied by factor after
+    # each failure up to max_s, each delay randomized by +/- jitter (a fraction).
+    # max_attempts=None keeps trying until the ingest thread is stopped.
+    def __init__(self, initial_s=0.5, max_s=30.0, factor=2.0, jitter=0.1, max_attempts=None):
+        self.initial_s = initial_s
+        self.max_s = max_s
+        self.factor = factor
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+
+    def delays(self):
+        delay, attempt = self.initial_s, 0
+        while self.max_attempts is None or attempt < self.max_attempts:
+            yield delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+            delay = min(delay * self.factor, self.max_s)
+            attempt += 1
+
+
+class GazeRingBuffer:
+    # Bounded single-producer/single-consumer ring buffer.
+    # Only the reader thread advances write_index and only the UI thread advances
+    # read_index, so neither side needs a lock (each index has exactly one writer).
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._write_index = 0
+        self._read_index = 0
+        self.dropped_count = 0
+        self.gap_count = 0  # Gap markers pushed so far; lets the consumer skip scanning for them
+
+    def __len__(self):
+        return self._write_index - self._read_index
+
+    def push(self, sample):
+        write_index = self._write_index
+        if write_index - self._read_index >= self.capacity:
+            # Buffer full: drop the incoming sample instead of overwriting a slot
+            # the consumer may be reading right now.
+            self.dropped_count += 1
+            return False
+        self._slots[write_index % self.capacity] = sample
+        self._write_index = write_index + 1  # Publish only after the slot is filled
+        return True
+
+    def push_gap(self, gap_start):
+        """Pushes a gap marker (see gap_marker) and counts it."""
+        if self.push(gap_marker(gap_start)):
+            self.gap_count += 1  # Counted only after the marker is published
+
+    def drain(self, max_items=None):
+        """Returns every sample pushed since the last drain (oldest first)."""
+        read_index = self._read_index
+        end_index = self._write_index
+        if max_items is not None:
+            end_index = min(end_index, read_index + max_items)
+        if end_index == read_index:
+            return []
+
+        start = read_index % self.capacity
+        stop = end_index % self.capacity
+        if start < stop:
+            samples = self._slots[start:stop]
+        else:
+            samples = self._slots[start:] + self._slots[:stop]
+        self._read_index = end_index
+        return samples
+
+    def clear(self):
+        self._read_index = self._write_index
+
+
+class GazeIngestThread(threading.Thread):
+    # Drains the GazeFlow socket at full tracker rate so the Tk loop never blocks on recv.
+    # An optional gaze_filter (gaze_filters.GazeFilterPipeline) smooths and tags each sample here.
+    # With a perf_stats.PerfStats, the filter stage and the received samples are counted.
+    # With a ReconnectBackoff, a lost connection is re-established here (off the UI thread):
+    # a gap marker starting at the last sample time goes into the ring buffer, then connect()
+    # is retried with backoff until it succeeds, the attempts run out or the thread is stopped.
+    # With a tracker_clock.TrackerClock, samples whose record has a Timestamp are stamped with
+    # it (mapped to host time). Other samples of one socket read are spread evenly between the
+    # previous read and the HostClock time this one returned (the last sample at that time),
+    # so each keeps its own duration in the metrics. With a sample_period (seconds) they are never
+    # spread closer together than that; samples that would then go back past the previous stamp
+    # share it, and the filters fall back to their nominal dt for them.
+    def __init__(self, gaze_client, ring_buffer=None, gaze_filter=None, perf_stats=None, reconnect=None,
+                 tracker_clock=None, sample_period=None):
+        super().__init__(name="GazeIngestThread", daemon=True)
+        self.gaze_client = gaze_client
+        self.ring_buffer = ring_buffer if ring_buffer is not None else GazeRingBuffer()
+        self.gaze_filter = gaze_filter
+        self.perf_stats = perf_stats
+        self.reconnect = reconnect
+        self.reconnect_attempts = 0  # Failed and successful connect() calls since the last loss
+        self.reconnect_count = 0
+        self.tracker_clock = tracker_clock
+        self.sample_period = sample_period or 0.0
+        self.host_clock = HostClock()
+        self.last_sample_time = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while True:
+            self._receive_until_disconnected()
+            if self._stop_event.is_set() or self.reconnect is None:
+                break
+            if self.last_sample_time is not None:
+                self.ring_buffer.push_gap(self.last_sample_time)
+            if not self._reconnect():
+                break
+
+    def _reconnect(self):
+        self.reconnect_attempts = 0
+        for delay in self.reconnect.delays():
+            if self._stop_event.wait(delay):
+                return False
+            self.reconnect_attempts += 1
+            if self.gaze_client.connect():
+                if self._stop_event.is_set():
+                    self.gaze_client.disconnect()  # stop() raced with connect()
+                    return False
+                if self.gaze_filter is not None:
+                    self.gaze_filter.reset()  # Do not smooth across the gap
+                if self.tracker_clock is not None:
+                    self.tracker_clock.reset()  # The tracker may have restarted its clock
+                self.reconnect_count += 1
+                return True
+        return False
+
+    def _receive_until_disconnected(self):
+        previous_receive_time = self.host_clock.now()
+        while not self._stop_event.is_set():
+            # One socket read can deliver several frames when the tracker runs ahead of us
+            gaze_batch = self.gaze_client.receive_gaze_batch()
+            receive_time = self.host_clock.now()
+            if gaze_batch is None:
+                break  # Socket closed or connection lost
+            push, gaze_filter, stats = self.ring_buffer.push, self.gaze_filter, self.perf_stats
+            to_host = self.tracker_clock.to_host if self.tracker_clock is not None else None
+            if stats: filter_start = time.perf_counter()
+            spacing = batch_sample_spacing(previous_receive_time, receive_time, len(gaze_batch), self.sample_period)
+            earliest = self.last_sample_time if self.last_sample_time is not None else float("-inf")
+            sample_time = receive_time
+            for index, gaze_data in enumerate(gaze_batch, 1 - len(gaze_batch)):
+                sample_time = max(receive_time + index * spacing, earliest)
+                if to_host is not None:
+                    tracker_timestamp = gaze_data.get('Timestamp')
+                    if tracker_timestamp is not None:
+                        sample_time = to_host(tracker_timestamp, receive_time)
+                if gaze_filter is None:
+                    push((sample_time, gaze_data['GazeX'], gaze_data['GazeY'], True))
+                else:
+                    push((sample_time, *gaze_filter.process(sample_time, gaze_data['GazeX'], gaze_data['GazeY'])))
+            if stats:
+                stats.lap("filter", filter_start)
+                stats.samples.add(len(gaze_batch))
+            if gaze_batch:
+                self.last_sample_time = sample_time
+                previous_receive_time = receive_time
+            if not self.gaze_client.is_connected:
+                break
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        # Closing the socket unblocks the pending recv in run()
+        self.gaze_client.disconnect()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
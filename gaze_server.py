@@ -0,0 +1,221 @@
+"""Local stand-in for the GazePointer GazeFlow API server, streaming synthetic or recorded gaze traces."""
+import math
+import socket
+import threading
+import time
+
+import numpy as np
+
+from aoi_index import GAP_AOI_TYPE
+from gaze_client import get_7bit_encoded_int_bytes, read_length_prefixed_string, write_length_prefixed_string
+
+DEFAULT_GAZEFLOW_PORT = 43333
+RESULT_FORMAT = b"xml"
+MAX_SEND_BATCH = 4096  # Samples per sendall() when not pacing
+HANDSHAKE_TIMEOUT_S = 5.0
+
+
+def encode_gaze_frame(timestamp, x, y):
+    """One length-prefixed GazeFlow XML record (Timestamp in tracker milliseconds)."""
+    record = (f"<GazeData><GazeX>{x:.2f}</GazeX><GazeY>{y:.2f}</GazeY>"
+              f"<Timestamp>{timestamp * 1000:.3f}</Timestamp></GazeData>").encode('ascii')
+    return get_7bit_encoded_int_bytes(len(record)) + record
+
+
+class SyntheticGazeTrace:
+    # Fixations at random screen targets joined by linear saccades, Gaussian jitter, and
+    # dropouts (stretches without samples, as when the tracker loses the face).
+    def __init__(self, duration_s, rate_hz=60.0, seed=0, screen_size=(1920, 1080), jitter_px=25.0,
+                 fixation_s=(0.2, 1.5), saccade_s=0.05, dropouts_per_min=0.5, dropout_s=(0.2, 3.0), chunk_s=60.0):
+        if not 0 < rate_hz <= 1000:
+            raise ValueError("rate_hz must be in (0, 1000].")
+        self.duration_s = duration_s
+        self.rate_hz = rate_hz
+        self.seed = seed
+        self.screen_size = screen_size
+        self.jitter_px = jitter_px
+        self.fixation_s = fixation_s
+        self.saccade_s = saccade_s
+        self.dropouts_per_min = dropouts_per_min
+        self.dropout_s = dropout_s
+        self.chunk_s = chunk_s
+
+    def chunks(self):
+        rng = np.random.default_rng(self.seed)
+        width, height = self.screen_size
+        sample_count = int(self.duration_s * self.rate_hz)
+        chunk_samples = max(1, int(self.chunk_s * self.rate_hz))
+        # Path keypoints (time, x, y): constant during a fixation, linear during a saccade
+        key_t, key_x, key_y = [0.0], [rng.uniform(0, width)], [rng.uniform(0, height)]
+        dropouts = []  # (start, end) of dropouts ahead of the current chunk
+        next_dropout = self._next_dropout_gap(rng)
+        for chunk_start in range(0, sample_count, chunk_samples):
+            timestamps = np.arange(chunk_start, min(chunk_start + chunk_samples, sample_count)) / self.rate_hz
+            chunk_end = timestamps[-1]
+            while key_t[-1] <= chunk_end:
+                fixation_end = key_t[-1] + rng.uniform(*self.fixation_s)
+                key_t += [fixation_end, fixation_end + self.saccade_s]
+                key_x += [key_x[-1], rng.uniform(0, width)]
+                key_y += [key_y[-1], rng.uniform(0, height)]
+            while next_dropout <= chunk_end:
+                dropout_end = next_dropout + rng.uniform(*self.dropout_s)
+                dropouts.append((next_dropout, dropout_end))
+                next_dropout = dropout_end + self._next_dropout_gap(rng)
+
+            xs = np.interp(timestamps, key_t, key_x) + rng.normal(0, self.jitter_px, len(timestamps))
+            ys = np.interp(timestamps, key_t, key_y) + rng.normal(0, self.jitter_px, len(timestamps))
+            keep = np.ones(len(timestamps), dtype=bool)
+            for dropout_start, dropout_end in dropouts:
+                keep &= (timestamps < dropout_start) | (timestamps >= dropout_end)
+            # Keep only what later chunks still need
+            dropouts = [(start, end) for start, end in dropouts if end > chunk_end]
+            del key_t[:-2], key_x[:-2], key_y[:-2]
+            yield timestamps[keep], np.clip(xs[keep], 0, width - 1), np.clip(ys[keep], 0, height - 1)
+
+    def _next_dropout_gap(self, rng):
+        if not self.dropouts_per_min:
+            return math.inf
+        return rng.exponential(60.0 / self.dropouts_per_min)
+
+
+class RecordedGazeTrace:
+    # Replays the samples of a saved .ffs or JSON session report. Tracking gaps (gap markers, or
+    # samples without coordinates) are not sent: the stream pauses there, as it did when recorded.
+    def __init__(self, path, chunk_samples=65536):
+        self.path = path
+        self.chunk_samples = chunk_samples
+
+    def chunks(self):
+        from session_library import load_report_file
+        log = load_report_file(self.path)["raw_log"]
+        timestamps = np.asarray(log.timestamps, dtype=np.float64)
+        if len(timestamps):
+            timestamps = timestamps - timestamps[0]
+        xs, ys = np.asarray(log.raw_x), np.asarray(log.raw_y)
+        keep = np.isfinite(xs) & np.isfinite(ys)
+        if GAP_AOI_TYPE in log.category_table:
+            keep &= np.asarray(log.aoi_codes) != log.category_table.index(GAP_AOI_TYPE)
+        for start in range(0, len(log), self.chunk_samples):
+            chunk = slice(start, start + self.chunk_samples)
+            chunk_keep = keep[chunk]
+            yield timestamps[chunk][chunk_keep], xs[chunk][chunk_keep], ys[chunk][chunk_keep]
+
+
+class GazeFlowServer:
+    # Serves one trace per client connection on a background thread; use as a context manager.
+    # Speaks the handshake GazeFlowClient.connect expects, then streams one length-prefixed
+    # <GazeData> record per sample. speed=1 replays in real time, speed=None as fast as the client reads.
+    def __init__(self, trace, host="127.0.0.1", port=0, speed=1.0, app_key=None, loop=False):
+        self.trace = trace
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.app_key = app_key  # None accepts any AppKey
+        self.loop = loop
+        self.frames_sent = 0
+        self.connections = 0
+        self._listener = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def address(self):
+        return self._listener.getsockname()[:2] if self._listener else (self.host, self.port)
+
+    def start(self):
+        self._listener = socket.create_server((self.host, self.port))
+        self._listener.settimeout(0.2)
+        self._thread = threading.Thread(target=self._accept_loop, name="GazeFlowServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._listener:
+            self._listener.close()
+            self._listener = None
+
+    def wait(self, timeout=None):
+        """Blocks until the server stops (or timeout seconds pass); returns True if it stopped."""
+        if self._thread:
+            self._thread.join(timeout)
+        return self._thread is None or not self._thread.is_alive()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _accept_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.connections += 1
+            # One client at a time, like GazePointer's local API
+            with conn:
+                try:
+                    conn.settimeout(HANDSHAKE_TIMEOUT_S)
+                    if self._handshake(conn):
+                        conn.settimeout(None)
+                        self._stream(conn)
+                except OSError:
+                    pass  # Client went away
+
+    def _handshake(self, conn):
+        result_format = b""
+        while len(result_format) < len(RESULT_FORMAT):
+            chunk = conn.recv(len(RESULT_FORMAT) - len(result_format))
+            if not chunk:
+                return False
+            result_format += chunk
+        app_key = read_length_prefixed_string(conn)
+        if result_format != RESULT_FORMAT:
+            write_length_prefixed_string(conn, f"error: unsupported result format {result_format!r}")
+            return False
+        if self.app_key is not None and app_key != self.app_key:
+            write_length_prefixed_string(conn, "error: invalid AppKey")
+            return False
+        write_length_prefixed_string(conn, "ok FocusFlow GazeFlow stand-in")
+        return True
+
+    def _stream(self, conn):
+        start = time.monotonic()
+        offset = 0.0  # Trace time at which the current pass started (for loop=True)
+        while not self._stop_event.is_set():
+            last_timestamp = 0.0
+            for timestamps, xs, ys in self.trace.chunks():
+                if len(timestamps):
+                    last_timestamp = timestamps[-1]
+                self._send_chunk(conn, timestamps + offset, xs, ys, start)
+                if self._stop_event.is_set():
+                    return
+            if not self.loop:
+                break
+            offset += last_timestamp + (1.0 / getattr(self.trace, "rate_hz", 60.0))
+        conn.shutdown(socket.SHUT_RDWR)
+
+    def _send_chunk(self, conn, timestamps, xs, ys, start):
+        i, count = 0, len(timestamps)
+        timestamp_list, x_list, y_list = timestamps.tolist(), xs.tolist(), ys.tolist()
+        while i < count and not self._stop_event.is_set():
+            if self.speed:
+                # Everything due by now (in trace time) goes out in one send
+                trace_now = (time.monotonic() - start) * self.speed
+                j = int(np.searchsorted(timestamps, trace_now, side='right'))
+                if j <= i:
+                    time.sleep(min((timestamp_list[i] - trace_now) / self.speed, 0.005))
+                    continue
+                j = min(j, i + MAX_SEND_BATCH)
+            else:
+                j = min(count, i + MAX_SEND_BATCH)
+            conn.sendall(b"".join([encode_gaze_frame(t, x, y)
+                                   for t, x, y in zip(timestamp_list[i:j], x_list[i:j], y_list[i:j])]))
+            self.frames_sent += j - i
+            i = j
@@ -3,10 +3,26 @@ import tkinter as tk
 from tkinter import ttk, simpledialog, filedialog
 import json
 import os
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import sqlite3
+import threading
+from app_assets import load_chart_modules, load_logo_image, prewarm_chart_modules
 from gaze_client import GazeFlowClient
-from PIL import Image, ImageTk
+from event_log import EventLogBuilder, report_metric_log
+from focus_indicator import INDICATOR_IDLE_COLOR, FocusIndicator
+from gaze_filters import NOMINAL_SAMPLE_RATE_HZ, hold_fixation_codes, make_gaze_filter
+from gaze_ingest import SAMPLE_TIME, GazeIngestThread, GazeRingBuffer, ReconnectBackoff, is_gap_marker
+from aoi_index import AOIIndex, AOI_CODE_TYPES, AOI_TYPE_CODES, GAP_AOI_TYPE
+from metrics_engine import StreamingSessionMetrics, compute_session_log_metrics
+from session_file import DEFAULT_SESSION_DIR, SESSION_FILE_EXTENSION, write_session_file
+from session_journal import SessionJournal, recover_unfinished_sessions
+from session_library import SessionLibrary, days_ago, load_report_file, session_day
+from session_log import SessionLog, report_summary, report_to_json_dict
+from preview_renderer import PreviewRenderer
+from perf_stats import PERF_STATS_EXTENSION, PerfStats, RateCounter
+from tracker_clock import TrackerClock
+from report_charts import DWELL_PIE_COLORS
+from session_comparison import COMPARISON_METRICS, comparison_summary, comparison_table, load_comparison_summaries
+from trends import TREND_METRICS, TREND_PERIODS, trend_series
 
 class FocusFlowApp:
     def __init__(self, root_window):
@@ -32,36 +48,102 @@ class FocusFlowApp:
         self.show_landing_page()
 
         self.gz_client = GazeFlowClient()
+        self.gaze_ring_buffer = GazeRingBuffer()
+        self.gaze_ingest_thread = None
         self.is_tracking_connection = False
         self.after_id_gaze_update = None
         self.after_id_session_timer = None
 
         self.aoi_list = []
+        self.aoi_index = AOIIndex(self.aoi_list)
         self.temp_aoi_points = []
         self.defining_aoi_type_transparent = None
         self.temp_rect_drawing_id = None
 
         self.session_active = False
-        self.session_data_log = []
+        self.session_data_log = SessionLog()
         self.session_start_time = None
         self.session_elapsed_time_str = tk.StringVar(value="00:00:00")
+        self.session_metrics = None
+        self.session_event_builder = None
+        self.session_journal = None
+        self.session_live_metrics_str = tk.StringVar(value="")
+        self.session_gap_open = True # No sample logged since the session started or the last gap marker
+        self.last_session_sample_time = None
 
         self.current_report_data = None
+        self.session_library = None
+        self.library_window = None
+        self.trends_window = None
+        self.comparison_window = None
+        self.MAX_COMPARISON_TIMELINES = 20
+        self.LIBRARY_PAGE_SIZE = 50
         
-        # --- State for advanced real-time indicator ---
+        # --- Real-time focus indicator (see focus_indicator.py) ---
         # Thresholds (in seconds)
         self.CONSISTENT_FOCUS_THRESHOLD = 5.0
         self.SIGNIFICANT_DISTRACTION_THRESHOLD = 3.0
-        # State tracking variables
-        self.last_aoi_type_for_indicator = "Outside"
-        self.time_in_current_aoi = 0.0
-        self.last_aoi_change_time = time.time()
-        self.indicator_transition_times = []
+        self.LINGERING_OUTSIDE_THRESHOLD = 5.0
+        self.INDICATOR_TRANSITION_WINDOW_S = 10.0
+        self.FRAGMENTED_TRANSITION_COUNT = 4 # AOI changes within the window that turn the indicator yellow
+        self.focus_indicator = self._make_focus_indicator()
+        self.overlay_indicator_color = INDICATOR_IDLE_COLOR # Color currently on the overlay canvas
+
+        # --- Gaze filtering on the ingest thread (see gaze_filters.py); off by default, so sessions
+        # log the raw hit test like earlier reports ---
+        self.GAZE_SMOOTHING = "none" # "none", "ema" or "one_euro"
+        self.FIXATION_DETECTOR = "none" # "none", "ivt" or "idt"
+        self.HOLD_AOI_DURING_SACCADES = False # Saccade samples keep the AOI of the last fixation (needs a detector)
+        self.last_fixation_aoi_code = AOI_TYPE_CODES["Outside"]
+
+        # --- Connection supervision and tracking gaps (see gaze_ingest.py, metrics_engine.py) ---
+        self.RECONNECT_INITIAL_S = 0.5 # First delay before reconnecting; doubles after each failed attempt
+        self.RECONNECT_MAX_S = 30.0
+        self.RECONNECT_MAX_ATTEMPTS = None # None keeps retrying until the user disconnects
+        self.GAP_AFTER_S = 1.0 # No samples for this long during a session is logged as a tracking gap
+        self.seen_gap_markers = 0
+        self.reconnect_status_shown = None # Reconnect attempt shown on the status line
+        self.USE_TRACKER_TIMESTAMPS = True # Stamp samples with the tracker's Timestamp (drift-corrected, see tracker_clock.py)
+        self.TRACKER_RATE_HZ = NOMINAL_SAMPLE_RATE_HZ # Samples without a Timestamp are stamped at most this often
+
+        # --- Session event log (fixation / AOI-dwell events, see event_log.py) ---
+        self.KEEP_RAW_SAMPLES = True # False stores only the events; metrics and timeline stay the same
+        self.SPLIT_EVENTS_ON_FIXATION = True # False collapses whole AOI dwells into one event
+
+        # --- Preview rendering (see preview_renderer.py) ---
+        self.UI_TICK_MS = 30 # How often samples are drained from the ingest thread
+        self.PREVIEW_MAX_FPS = 24.0 # Preview redraws per second, at most
+        self.PREVIEW_MIN_MOVE_PX = 1.0 # Smaller gaze dot movements are not redrawn
+        self.SHOW_RENDER_STATS = False # Append Tk calls per second to the preview status line
+        self.tk_call_counter = RateCounter()
+
+        # --- Hot-path instrumentation (see perf_stats.py) ---
+        self.PERF_INSTRUMENTATION = False # Time the gaze path stages; when off this costs one branch per read and tick
+        self.SHOW_PERF_HUD = False # Show the stats on the session overlay (right-click the overlay to toggle)
+        self.SAVE_PERF_STATS = True # Write the stats next to the session file when instrumentation is on
+        self.LATE_SAMPLE_S = 0.1 # Samples older than this when drained count as late
+        self.perf_hud_str = tk.StringVar(value="")
+        self.perf_hud_label = None
+        self.perf_stats = None
+        if self.PERF_INSTRUMENTATION or self.SHOW_PERF_HUD:
+            self._set_perf_stats(self._make_perf_stats())
+
+        self.CHART_PREWARM_DELAY_MS = 500 # Delay after startup before matplotlib is imported in the background
+
+        # --- Session journal (samples are streamed to disk while tracking) ---
+        self.JOURNAL_FLUSH_INTERVAL_S = 1.0 # At most this much data is lost on a crash
+        self.JOURNAL_FLUSH_SAMPLES = 1024
+        self.JOURNAL_FSYNC_POLICY = "close" # "never", "close" or "flush" (fsync every flush)
 
         self.root_window.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.root_window.grid_rowconfigure(0, weight=1)
         self.root_window.grid_columnconfigure(0, weight=1)
 
+        self._recover_unfinished_sessions()
+        self._open_session_library()
+        # Import matplotlib in the background once the landing page is up
+        self.root_window.after(self.CHART_PREWARM_DELAY_MS, prewarm_chart_modules)
+
     def _setup_styles(self):
         self.style = ttk.Style()
 
@@ -98,6 +180,7 @@ class FocusFlowApp:
         self.style.configure("ReportHeader.TLabel", font=self.report_header_font)
         self.style.configure("SessionOverlay.TFrame", background="#2c3e50")
         self.style.configure("SessionOverlay.TLabel", font=self.overlay_font, foreground="white", background="#2c3e50")
+        self.style.configure("SessionOverlayHUD.TLabel", font=self.status_font, foreground="#bdc3c7", background="#2c3e50")
 
     def _setup_landing_page(self):
         self.landing_frame.grid_columnconfigure(0, weight=1)
@@ -106,13 +189,7 @@ class FocusFlowApp:
         content_frame = ttk.Frame(self.landing_frame)
         content_frame.grid(row=1, column=0, rowspan=2)
         try:
-            logo_path = os.path.join(os.path.dirname(__file__), "logo.png")
-            img = Image.open(logo_path)
-            max_width = 200
-            max_height = 100
-            img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-
-            self.logo_photo_image = ImageTk.PhotoImage(img)
+            self.logo_photo_image = load_logo_image((200, 100))
             logo_label = ttk.Label(content_frame, image=self.logo_photo_image)
             logo_label.pack(pady=(20,10))
         except FileNotFoundError:
@@ -152,14 +229,17 @@ class FocusFlowApp:
 
         self.canvas_aoi_preview = tk.Canvas(self.canvas_aspect_frame, bg="lightgray", highlightthickness=0)
         self.canvas_aoi_preview.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
-        self.gaze_dot_preview = self.canvas_aoi_preview.create_oval(0,0,0,0, fill="#3498db", outline="#2980b9", width=2)
+        self.preview_renderer = PreviewRenderer(self.canvas_aoi_preview, self.actual_screen_width, self.actual_screen_height,
+                                                (self.default_font[0], 8, "bold"), self.PREVIEW_MAX_FPS,
+                                                self.PREVIEW_MIN_MOVE_PX, self.tk_call_counter)
+        self.canvas_aoi_preview.bind("<Configure>", self.preview_renderer.on_configure)
 
         session_reports_frame = ttk.Frame(self.main_app_frame, style="Controls.TFrame", padding=10)
         session_reports_frame.grid(row=4, column=0, sticky="ew", padx=10, pady=5)
         session_reports_frame.grid_columnconfigure(0, weight=1); session_reports_frame.grid_columnconfigure(1, weight=1)
         self.start_session_button = ttk.Button(session_reports_frame, text="Start Session", command=self.start_tracking_session_ui)
         self.start_session_button.grid(row=0, column=0, pady=5, padx=(0,5), sticky="ew")
-        self.view_reports_button = ttk.Button(session_reports_frame, text="View Saved Reports", command=self.load_and_show_report)
+        self.view_reports_button = ttk.Button(session_reports_frame, text="View Saved Reports", command=self.show_session_library)
         self.view_reports_button.grid(row=0, column=1, pady=5, padx=(5,0), sticky="ew")
 
         self.back_to_home_button = ttk.Button(self.main_app_frame, text="< Back to Home", command=self.show_landing_page)
@@ -177,8 +257,8 @@ class FocusFlowApp:
         canvas_w = max(20, canvas_w)
         canvas_h = max(20, canvas_h)
 
+        # The canvas' own <Configure> event moves the AOIs (see PreviewRenderer.on_configure)
         self.canvas_aoi_preview.config(width=canvas_w, height=canvas_h)
-        self.draw_aois_on_preview_canvas()
 
 
     def show_landing_page(self):
@@ -198,6 +278,7 @@ class FocusFlowApp:
         self.session_overlay_window = tk.Toplevel(self.root_window)
         self.session_overlay_window.attributes('-topmost', True)
         self.session_overlay_window.overrideredirect(True)
+        self.session_overlay_window.bind("<Button-3>", self.toggle_perf_hud)
 
         overlay_frame = ttk.Frame(self.session_overlay_window, style="SessionOverlay.TFrame", padding=10)
         overlay_frame.pack(expand=True, fill='both')
@@ -205,31 +286,68 @@ class FocusFlowApp:
         ttk.Label(overlay_frame, text="Session Active", style="SessionOverlay.TLabel").pack(pady=(0,5))
         self.overlay_timer_label = ttk.Label(overlay_frame, textvariable=self.session_elapsed_time_str, style="SessionOverlay.TLabel")
         self.overlay_timer_label.pack(pady=5)
-        self.overlay_focus_indicator_canvas = tk.Canvas(overlay_frame, width=25, height=25, bg="gray", highlightthickness=0)
+        ttk.Label(overlay_frame, textvariable=self.session_live_metrics_str, style="SessionOverlay.TLabel", justify=tk.CENTER).pack(pady=(0,5))
+        self.overlay_focus_indicator_canvas = tk.Canvas(overlay_frame, width=25, height=25, bg=INDICATOR_IDLE_COLOR, highlightthickness=0)
+        self.overlay_indicator_color = INDICATOR_IDLE_COLOR
         self.overlay_focus_indicator_canvas.pack(pady=(5,10))
-        end_button = ttk.Button(overlay_frame, text="End Session", command=self.end_tracking_session_ui)
-        end_button.pack(pady=(5,0), fill=tk.X, expand=True)
+        self.perf_hud_label = ttk.Label(overlay_frame, textvariable=self.perf_hud_str, style="SessionOverlayHUD.TLabel", justify=tk.LEFT)
+        if self.SHOW_PERF_HUD: self.perf_hud_label.pack(pady=(0,5), fill=tk.X)
+        self.overlay_end_button = ttk.Button(overlay_frame, text="End Session", command=self.end_tracking_session_ui)
+        self.overlay_end_button.pack(pady=(5,0), fill=tk.X, expand=True)
 
-        overlay_width, overlay_height = 200, 180
+        self._place_session_overlay()
+        self.session_overlay_window.resizable(False, False)
+
+    def _place_session_overlay(self):
+        overlay_width, overlay_height = (240, 380) if self.SHOW_PERF_HUD else (200, 220)
         x_pos = self.root_window.winfo_screenwidth() - overlay_width - 20
         y_pos = 20
         self.session_overlay_window.geometry(f"{overlay_width}x{overlay_height}+{x_pos}+{y_pos}")
-        self.session_overlay_window.resizable(False, False)
+
+    def toggle_perf_hud(self, event=None):
+        """Shows or hides the performance HUD on the session overlay; showing it turns instrumentation on."""
+        self.SHOW_PERF_HUD = not self.SHOW_PERF_HUD
+        if self.SHOW_PERF_HUD and not self.perf_stats:
+            self._set_perf_stats(self._make_perf_stats())
+        elif not self.SHOW_PERF_HUD and not self.PERF_INSTRUMENTATION:
+            self._set_perf_stats(None)
+        if not self.session_overlay_window or not self.perf_hud_label: return
+        if self.SHOW_PERF_HUD:
+            self.perf_hud_str.set(self._perf_hud_text())
+            self.perf_hud_label.pack(pady=(0,5), fill=tk.X, before=self.overlay_end_button)
+        else:
+            self.perf_hud_label.pack_forget()
+        self._place_session_overlay()
+
+    def _perf_hud_text(self):
+        text = self.perf_stats.hud_text()
+        tracker_clock = self.gaze_ingest_thread.tracker_clock if self.gaze_ingest_thread else None
+        if tracker_clock is not None and tracker_clock.offset is not None:
+            text += f"\ntracker drift {tracker_clock.drift_ppm:+.1f} ppm"
+        return text
 
 
     def _update_session_timer_display(self):
         if self.session_active and self.session_start_time:
-            elapsed = time.time() - self.session_start_time
+            elapsed = self._sample_clock_now() - self.session_start_time
             self.session_elapsed_time_str.set(time.strftime("%H:%M:%S", time.gmtime(elapsed)))
+            live_metrics = self.session_metrics.current_metrics() if self.session_metrics else None
+            if live_metrics:
+                self.session_live_metrics_str.set(f"Productive: {live_metrics['dwell_percentages']['Productive']:.0f}%\n"
+                                                  f"Bouts: {live_metrics['focus_bouts']['count']} | Shifts: {sum(live_metrics['transitions'].values())}")
+            if self.SHOW_PERF_HUD and self.perf_stats:
+                self.perf_hud_str.set(self._perf_hud_text())
             self.after_id_session_timer = self.root_window.after(1000, self._update_session_timer_display)
 
 
     def toggle_connection(self):
-        if not self.gz_client.is_connected:
+        # While the ingest thread is reconnecting the client is not connected, but the button still disconnects
+        if not self.gz_client.is_connected and not self.gaze_ingest_thread:
             if self.gz_client.connect():
                 self.status_label.config(text="Connected! Receiving gaze data...")
                 self.connect_button.config(text="Disconnect from GazePointer")
                 self.is_tracking_connection = True
+                self._start_gaze_ingest()
                 self.update_gaze_preview_loop()
             else:
                 self.status_label.config(text="Connection failed. Is GazePointer running?")
@@ -237,146 +355,197 @@ class FocusFlowApp:
         else:
             self.is_tracking_connection = False
             if self.after_id_gaze_update: self.root_window.after_cancel(self.after_id_gaze_update)
-            self.gz_client.disconnect()
+            self._stop_gaze_ingest()
             self.status_label.config(text="Disconnected. Connect to start.")
             self.connect_button.config(text="Connect to GazePointer")
-            if hasattr(self, 'canvas_aoi_preview'): self.canvas_aoi_preview.coords(self.gaze_dot_preview,0,0,0,0)
-
+            if hasattr(self, 'preview_renderer'): self.preview_renderer.hide_gaze()
+
+
+    def _start_gaze_ingest(self):
+        self.gaze_ring_buffer.clear()
+        self.seen_gap_markers = self.gaze_ring_buffer.gap_count
+        self.reconnect_status_shown = None
+        reconnect = ReconnectBackoff(self.RECONNECT_INITIAL_S, self.RECONNECT_MAX_S, max_attempts=self.RECONNECT_MAX_ATTEMPTS)
+        self.gaze_ingest_thread = GazeIngestThread(self.gz_client, self.gaze_ring_buffer,
+                                                   make_gaze_filter(self.GAZE_SMOOTHING, self.FIXATION_DETECTOR),
+                                                   self.perf_stats, reconnect,
+                                                   TrackerClock() if self.USE_TRACKER_TIMESTAMPS else None,
+                                                   1.0 / self.TRACKER_RATE_HZ)
+        self.gaze_ingest_thread.start()
+
+    def _sample_clock_now(self):
+        """Current time on the clock sample times are on (the ingest thread's HostClock)."""
+        if self.gaze_ingest_thread:
+            return self.gaze_ingest_thread.host_clock.now()
+        return time.time()
+
+    def _stop_gaze_ingest(self):
+        if self.gaze_ingest_thread:
+            self.gaze_ingest_thread.stop()
+            self.gaze_ingest_thread = None
+        else:
+            self.gz_client.disconnect()
 
-    def _update_realtime_indicator_logic(self, current_aoi_status):
-        """Contains the time-based rules for the session overlay focus indicator."""
-        if not self.session_active:
-            return "gray" # Default color when not in a session
 
-        now = time.time()
-        
-        # --- Update state based on current gaze ---
-        if current_aoi_status != self.last_aoi_type_for_indicator:
-            self.last_aoi_change_time = now
-            self.time_in_current_aoi = 0.0
-            self.last_aoi_type_for_indicator = current_aoi_status
-            
-            # Log transition time for frequency analysis
-            self.indicator_transition_times.append(now)
-        else:
-            self.time_in_current_aoi = now - self.last_aoi_change_time
-
-        # --- Determine color based on rules ---
-        indicator_color = "gray" # Default
-
-        # Rule 1: Deep focus (green)
-        if current_aoi_status == "Productive" and self.time_in_current_aoi > self.CONSISTENT_FOCUS_THRESHOLD:
-            indicator_color = "green"
-        elif current_aoi_status == "Productive":
-            indicator_color = "#90EE90" # Light green for emerging focus
-
-        # Rule 2: Significant distraction (red)
-        elif current_aoi_status == "Distraction" and self.time_in_current_aoi > self.SIGNIFICANT_DISTRACTION_THRESHOLD:
-            indicator_color = "red"
-        elif current_aoi_status == "Distraction":
-            indicator_color = "orange" # Warning color for glancing at distraction
-
-        # Rule 3: Frequent transitions (yellow)
-        # Prune old transition times (e.g., keep last 10 seconds)
-        transition_window = 10.0
-        self.indicator_transition_times = [t for t in self.indicator_transition_times if now - t < transition_window]
-        
-        # If there have been 4 or more transitions in the last 10 seconds, indicate fragmentation
-        if len(self.indicator_transition_times) >= 4:
-            indicator_color = "yellow"
+    def _make_perf_stats(self):
+        return PerfStats(self.UI_TICK_MS / 1000.0, self.LATE_SAMPLE_S)
 
-        # Rule 4: Lingering outside (can also be yellow or gray)
-        elif current_aoi_status == "Outside" and self.time_in_current_aoi > 5.0: # If outside for >5s
-            indicator_color = "#A9A9A9" # Dark Gray
-        elif current_aoi_status == "Outside":
-            indicator_color = "#D3D3D3" # Light Gray
+    def _set_perf_stats(self, perf_stats):
+        # Instrumentation is on exactly while a PerfStats is attached to the client, the ingest thread and the UI tick
+        self.perf_stats = perf_stats
+        self.gz_client.perf_stats = perf_stats
+        if self.gaze_ingest_thread: self.gaze_ingest_thread.perf_stats = perf_stats
 
-        return indicator_color
+    def _make_focus_indicator(self):
+        return FocusIndicator(self.CONSISTENT_FOCUS_THRESHOLD, self.SIGNIFICANT_DISTRACTION_THRESHOLD,
+                              self.LINGERING_OUTSIDE_THRESHOLD, self.INDICATOR_TRANSITION_WINDOW_S,
+                              self.FRAGMENTED_TRANSITION_COUNT)
 
 
     def update_gaze_preview_loop(self):
-        if not self.is_tracking_connection or not self.gz_client.is_connected:
-            self._update_focus_indicator_colors("gray")
+        if not self.is_tracking_connection:
+            self._update_focus_indicator_colors(INDICATOR_IDLE_COLOR)
             return
 
-        gaze_data = self.gz_client.receive_gaze_data()
-        current_aoi_hit_type = "Outside"
-
-        if gaze_data and 'GazeX' in gaze_data and 'GazeY' in gaze_data:
-            raw_x, raw_y = gaze_data['GazeX'], gaze_data['GazeY']
-
-            # Update preview canvas gaze dot
-            if hasattr(self, 'canvas_aoi_preview') and self.canvas_aoi_preview.winfo_exists():
-                canvas_w, canvas_h = self.canvas_aoi_preview.winfo_width(), self.canvas_aoi_preview.winfo_height()
-                if canvas_w > 1 and canvas_h > 1 :
-                    preview_x = (raw_x / self.actual_screen_width) * canvas_w
-                    preview_y = (raw_y / self.actual_screen_height) * canvas_h
-                    dot_size = 10
-                    self.canvas_aoi_preview.coords(self.gaze_dot_preview, preview_x - dot_size/2, preview_y - dot_size/2, preview_x + dot_size/2, preview_y + dot_size/2)
-                    
-                    # Determine AOI for preview dot color only
-                    preview_hit_type = "Outside"
-                    if self.aoi_list:
-                        scaled_hits = []
-                        for aoi in self.aoi_list:
-                            r_x1_c = (aoi['rect_screen_coords'][0] / self.actual_screen_width) * canvas_w
-                            r_y1_c = (aoi['rect_screen_coords'][1] / self.actual_screen_height) * canvas_h
-                            r_x2_c = (aoi['rect_screen_coords'][2] / self.actual_screen_width) * canvas_w
-                            r_y2_c = (aoi['rect_screen_coords'][3] / self.actual_screen_height) * canvas_h
-                            if r_x1_c <= preview_x <= r_x2_c and r_y1_c <= preview_y <= r_y2_c:
-                                scaled_hits.append({'type': aoi['type'], 'area': (r_x2_c - r_x1_c) * (r_y2_c - r_y1_c)})
-                        if scaled_hits:
-                            scaled_hits.sort(key=lambda item: item['area'])
-                            preview_hit_type = scaled_hits[0]['type']
-                    self._update_gaze_dot_preview_color(preview_hit_type)
-                    if not self.session_active and self.defining_aoi_type_transparent is None:
-                         self.status_label.config(text=f"Gaze (Preview): X={preview_x:.0f}, Y={preview_y:.0f} | AOI: {preview_hit_type}")
-
-            # Session Active Logic
+        stats = self.perf_stats
+        if stats:
+            stats.start_tick(time.monotonic())
+            tick_start = stage_start = time.perf_counter()
+
+        # Everything the ingest thread received since the last tick, oldest first
+        gaze_samples = self.gaze_ring_buffer.drain()
+        if stats: stats.record_drain(gaze_samples, self.gaze_ring_buffer.dropped_count, time.time())
+
+        if gaze_samples:
+            if self.reconnect_status_shown is not None and self.gz_client.is_connected:
+                self.status_label.config(text="Reconnected. Receiving gaze data...")
+                self.reconnect_status_shown = None
+            # Gap markers from the ingest thread (lost connections) are rare; only look for them when one was pushed
+            gap_markers = 0
+            if self.gaze_ring_buffer.gap_count != self.seen_gap_markers:
+                gap_markers = sum(1 for sample in gaze_samples if is_gap_marker(sample))
+                self.seen_gap_markers += gap_markers
+
+            # Session Active Logic: classify and log every sample at its sample time
             if self.session_active:
-                session_hits = []
-                for aoi in self.aoi_list:
-                    sx1, sy1, sx2, sy2 = aoi['rect_screen_coords']
-                    if sx1 <= raw_x <= sx2 and sy1 <= raw_y <= sy2:
-                        session_hits.append({'type': aoi['type'], 'area': (sx2-sx1)*(sy2-sy1)})
-                if session_hits:
-                    session_hits.sort(key=lambda item: item['area'])
-                    current_aoi_hit_type = session_hits[0]['type']
-
-                # Update advanced real-time indicator
-                indicator_color = self._update_realtime_indicator_logic(current_aoi_hit_type)
-                self._update_focus_indicator_colors(indicator_color)
-                
-                # Log data
-                self.session_data_log.append({
-                    'timestamp': time.time() - self.session_start_time,
-                    'raw_x': raw_x, 'raw_y': raw_y, 'aoi_status': current_aoi_hit_type
-                })
-
-        elif not self.gz_client.is_connected: # Connection lost
+                indicator_color = None
+                session_samples = [sample for sample in gaze_samples if sample[0] >= self.session_start_time]
+                stretch_start = 0
+                if gap_markers:
+                    # Log the samples between markers, with the gap after each stretch
+                    for i, sample in enumerate(session_samples):
+                        if is_gap_marker(sample):
+                            indicator_color = self._log_session_samples(session_samples[stretch_start:i]) or indicator_color
+                            self._log_session_gap(sample[SAMPLE_TIME])
+                            stretch_start = i + 1
+                indicator_color = self._log_session_samples(session_samples[stretch_start:]) or indicator_color
+                if indicator_color: self._update_focus_indicator_colors(indicator_color)
+                if stats: stage_start = time.perf_counter()
+
+            # Update preview canvas gaze dot with the most recent sample only, at most PREVIEW_MAX_FPS times
+            # a second. The main window is withdrawn during a session, so the preview is not drawn then.
+            now = time.monotonic()
+            if (not self.session_active and hasattr(self, 'preview_renderer') and not is_gap_marker(gaze_samples[-1])
+                    and self.preview_renderer.frame_due(now)):
+                _, raw_x, raw_y, _ = gaze_samples[-1]
+                # Determine AOI for preview dot color only. The preview is a uniform scale
+                # of the screen, so the screen-space answer holds for the canvas too.
+                preview_hit_type = self.aoi_index.lookup(raw_x, raw_y)
+                preview_position = self.preview_renderer.draw_gaze(raw_x, raw_y, preview_hit_type, now)
+                if preview_position and self.defining_aoi_type_transparent is None:
+                    status_text = f"Gaze (Preview): X={preview_position[0]:.0f}, Y={preview_position[1]:.0f} | AOI: {preview_hit_type}"
+                    if self.SHOW_RENDER_STATS:
+                        status_text += f" | Tk calls/s: {self.tk_call_counter.roll(now):.0f}"
+                    self.status_label.config(text=status_text)
+                    self.tk_call_counter.add()
+                if stats: stats.lap("preview", stage_start)
+
+        elif not self.gz_client.is_connected and self.gaze_ingest_thread and self.gaze_ingest_thread.is_alive():
+            # Connection lost: the ingest thread is reconnecting and the session keeps running
+            attempt = self.gaze_ingest_thread.reconnect_attempts + 1
+            if attempt != self.reconnect_status_shown:
+                self.status_label.config(text=f"Connection lost. Reconnecting (attempt {attempt})...")
+                self.reconnect_status_shown = attempt
+            self._update_focus_indicator_colors(INDICATOR_IDLE_COLOR)
+        elif not self.gz_client.is_connected: # Connection lost and not coming back
             self.status_label.config(text="Connection lost. Please check GazePointer.")
             self.connect_button.config(text="Connect to GazePointer"); self.is_tracking_connection = False
-            self._update_focus_indicator_colors("gray"); self.gz_client.disconnect()
+            self._update_focus_indicator_colors(INDICATOR_IDLE_COLOR); self._stop_gaze_ingest()
+            self.reconnect_status_shown = None
             return
 
-        self.after_id_gaze_update = self.root_window.after(30, self.update_gaze_preview_loop)
-        
-    def _update_gaze_dot_preview_color(self, aoi_type):
-        if not hasattr(self, 'canvas_aoi_preview') or not self.canvas_aoi_preview.winfo_exists(): return
-        color_map = {"Productive": "green", "Distraction": "orange", "Outside": "red", "gray":"#7f8c8d"}
-        fill_color = color_map.get(aoi_type, "red")
-        outline_color = {"green": "#27ae60", "orange": "#f39c12", "red": "#c0392b", "gray":"#7f8c8d"}.get(aoi_type, "#c0392b")
-        self.canvas_aoi_preview.itemconfig(self.gaze_dot_preview, fill=fill_color, outline=outline_color)
+        # Tracker dropouts and stalls leave the socket open: a long enough silence is a gap too
+        if (self.session_active and not self.session_gap_open
+                and self._sample_clock_now() - self.last_session_sample_time > self.GAP_AFTER_S):
+            self._log_session_gap(self.last_session_sample_time)
+
+        if stats: stats.lap("tick", tick_start)
+        self.after_id_gaze_update = self.root_window.after(self.UI_TICK_MS, self.update_gaze_preview_loop)
+
+
+    def _log_session_samples(self, session_samples):
+        """Classifies and logs gaze samples of the active session; returns the focus indicator color (None if empty)."""
+        if not session_samples:
+            return None
+        stats = self.perf_stats
+        if stats: stage_start = time.perf_counter()
+        sample_times, batch_x, batch_y, fixation_flags = zip(*session_samples)
+        if len(session_samples) > 1:
+            # Several samples pending: classify the whole block in one vectorized pass
+            aoi_codes = self.aoi_index.classify_batch(batch_x, batch_y).tolist()
+        else:
+            aoi_codes = [AOI_TYPE_CODES[self.aoi_index.lookup(batch_x[0], batch_y[0])]]
+        if self.HOLD_AOI_DURING_SACCADES:
+            aoi_codes = hold_fixation_codes(aoi_codes, fixation_flags, self.last_fixation_aoi_code).tolist()
+            self.last_fixation_aoi_code = aoi_codes[-1]
+        if stats: stage_start = stats.lap("aoi_lookup", stage_start)
+
+        # Log data
+        session_timestamps = [t - self.session_start_time for t in sample_times]
+        if self.KEEP_RAW_SAMPLES:
+            self.session_data_log.extend(session_timestamps, batch_x, batch_y, aoi_codes)
+        self.session_event_builder.extend(session_timestamps, batch_x, batch_y, aoi_codes, fixation_flags)
+        self.session_metrics.update_batch(session_timestamps, aoi_codes)
+        if self.session_journal:
+            if self.KEEP_RAW_SAMPLES:
+                self.session_journal.append_samples(session_timestamps, batch_x, batch_y, aoi_codes)
+            self.session_journal.append_events(self.session_event_builder.pop_closed())
+        self.session_gap_open = False
+        self.last_session_sample_time = sample_times[-1]
+        if stats: stage_start = stats.lap("session_log", stage_start)
+
+        # Update the real-time indicator; the canvas is only touched when its color changes
+        indicator_color = self.focus_indicator.update_batch([AOI_CODE_TYPES[code] for code in aoi_codes], sample_times)
+        if stats: stats.lap("indicator", stage_start)
+        return indicator_color
 
+    def _log_session_gap(self, gap_start):
+        """Logs a gap marker: no samples from gap_start (a sample time) until the next one; see metrics_engine.py."""
+        if self.session_gap_open:
+            return # Nothing logged since the last marker (or the session start)
+        timestamp, gap_code, nan = gap_start - self.session_start_time, AOI_TYPE_CODES[GAP_AOI_TYPE], float("nan")
+        if self.KEEP_RAW_SAMPLES:
+            self.session_data_log.extend([timestamp], [nan], [nan], [gap_code])
+        self.session_event_builder.extend([timestamp], [nan], [nan], [gap_code], [False])
+        self.session_metrics.update(timestamp, gap_code)
+        if self.session_journal:
+            if self.KEEP_RAW_SAMPLES:
+                self.session_journal.append_samples([timestamp], [nan], [nan], [gap_code])
+            self.session_journal.append_events(self.session_event_builder.pop_closed())
+        self.last_fixation_aoi_code = AOI_TYPE_CODES["Outside"]
+        self.session_gap_open = True
 
     def _update_focus_indicator_colors(self, indicator_color_string):
-        """Directly applies the given color string to the session overlay indicator."""
+        """Applies the given color string to the session overlay indicator (no-op if it is already shown)."""
         if not self.session_active or not self.session_overlay_window:
             return
+        if indicator_color_string == self.overlay_indicator_color:
+            return
         try:
-            # Directly use the provided color string. No more mapping.
             if self.overlay_focus_indicator_canvas and self.overlay_focus_indicator_canvas.winfo_exists():
                  self.overlay_focus_indicator_canvas.config(bg=indicator_color_string)
+                 self.overlay_indicator_color = indicator_color_string
+                 self.tk_call_counter.add(2)
         except tk.TclError:
             # This can happen if the color string is invalid for some reason,
             # or the widget is destroyed between checks.
@@ -454,6 +623,7 @@ class FocusFlowApp:
             if fx1==fx2 or fy1==fy2: self.status_label.config(text="AOI def cancelled (too small).")
             else:
                 self.aoi_list.append({'rect_screen_coords': (fx1,fy1,fx2,fy2), 'type': self.defining_aoi_type_transparent})
+                self.aoi_index = AOIIndex(self.aoi_list)
                 self.status_label.config(text=f"{self.defining_aoi_type_transparent} AOI defined.")
                 self.draw_aois_on_preview_canvas()
 
@@ -462,22 +632,12 @@ class FocusFlowApp:
             self.root_window.attributes('-alpha', 1.0); self.root_window.deiconify(); self.root_window.focus_force()
 
     def draw_aois_on_preview_canvas(self):
-        if not hasattr(self, 'canvas_aoi_preview') or not self.canvas_aoi_preview.winfo_exists(): return
-        self.canvas_aoi_preview.delete("aoi_preview_rect", "aoi_preview_label")
-        canvas_w, canvas_h = self.canvas_aoi_preview.winfo_width(), self.canvas_aoi_preview.winfo_height()
-        if canvas_w <= 1 or canvas_h <= 1: return
-
-        for i, aoi in enumerate(self.aoi_list):
-            xs1,ys1,xs2,ys2 = aoi['rect_screen_coords']
-            xc1 = (xs1/self.actual_screen_width)*canvas_w; yc1 = (ys1/self.actual_screen_height)*canvas_h
-            xc2 = (xs2/self.actual_screen_width)*canvas_w; yc2 = (ys2/self.actual_screen_height)*canvas_h
-            color = "green" if aoi['type'] == "Productive" else "orange"
-            self.canvas_aoi_preview.create_rectangle(xc1,yc1,xc2,yc2,outline=color,width=2,tags="aoi_preview_rect")
-            self.canvas_aoi_preview.create_text(xc1+7,yc1+7,text=f"{aoi['type'][0]}{i+1}",anchor=tk.NW,fill=color,font=(self.default_font[0],8,"bold"),tags="aoi_preview_label")
+        # AOI items are updated in place (see PreviewRenderer.set_aois)
+        if hasattr(self, 'preview_renderer'): self.preview_renderer.set_aois(self.aoi_list)
 
     def clear_all_aois(self):
         if self.session_active: self.status_label.config(text="Cannot clear AOIs during session."); return
-        self.aoi_list = []; self.draw_aois_on_preview_canvas()
+        self.aoi_list = []; self.aoi_index = AOIIndex(self.aoi_list); self.draw_aois_on_preview_canvas()
         self.status_label.config(text="All AOIs cleared.")
 
 
@@ -486,9 +646,18 @@ class FocusFlowApp:
         if not self.aoi_list: self.status_label.config(text="No AOIs defined."); return
         if self.session_active: self.status_label.config(text="Session active."); return
 
-        self.session_active = True; self.session_data_log = []
-        self.session_start_time = time.time(); self.session_elapsed_time_str.set("00:00:00")
+        self.session_active = True; self.session_data_log = SessionLog()
+        self.session_start_time = self._sample_clock_now(); self.session_elapsed_time_str.set("00:00:00")
+        self.session_metrics = StreamingSessionMetrics(self.session_data_log.category_table)
+        self.session_event_builder = EventLogBuilder(self.session_data_log.category_table, self.SPLIT_EVENTS_ON_FIXATION)
+        self.last_fixation_aoi_code = AOI_TYPE_CODES["Outside"]
+        self.focus_indicator = self._make_focus_indicator()
+        self.focus_indicator.reset(self.session_start_time)
+        self.session_gap_open, self.last_session_sample_time = True, None
+        self.session_live_metrics_str.set("")
+        self.session_journal = self._open_session_journal()
         self.current_report_data = None
+        if self.perf_stats: self._set_perf_stats(self._make_perf_stats()) # Stats cover this session only
 
         self.root_window.withdraw(); self._create_session_overlay(); self._update_session_timer_display()
         for btn in [self.start_session_button, self.add_productive_aoi_button, self.add_distraction_aoi_button,
@@ -506,32 +675,88 @@ class FocusFlowApp:
                     self.clear_aois_button, self.connect_button, self.back_to_home_button, self.view_reports_button]:
             btn.config(state=tk.NORMAL)
 
-        if self.session_data_log:
+        if self.session_event_builder and self.session_event_builder.sample_count:
             self.status_label.config(text="Session ended. Generating report...")
             self.current_report_data = self.generate_session_metrics_data()
+            self._close_session_journal(self.current_report_data)
             self._show_report_window(self.current_report_data, report_title="Current Session Report")
         else:
             self.status_label.config(text="Session ended. No data logged.")
+            self._close_session_journal(None)
             self.current_report_data = None
 
-    
-
-    def _show_report_window(self, report_data_current, report_data_comparison=None, report_title="Session Report"):
-        if self.report_window_instance and self.report_window_instance.winfo_exists():
-            self.report_window_instance.destroy()
+    def _open_session_journal(self):
+        # Stream samples to disk as they arrive so a crash does not lose the session
+        try:
+            os.makedirs(DEFAULT_SESSION_DIR, exist_ok=True)
+            session_path = os.path.join(DEFAULT_SESSION_DIR, f"FocusFlow_Session_{time.strftime('%Y%m%d_%H%M%S')}{SESSION_FILE_EXTENSION}")
+            return SessionJournal(session_path, self.session_data_log.category_table,
+                                  metadata={"aoi_list": self.aoi_list, "session_start_time": self.session_start_time},
+                                  flush_interval_s=self.JOURNAL_FLUSH_INTERVAL_S, flush_samples=self.JOURNAL_FLUSH_SAMPLES,
+                                  fsync_policy=self.JOURNAL_FSYNC_POLICY)
+        except OSError as e:
+            print(f"Could not create session journal: {e}")
+            self.status_label.config(text=f"Session will not be saved to disk: {e}")
+            return None
+
+    def _close_session_journal(self, report_data):
+        if not self.session_journal: return
+        if self.session_event_builder:
+            # The last event only closes when the session ends
+            self.session_event_builder.finish()
+            self.session_journal.append_events(self.session_event_builder.pop_closed())
+        summary = report_summary(report_data) if report_data else {}
+        self.session_journal.close(summary)
+        if self.session_journal.error is None:
+            print(f"Session saved to {self.session_journal.path}")
+            self._index_saved_session(self.session_journal.path)
+            if self.perf_stats and self.SAVE_PERF_STATS:
+                self._save_perf_stats(os.path.splitext(self.session_journal.path)[0] + PERF_STATS_EXTENSION)
+        else:
+            print(f"Session journal error ({self.session_journal.path}): {self.session_journal.error}")
+            self.status_label.config(text=f"Session file may be incomplete: {self.session_journal.error}")
+        self.session_journal = None
 
-        self.report_window_instance = tk.Toplevel(self.root_window)
-        self.report_window_instance.title(report_title)
-        
+    def _save_perf_stats(self, filepath):
         try:
-            self.report_window_instance.state('zoomed')
-        except tk.TclError:
-            screen_width = self.report_window_instance.winfo_screenwidth()
-            screen_height = self.report_window_instance.winfo_screenheight()
-            self.report_window_instance.geometry(f"{screen_width}x{screen_height}+0+0")
+            self.perf_stats.write(filepath)
+            print(f"Performance stats saved to {filepath}")
+        except OSError as e:
+            print(f"Could not save performance stats: {e}")
+
+    def _recover_unfinished_sessions(self):
+        # Journals left open by a crash are finished into normal session files
+        if not os.path.isdir(DEFAULT_SESSION_DIR): return
+        recovered, failed = recover_unfinished_sessions(DEFAULT_SESSION_DIR)
+        messages = []
+        if recovered:
+            print("Recovered unfinished sessions:\n" + "\n".join(recovered))
+            messages.append(f"Recovered {len(recovered)} unfinished session(s) in {DEFAULT_SESSION_DIR}")
+        for path, error in failed:
+            print(f"Could not recover session journal {path}: {error}")
+        if failed:
+            messages.append(f"Could not recover {len(failed)} session(s): {failed[0][1]}")
+        if messages: self.status_label.config(text=". ".join(messages))
+
+    def _open_session_library(self):
+        # Catalog of saved sessions; the session directory is re-indexed incrementally on startup
+        try:
+            self.session_library = SessionLibrary()
+            if os.path.isdir(DEFAULT_SESSION_DIR):
+                self.session_library.index_directory(DEFAULT_SESSION_DIR)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Could not open session library: {e}")
+            self.session_library = None
+
+    def _index_saved_session(self, filepath):
+        if not self.session_library: return
+        try:
+            self.session_library.index_file(filepath)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"Could not add {filepath} to the session library: {e}")
 
-        from matplotlib import rcParams
-        
+    def _chart_theme_colors(self):
+        # Chart colors that match the current ttk theme: (is_dark_theme, background, text, grid)
         is_dark_theme = False
         try:
             current_theme_mode = self.root_window.tk.call("ttk::style", "theme", "use")
@@ -567,8 +792,29 @@ class FocusFlowApp:
         except tk.TclError:
             text_color = default_dark_text if is_dark_theme else default_light_text
 
-
         grid_color = '#555555' if is_dark_theme else '#cccccc'
+        return is_dark_theme, chart_bg_color, text_color, grid_color
+
+    def _show_report_window(self, report_data_current, report_data_comparison=None, report_title="Session Report"):
+        if self.report_window_instance and self.report_window_instance.winfo_exists():
+            self.report_window_instance.destroy()
+
+        self.report_window_instance = tk.Toplevel(self.root_window)
+        self.report_window_instance.title(report_title)
+        
+        try:
+            self.report_window_instance.state('zoomed')
+        except tk.TclError:
+            screen_width = self.report_window_instance.winfo_screenwidth()
+            screen_height = self.report_window_instance.winfo_screenheight()
+            self.report_window_instance.geometry(f"{screen_width}x{screen_height}+0+0")
+
+        # The chart stack is imported on first use (usually already pre-warmed at startup)
+        charts = load_chart_modules()
+        rcParams, Figure, FigureCanvasTkAgg = charts.rcParams, charts.Figure, charts.FigureCanvasTkAgg
+        draw_dwell_pie, draw_attention_timeline = charts.draw_dwell_pie, charts.draw_attention_timeline
+
+        is_dark_theme, chart_bg_color, text_color, grid_color = self._chart_theme_colors()
         pie_edge_color = chart_bg_color
 
         rcParams['font.family'] = self.chart_font_family
@@ -649,23 +895,8 @@ class FocusFlowApp:
                 ax_pie = fig_pie.add_subplot(111)
                 ax_pie.set_facecolor(chart_bg_color)
 
-                labels = ['Productive', 'Distraction', 'Outside AOIs']
-                sizes = [data['dwell_times'].get('Productive',0), data['dwell_times'].get('Distraction',0), data['dwell_times'].get('Outside',0)]
-                pie_colors = ['#5cb85c', '#f0ad4e', '#d9534f'] if sum(sizes) > 0 else ['#777777']*3
-                valid_sizes = any(s > 0 for s in sizes)
-                explode = (0.05 if data['dwell_times'].get('Productive',0) > 0 and valid_sizes else 0, 0, 0)
-
-                if valid_sizes:
-                    wedges, texts_pie, autotexts = ax_pie.pie(sizes, explode=explode, labels=None, colors=pie_colors,
-                                                          autopct=lambda p: '{:.1f}%\n({:.1f}s)'.format(p, p * sum(sizes) / 100.0) if p > 1 else '',
-                                                          shadow=False, startangle=120, pctdistance=0.8,
-                                                          textprops={'color': "white" if is_dark_theme else "black", 'fontsize':self.chart_font_size_small, 'weight':'bold'},
-                                                          wedgeprops={'edgecolor': pie_edge_color, 'linewidth': 0.5})
-                    ax_pie.legend(wedges, labels, title="AOI Types", loc="center left",
-                                  bbox_to_anchor=(0.98, 0, 0.5, 1), fontsize=self.chart_font_size_small,
-                                  labelcolor=text_color, title_fontproperties={'size':self.chart_font_size_small, 'weight':'bold'})
-                else:
-                    ax_pie.text(0.5, 0.5, "No dwell data", ha='center', va='center', color=text_color)
+                pie_colors = draw_dwell_pie(ax_pie, data['dwell_times'], text_color, pie_edge_color,
+                                            "white" if is_dark_theme else "black", self.chart_font_size_small)
                 ax_pie.set_title('Dwell Time Distribution', color=text_color)
                 fig_pie.tight_layout(pad=0.5)
                 canvas_pie = FigureCanvasTkAgg(fig_pie, master=pie_frame)
@@ -681,38 +912,9 @@ class FocusFlowApp:
                 ax_timeline = fig_timeline.add_subplot(111)
                 ax_timeline.set_facecolor(chart_bg_color)
 
-                log = data.get("raw_log", [])
+                log = report_metric_log(data)
                 if log and len(log) > 1 :
-                    times = [entry['timestamp'] for entry in log]
-                    statuses_raw = [entry['aoi_status'] for entry in log]
-                    status_map = {"Productive": 2, "Distraction": 1, "Outside": 0}
-                    status_plot_colors = {"Productive": pie_colors[0], "Distraction": pie_colors[1], "Outside": pie_colors[2]}
-                    
-                    y_coords = []
-                    color_segments = []
-                    
-                    for i in range(len(times)):
-                        y_coords.append(status_map.get(statuses_raw[i],0))
-                        if i > 0:
-                            color_segments.append(status_plot_colors.get(statuses_raw[i-1], pie_colors[2]))
-
-                    if len(times) > 1:
-                        for i in range(len(times) - 1):
-                            ax_timeline.plot([times[i], times[i+1]], [y_coords[i], y_coords[i]], color=color_segments[i], linewidth=5)
-                            if y_coords[i] != y_coords[i+1]:
-                                ax_timeline.plot([times[i+1], times[i+1]], [y_coords[i], y_coords[i+1]], color=color_segments[i], linewidth=5)
-                        if len(times) == len(y_coords) and len(times) > 0:
-                             ax_timeline.plot([times[-1], times[-1]+0.5], [y_coords[-1], y_coords[-1]], color=status_plot_colors.get(statuses_raw[-1], pie_colors[2]), linewidth=5)
-
-
-                    ax_timeline.set_yticks([0,1,2]); ax_timeline.set_yticklabels(['Outside', 'Distraction', 'Productive'])
-                    ax_timeline.set_xlabel("Time (s)"); ax_timeline.set_ylabel("AOI Status")
-                    ax_timeline.grid(True, axis='y', linestyle=':', linewidth=0.5, color=grid_color)
-                    ax_timeline.spines['top'].set_visible(False)
-                    ax_timeline.spines['right'].set_visible(False)
-                    ax_timeline.spines['bottom'].set_color(text_color)
-                    ax_timeline.spines['left'].set_color(text_color)
-                    ax_timeline.set_ylim(-0.5, 2.5)
+                    draw_attention_timeline(ax_timeline, log, pie_colors, text_color, grid_color)
                 else:
                     ax_timeline.text(0.5, 0.5, "Not enough data for timeline", ha='center', va='center', color=text_color)
                 ax_timeline.set_title('Attention Timeline', color=text_color)
@@ -732,109 +934,40 @@ class FocusFlowApp:
         buttons_frame.grid_columnconfigure(0, weight=1)
         buttons_frame.grid_columnconfigure(1, weight=1)
         buttons_frame.grid_columnconfigure(2, weight=1)
+        buttons_frame.grid_columnconfigure(3, weight=1)
 
         action_button_style = "Accent.TButton" if "Accent.TButton" in self.style.theme_names() else "TButton"
 
-        if report_data_current == self.current_report_data and self.current_report_data is not None:
+        if report_data_current is self.current_report_data and self.current_report_data is not None:
             ttk.Button(buttons_frame, text="Save This Report", style=action_button_style,
-                       command=lambda d=report_data_current: self.save_report_to_json(d)).grid(row=0, column=0, padx=5, sticky="ew")
+                       command=lambda d=report_data_current: self.save_report_to_file(d)).grid(row=0, column=0, padx=5, sticky="ew")
         ttk.Button(buttons_frame, text="Open & Compare Report", style=action_button_style if report_data_comparison else "TButton",
                    command=lambda current_data=report_data_current: self.load_and_compare_report(current_data)).grid(row=0, column=1, padx=5, sticky="ew")
-        ttk.Button(buttons_frame, text="Close Report", command=self.report_window_instance.destroy).grid(row=0, column=2, padx=5, sticky="ew")
+        ttk.Button(buttons_frame, text="Show Trends", command=self.show_trends_window).grid(row=0, column=2, padx=5, sticky="ew")
+        ttk.Button(buttons_frame, text="Close Report", command=self.report_window_instance.destroy).grid(row=0, column=3, padx=5, sticky="ew")
 
         self.report_window_instance.update_idletasks()
         report_canvas.config(scrollregion = report_canvas.bbox("all"))
 
     def generate_session_metrics_data(self):
-        if not self.session_data_log or len(self.session_data_log) < 2: return None
-        
-        # --- Basic Dwell Time and Transition Calculation (as before) ---
-        report_data = {"raw_log": self.session_data_log, "report_generated_timestamp": time.time()}
-        durations = [(self.session_data_log[i+1]['timestamp'] - self.session_data_log[i]['timestamp']) for i in range(len(self.session_data_log) - 1)]
-        durations.append(durations[-1] if durations else 0.03) # Estimate last entry's duration
-
-        time_prod, time_dist, time_out = 0, 0, 0
-        total_time = sum(durations)
-        report_data["session_duration"] = total_time
-
-        for i, entry in enumerate(self.session_data_log):
-            dt = durations[i]
-            if entry['aoi_status'] == "Productive": time_prod += dt
-            elif entry['aoi_status'] == "Distraction": time_dist += dt
-            else: time_out += dt
-        
-        report_data["dwell_times"] = {"Productive": time_prod, "Distraction": time_dist, "Outside": time_out}
-        report_data["dwell_percentages"] = {
-            "Productive": (time_prod/total_time)*100 if total_time > 0 else 0,
-            "Distraction": (time_dist/total_time)*100 if total_time > 0 else 0,
-            "Outside": (time_out/total_time)*100 if total_time > 0 else 0
-        }
-        p_to_d, d_to_p = 0, 0
-        for i in range(1, len(self.session_data_log)):
-            prev, curr = self.session_data_log[i-1]['aoi_status'], self.session_data_log[i]['aoi_status']
-            if prev == "Productive" and curr == "Distraction": p_to_d += 1
-            elif prev == "Distraction" and curr == "Productive": d_to_p += 1
-        report_data["transitions"] = {"P_to_D": p_to_d, "D_to_P": d_to_p}
-
-        # --- Refined Focus Bout and Re-engagement Latency Calculation ---
-        SIGNIFICANT_DISTRACTION_S = 3.0 # Threshold from your plan (3-5s)
-
-        bout_durs = []
-        latency_times = []
-        
-        in_productive_bout = False
-        bout_start_time = 0
-        
-        in_distraction_bout = False
-        distraction_start_time = 0
-        last_significant_distraction_end_time = 0
-
-        for i in range(len(self.session_data_log)):
-            entry = self.session_data_log[i]
-            is_prod = entry['aoi_status'] == "Productive"
-            is_dist = entry['aoi_status'] == "Distraction"
-            timestamp = entry['timestamp']
-            
-            # --- Productive Bout Logic ---
-            if is_prod and not in_productive_bout:
-                in_productive_bout = True
-                bout_start_time = timestamp
-                # Check if this is a re-engagement
-                if last_significant_distraction_end_time > 0:
-                    latency = bout_start_time - last_significant_distraction_end_time
-                    latency_times.append(latency)
-                    last_significant_distraction_end_time = 0 # Reset after measuring
-
-            # --- Distraction Logic (for terminating bouts and starting latency measurement) ---
-            if is_dist and not in_distraction_bout:
-                in_distraction_bout = True
-                distraction_start_time = timestamp
-
-            if not is_dist and in_distraction_bout: # Distraction bout just ended
-                in_distraction_bout = False
-                distraction_duration = timestamp - distraction_start_time
-                if distraction_duration >= SIGNIFICANT_DISTRACTION_S:
-                    # This was a significant distraction. End any ongoing productive bout.
-                    if in_productive_bout:
-                        bout_durs.append(distraction_start_time - bout_start_time)
-                        in_productive_bout = False
-                    # Mark the end time, to measure latency for the *next* productive bout
-                    last_significant_distraction_end_time = timestamp
-
-        # Catch any productive bout that was ongoing at the end of the session
-        if in_productive_bout:
-            bout_durs.append(self.session_data_log[-1]['timestamp'] - bout_start_time)
-
-        report_data["focus_bouts"] = {
-            "count": len(bout_durs),
-            "avg_duration": sum(bout_durs)/len(bout_durs) if bout_durs else 0,
-            "max_duration": max(bout_durs) if bout_durs else 0,
-            "durations_list": [d for d in bout_durs if d > 0.1] # Filter out tiny artifacts
-        }
-        report_data["re_engagement_latency"] = {
-            "count": len(latency_times),
-            "avg_latency": sum(latency_times)/len(latency_times) if latency_times else 0
-        }
+        event_log = self.session_event_builder.finish() if self.session_event_builder else None
+        if self.KEEP_RAW_SAMPLES or event_log is None:
+            session_log, sample_count = self.session_data_log, len(self.session_data_log)
+        else:
+            # Only events were kept: their metric samples stand in for the raw log
+            session_log, sample_count = event_log.to_session_log(), event_log.sample_count
+        if sample_count < 2: return None
+
+        report_data = {"raw_log": session_log, "report_generated_timestamp": time.time(),
+                       "session_start_time": self.session_start_time, "aoi_list": list(self.aoi_list)}
+        if event_log is not None:
+            report_data.update(event_log=event_log, raw_samples_kept=self.KEEP_RAW_SAMPLES)
+        # Dwell, transitions, focus bouts and re-engagement latency were accumulated while tracking;
+        # fall back to a full pass if the accumulator is missing samples (see metrics_engine.py)
+        if self.session_metrics and self.session_metrics.sample_count == sample_count:
+            report_data.update(self.session_metrics.current_metrics())
+        else:
+            report_data.update(compute_session_log_metrics(session_log))
         return report_data
 
     def format_metrics_for_display(self, data, text_widget):
@@ -851,7 +984,12 @@ class FocusFlowApp:
 
         text_widget.insert(tk.END, "Overall Summary\n", "heading")
         text_widget.insert(tk.END, "Session Duration: ", "metric_name")
-        text_widget.insert(tk.END, f"{data.get('session_duration', 0):.2f}s\n\n", "metric_value")
+        text_widget.insert(tk.END, f"{data.get('session_duration', 0):.2f}s\n", "metric_value")
+        gaps = data.get('gaps', {})
+        if gaps.get('count'):
+            text_widget.insert(tk.END, "Tracking Gaps: ", "metric_name")
+            text_widget.insert(tk.END, f"{gaps['count']} ({gaps.get('total_duration', 0):.2f}s not counted)\n", "metric_value")
+        text_widget.insert(tk.END, "\n")
 
         text_widget.insert(tk.END, "Dwell Time Analysis\n", "heading")
         dwell_times = data.get('dwell_times', {})
@@ -887,21 +1025,25 @@ class FocusFlowApp:
         text_widget.insert(tk.END, f"{latency.get('avg_latency', 0):.2f}s\n", "sub_value")
         text_widget.insert(tk.END, "(Time to return to focus after a significant distraction)\n", "small_italic")
 
-    def save_report_to_json(self, report_data_to_save):
+    def save_report_to_file(self, report_data_to_save):
         if not report_data_to_save:
             simpledialog.messagebox.showerror("Error", "No report data to save.", parent=self.report_window_instance)
             return
         filepath = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("JSON files", "*.json"), ("FocusFlow session files", f"*{SESSION_FILE_EXTENSION}"), ("All files", "*.*")],
             title="Save Report As...",
             initialfile=f"FocusFlow_Report_{time.strftime('%Y%m%d_%H%M%S')}.json",
             parent=self.report_window_instance
         )
         if filepath:
             try:
-                with open(filepath, 'w') as f:
-                    json.dump(report_data_to_save, f, indent=4)
+                if filepath.lower().endswith(SESSION_FILE_EXTENSION):
+                    write_session_file(filepath, report_data_to_save)
+                else:
+                    with open(filepath, 'w') as f:
+                        json.dump(report_to_json_dict(report_data_to_save), f, indent=4)
+                self._index_saved_session(filepath)
                 simpledialog.messagebox.showinfo("Success", f"Report saved to:\n{filepath}", parent=self.report_window_instance)
             except Exception as e:
                 simpledialog.messagebox.showerror("Error Saving File", f"Could not save report: {e}", parent=self.report_window_instance)
@@ -910,36 +1052,234 @@ class FocusFlowApp:
         parent_window = self.report_window_instance if self.report_window_instance and self.report_window_instance.winfo_exists() else self.root_window
         filepath = filedialog.askopenfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("Report files", f"*.json *{SESSION_FILE_EXTENSION}"), ("JSON files", "*.json"),
+                       ("FocusFlow session files", f"*{SESSION_FILE_EXTENSION}"), ("All files", "*.*")],
             title="Open Report File",
             parent=parent_window
         )
         if filepath:
-            try:
-                with open(filepath, 'r') as f:
-                    loaded_data = json.load(f)
-                if not all(k in loaded_data for k in ["session_duration", "dwell_times", "raw_log"]):
-                    raise ValueError("Report file is missing essential data.")
-
-                report_filename = os.path.basename(filepath)
-                if report_to_compare_with:
-                    self._show_report_window(report_to_compare_with, loaded_data, report_title=f"Comparison: Current vs. {report_filename}")
-                else:
-                    self._show_report_window(loaded_data, report_title=f"Report: {report_filename}")
+            self.open_report_file(filepath, report_to_compare_with, parent_window)
 
-            except Exception as e:
-                simpledialog.messagebox.showerror("Error Loading File", f"Could not load report: {e}", parent=parent_window)
+    def open_report_file(self, filepath, report_to_compare_with=None, parent_window=None):
+        parent_window = parent_window or self.root_window
+        try:
+            loaded_data = load_report_file(filepath)
+            if not all(k in loaded_data for k in ["session_duration", "dwell_times", "raw_log"]):
+                raise ValueError("Report file is missing essential data.")
+
+            report_filename = os.path.basename(filepath)
+            if report_to_compare_with:
+                self._show_report_window(report_to_compare_with, loaded_data, report_title=f"Comparison: Current vs. {report_filename}")
+            else:
+                self._show_report_window(loaded_data, report_title=f"Report: {report_filename}")
+
+        except Exception as e:
+            simpledialog.messagebox.showerror("Error Loading File", f"Could not load report: {e}", parent=parent_window)
+
+    def show_session_library(self):
+        if not self.session_library:
+            self.load_and_show_report(); return
+        if self.library_window and self.library_window.winfo_exists():
+            self.library_window.lift(); return
+
+        self.library_window = tk.Toplevel(self.root_window)
+        self.library_window.title("Session Library")
+        self.library_window.geometry("900x520")
+        outer_frame = ttk.Frame(self.library_window, padding=10)
+        outer_frame.pack(fill='both', expand=True)
+
+        filter_frame = ttk.Frame(outer_frame)
+        filter_frame.pack(fill='x', pady=(0,8))
+        ttk.Label(filter_frame, text="Last days:").pack(side=tk.LEFT)
+        days_var = tk.StringVar(value="")
+        ttk.Entry(filter_frame, textvariable=days_var, width=6).pack(side=tk.LEFT, padx=(2,10))
+        ttk.Label(filter_frame, text="Min. productive %:").pack(side=tk.LEFT)
+        min_productive_var = tk.StringVar(value="")
+        ttk.Entry(filter_frame, textvariable=min_productive_var, width=6).pack(side=tk.LEFT, padx=(2,10))
+
+        columns = ("started", "duration", "productive", "bouts", "latency", "file")
+        tree = ttk.Treeview(outer_frame, columns=columns, show="headings", selectmode="extended")
+        for column, heading, width in zip(columns, ("Started", "Duration", "Productive", "Focus Bouts", "Avg. Latency", "File"),
+                                          (150, 80, 80, 80, 90, 380)):
+            tree.heading(column, text=heading); tree.column(column, width=width, anchor=tk.W)
+        tree.pack(fill='both', expand=True)
+
+        nav_frame = ttk.Frame(outer_frame)
+        nav_frame.pack(fill='x', pady=(8,0))
+        page_label = ttk.Label(nav_frame, text="")
+        page = {"offset": 0, "total": 0, "paths": {}}
+
+        def current_filters():
+            try:
+                since = days_ago(float(days_var.get())) if days_var.get().strip() else None
+                min_productive = float(min_productive_var.get()) if min_productive_var.get().strip() else None
+            except ValueError:
+                since = min_productive = None
+            return {"since": since, "min_productive": min_productive}
+
+        def refresh(offset=0):
+            filters = current_filters()
+            page["total"] = self.session_library.count(**filters)
+            page["offset"] = max(0, min(offset, max(0, page["total"] - 1) // self.LIBRARY_PAGE_SIZE * self.LIBRARY_PAGE_SIZE))
+            tree.delete(*tree.get_children()); page["paths"].clear()
+            for row in self.session_library.query(limit=self.LIBRARY_PAGE_SIZE, offset=page["offset"], **filters):
+                item = tree.insert("", tk.END, values=(
+                    time.strftime('%Y-%m-%d %H:%M', time.localtime(row["started_at"])),
+                    f"{(row['session_duration'] or 0) / 60:.1f} min", f"{row['productive_pct'] or 0:.1f}%",
+                    row["focus_bout_count"] or 0, f"{row['avg_latency'] or 0:.2f}s", os.path.basename(row["path"])))
+                page["paths"][item] = row["path"]
+            last = min(page["offset"] + self.LIBRARY_PAGE_SIZE, page["total"])
+            page_label.config(text=f"{page['offset'] + 1 if page['total'] else 0}-{last} of {page['total']}")
+
+        def open_selected(event=None):
+            selection = tree.selection()
+            if selection: self.open_report_file(page["paths"][selection[0]], parent_window=self.library_window)
+
+        def compare_selected():
+            paths = [page["paths"][item] for item in tree.selection()]
+            if len(paths) + bool(self.current_report_data) < 2:
+                simpledialog.messagebox.showinfo("Compare Sessions", "Select at least two sessions to compare.", parent=self.library_window); return
+            self.show_comparison_window(paths)
+
+        def rescan():
+            if os.path.isdir(DEFAULT_SESSION_DIR): self.session_library.index_directory(DEFAULT_SESSION_DIR)
+            refresh(page["offset"])
+
+        tree.bind("<Double-1>", open_selected)
+        ttk.Button(filter_frame, text="Apply", command=lambda: refresh(0)).pack(side=tk.LEFT)
+        ttk.Button(filter_frame, text="Rescan", command=rescan).pack(side=tk.LEFT, padx=5)
+        ttk.Button(nav_frame, text="< Prev", command=lambda: refresh(page["offset"] - self.LIBRARY_PAGE_SIZE)).pack(side=tk.LEFT)
+        page_label.pack(side=tk.LEFT, padx=10)
+        ttk.Button(nav_frame, text="Next >", command=lambda: refresh(page["offset"] + self.LIBRARY_PAGE_SIZE)).pack(side=tk.LEFT)
+        ttk.Button(nav_frame, text="Open File...", command=lambda: self.load_and_show_report()).pack(side=tk.RIGHT)
+        ttk.Button(nav_frame, text="Open Selected", command=open_selected).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(nav_frame, text="Compare Selected", command=compare_selected).pack(side=tk.RIGHT)
+        ttk.Button(nav_frame, text="Trends", command=self.show_trends_window).pack(side=tk.RIGHT, padx=5)
+        refresh(0)
+
+    def show_comparison_window(self, paths):
+        # Summaries are loaded in worker processes (off the Tk thread); only metrics and
+        # downsampled timelines come back, so memory grows with the number of sessions
+        if self.comparison_window and self.comparison_window.winfo_exists():
+            self.comparison_window.destroy()
+        self.comparison_window = tk.Toplevel(self.root_window)
+        self.comparison_window.title(f"Compare {len(paths) + bool(self.current_report_data)} Sessions")
+        self.comparison_window.geometry("1100x700")
+        outer_frame = ttk.Frame(self.comparison_window, padding=10)
+        outer_frame.pack(fill='both', expand=True)
+        loading_label = ttk.Label(outer_frame, text=f"Loading {len(paths)} sessions...")
+        loading_label.pack(pady=20)
+
+        result = {}
+        loader = threading.Thread(target=lambda: result.update(summaries=load_comparison_summaries(paths)), daemon=True)
+        loader.start()
+        current = [comparison_summary(self.current_report_data, "Current Session")] if self.current_report_data else []
+
+        def poll():
+            if not self.comparison_window or not self.comparison_window.winfo_exists(): return
+            if loader.is_alive():
+                self.comparison_window.after(100, poll); return
+            loading_label.destroy()
+            summaries = current + result.get("summaries", [])
+            failed = [summary for summary in summaries if "error" in summary]
+            for summary in failed: print(f"Could not load {summary['path']} for comparison: {summary['error']}")
+            self._populate_comparison_window(outer_frame, [summary for summary in summaries if "error" not in summary], failed)
+
+        poll()
+
+    def _populate_comparison_window(self, outer_frame, summaries, failed):
+        if failed:
+            ttk.Label(outer_frame, text=f"{len(failed)} session(s) could not be loaded: " + ", ".join(summary["name"] for summary in failed),
+                      wraplength=1000).pack(fill='x', pady=(0,5))
+        if not summaries:
+            ttk.Label(outer_frame, text="No sessions to compare.").pack(pady=20); return
+
+        names = [summary["name"] for summary in summaries]
+        columns = ["metric"] + [f"s{i}" for i in range(len(summaries))]
+        table = ttk.Treeview(outer_frame, columns=columns, show="headings", height=len(COMPARISON_METRICS))
+        table.heading("metric", text="Metric"); table.column("metric", width=160, anchor=tk.W, stretch=False)
+        for column, name in zip(columns[1:], names):
+            table.heading(column, text=name); table.column(column, width=110, anchor=tk.E)
+        for label, values in comparison_table(summaries):
+            table.insert("", tk.END, values=[label] + values)
+        table_scroll = ttk.Scrollbar(outer_frame, orient=tk.HORIZONTAL, command=table.xview)
+        table.configure(xscrollcommand=table_scroll.set)
+        table.pack(fill='x'); table_scroll.pack(fill='x', pady=(0,10))
+
+        charts = load_chart_modules()
+        is_dark_theme, chart_bg_color, text_color, grid_color = self._chart_theme_colors()
+        timelines = summaries[:self.MAX_COMPARISON_TIMELINES]
+        if len(summaries) > len(timelines):
+            ttk.Label(outer_frame, text=f"Showing the timelines of the first {len(timelines)} sessions.").pack(anchor='w')
+        fig_timelines = charts.Figure(figsize=(11, 0.8 + 0.45 * len(timelines)), dpi=90, facecolor=chart_bg_color)
+        charts.draw_timeline_small_multiples(fig_timelines, [summary["timeline"] for summary in timelines],
+                                             [summary["name"] for summary in timelines], DWELL_PIE_COLORS, text_color, grid_color)
+        fig_timelines.tight_layout(pad=0.5)
+        canvas_timelines = charts.FigureCanvasTkAgg(fig_timelines, master=outer_frame)
+        canvas_timelines.draw(); canvas_timelines.get_tk_widget().pack(fill='both', expand=True)
+
+    def show_trends_window(self):
+        # Trend charts are drawn from the library's daily rollups only; no session file is opened
+        if not self.session_library:
+            simpledialog.messagebox.showerror("Trends", "The session library is not available.", parent=self.root_window); return
+        if self.trends_window and self.trends_window.winfo_exists():
+            self.trends_window.lift(); return
+
+        charts = load_chart_modules()
+        is_dark_theme, chart_bg_color, text_color, grid_color = self._chart_theme_colors()
+        self.trends_window = tk.Toplevel(self.root_window)
+        self.trends_window.title("Focus Trends")
+        self.trends_window.geometry("900x560")
+        outer_frame = ttk.Frame(self.trends_window, padding=10)
+        outer_frame.pack(fill='both', expand=True)
+
+        controls_frame = ttk.Frame(outer_frame)
+        controls_frame.pack(fill='x', pady=(0,8))
+        metric_labels = {label: name for name, (label, _) in TREND_METRICS.items()}
+        metric_var = tk.StringVar(value=TREND_METRICS["avg_bout_duration"][0])
+        period_var = tk.StringVar(value="day")
+        days_var = tk.StringVar(value="30")
+        ttk.Label(controls_frame, text="Metric:").pack(side=tk.LEFT)
+        ttk.Combobox(controls_frame, textvariable=metric_var, values=list(metric_labels), state="readonly", width=32).pack(side=tk.LEFT, padx=(2,10))
+        ttk.Label(controls_frame, text="Per:").pack(side=tk.LEFT)
+        ttk.Combobox(controls_frame, textvariable=period_var, values=list(TREND_PERIODS), state="readonly", width=7).pack(side=tk.LEFT, padx=(2,10))
+        ttk.Label(controls_frame, text="Last days:").pack(side=tk.LEFT)
+        ttk.Entry(controls_frame, textvariable=days_var, width=6).pack(side=tk.LEFT, padx=(2,10))
+
+        fig_trend = charts.Figure(figsize=(8.5, 4.2), dpi=90, facecolor=chart_bg_color)
+        ax_trend = fig_trend.add_subplot(111)
+        canvas_trend = charts.FigureCanvasTkAgg(fig_trend, master=outer_frame)
+        canvas_trend.get_tk_widget().pack(fill='both', expand=True)
+
+        def redraw(event=None):
+            try:
+                since_day = session_day(days_ago(float(days_var.get()))) if days_var.get().strip() else None
+            except ValueError:
+                since_day = None
+            metric = metric_labels[metric_var.get()]
+            periods, values = trend_series(self.session_library.trend_rollups(period_var.get(), since_day), metric)
+            ax_trend.clear(); ax_trend.set_facecolor(chart_bg_color)
+            charts.draw_trend_chart(ax_trend, periods, values, TREND_METRICS[metric][0], "#5cb85c", text_color, grid_color)
+            ax_trend.set_title(f"{TREND_METRICS[metric][0]} per {period_var.get()}", color=text_color)
+            fig_trend.tight_layout(pad=0.8)
+            canvas_trend.draw_idle()
+
+        for child in controls_frame.winfo_children():
+            if isinstance(child, ttk.Combobox): child.bind("<<ComboboxSelected>>", redraw)
+        ttk.Button(controls_frame, text="Apply", command=redraw).pack(side=tk.LEFT)
+        redraw()
 
     def load_and_compare_report(self, current_report_data_for_comparison):
         self.load_and_show_report(report_to_compare_with=current_report_data_for_comparison)
 
     def on_closing(self):
         if self.session_active: self.end_tracking_session_ui(force_end=True)
-        if self.gz_client.is_connected:
+        # Also stop an ingest thread that is reconnecting, or it could reconnect after the window is gone
+        if self.gz_client.is_connected or self.gaze_ingest_thread:
             self.is_tracking_connection = False
             if self.after_id_gaze_update: self.root_window.after_cancel(self.after_id_gaze_update)
             if self.after_id_session_timer: self.root_window.after_cancel(self.after_id_session_timer)
-            self.gz_client.disconnect()
+            self._stop_gaze_ingest()
         if self.aoi_definition_window: self.aoi_definition_window.destroy()
         if self.report_window_instance: self.report_window_instance.destroy()
         self.root_window.destroy()
@@ -0,0 +1,256 @@
+import numpy as np
+from aoi_index import AOI_CODE_TYPES, GAP_AOI_TYPE
+
+SIGNIFICANT_DISTRACTION_S = 3.0 # A distraction run at least this long ends a focus bout
+
+# Metric classes every AOI category collapses to
+OUTSIDE_CLASS, DISTRACTION_CLASS, PRODUCTIVE_CLASS, GAP_CLASS = 0, 1, 2, 3
+
+# Gap markers: a GAP_AOI_TYPE sample at time g means there is no data from g until the next
+# sample (tracker dropout, lost connection). The sample before it lasts only until g, the
+# marker's own time is not counted anywhere, transitions are not counted across it, and it
+# splits the session into stretches whose focus bouts and latencies are measured separately
+# (an open bout closes at g).
+
+
+def _metric_classes(aoi_codes, category_table):
+    # Anything that is not Productive, Distraction or a gap marker counts as Outside, like the original loop
+    class_of_code = np.array(
+        [PRODUCTIVE_CLASS if category == "Productive" else DISTRACTION_CLASS if category == "Distraction"
+         else GAP_CLASS if category == GAP_AOI_TYPE else OUTSIDE_CLASS
+         for category in category_table], dtype=np.uint8)
+    return class_of_code[np.asarray(aoi_codes)]
+
+
+def compute_session_metrics(timestamps, aoi_codes, category_table=AOI_CODE_TYPES,
+                            significant_distraction_s=SIGNIFICANT_DISTRACTION_S):
+    """Computes dwell, transitions, focus bouts and re-engagement latency in a few NumPy passes.
+
+    Gives the same results as the original per-sample loops in
+    FocusFlowApp.generate_session_metrics_data when there are no gap markers. Returns None
+    for fewer than two samples.
+    """
+    t = np.asarray(timestamps, dtype=np.float64)
+    n = len(t)
+    if n < 2:
+        return None
+    classes = _metric_classes(aoi_codes, category_table)
+
+    # --- Dwell time: each sample lasts until the next one, the last one as long as the one before ---
+    durations = np.empty(n, dtype=np.float64)
+    np.subtract(t[1:], t[:-1], out=durations[:-1])
+    durations[-1] = 0.0
+    is_gap = classes == GAP_CLASS
+    gap_indices = np.flatnonzero(is_gap)
+    gap_time = float(durations[gap_indices].sum())
+    durations[gap_indices] = 0.0
+    durations[-1] = 0.0 if is_gap[-1] else durations[-2]
+    total_time = float(durations.sum())
+    dwell = np.bincount(classes, weights=durations, minlength=4)
+    time_prod, time_dist, time_out = float(dwell[PRODUCTIVE_CLASS]), float(dwell[DISTRACTION_CLASS]), float(dwell[OUTSIDE_CLASS])
+
+    # --- Transitions between consecutive samples (never across a gap marker) ---
+    prev_classes, curr_classes = classes[:-1], classes[1:]
+    p_to_d = int(np.count_nonzero((prev_classes == PRODUCTIVE_CLASS) & (curr_classes == DISTRACTION_CLASS)))
+    d_to_p = int(np.count_nonzero((prev_classes == DISTRACTION_CLASS) & (curr_classes == PRODUCTIVE_CLASS)))
+
+    # --- Focus bouts and re-engagement latency, per stretch between gap markers ---
+    bout_durs, latency_times = [], []
+    stretch_bounds = np.concatenate(([0], gap_indices + 1, [n])).tolist()
+    for start, stop in zip(stretch_bounds[:-1], stretch_bounds[1:]):
+        if stop > start:
+            stretch_bouts, stretch_latencies = _bout_metrics(t[start:stop], classes[start:stop], significant_distraction_s)
+            bout_durs += stretch_bouts
+            latency_times += stretch_latencies
+
+    return {
+        "session_duration": total_time,
+        "dwell_times": {"Productive": time_prod, "Distraction": time_dist, "Outside": time_out},
+        "dwell_percentages": {
+            "Productive": (time_prod/total_time)*100 if total_time > 0 else 0,
+            "Distraction": (time_dist/total_time)*100 if total_time > 0 else 0,
+            "Outside": (time_out/total_time)*100 if total_time > 0 else 0
+        },
+        "transitions": {"P_to_D": p_to_d, "D_to_P": d_to_p},
+        "focus_bouts": {
+            "count": len(bout_durs),
+            "avg_duration": sum(bout_durs)/len(bout_durs) if bout_durs else 0,
+            "max_duration": max(bout_durs) if bout_durs else 0,
+            "durations_list": [d for d in bout_durs if d > 0.1] # Filter out tiny artifacts
+        },
+        "re_engagement_latency": {
+            "count": len(latency_times),
+            "avg_latency": sum(latency_times)/len(latency_times) if latency_times else 0
+        },
+        "gaps": {"count": len(gap_indices), "total_duration": gap_time},
+    }
+
+
+def _bout_metrics(t, classes, significant_distraction_s):
+    # Focus bout durations and re-engagement latencies of one stretch without gaps inside
+    # (a gap marker may end it), as lists
+    n = len(t)
+    prev_classes, curr_classes = classes[:-1], classes[1:]
+
+    # --- Run-length encoding: bout state only changes where a significant distraction run ends ---
+    run_starts = np.concatenate(([0], np.flatnonzero(curr_classes != prev_classes) + 1))
+    run_classes = classes[run_starts]
+    ended_distraction_runs = np.flatnonzero(run_classes[:-1] == DISTRACTION_CLASS)
+    distraction_start_times = t[run_starts[ended_distraction_runs]]
+    distraction_end_indices = run_starts[ended_distraction_runs + 1]
+    significant = (t[distraction_end_indices] - distraction_start_times) >= significant_distraction_s
+    sig_start_times = distraction_start_times[significant]
+    sig_end_indices = distraction_end_indices[significant]
+    sig_end_times = t[sig_end_indices]
+
+    # Significant distraction ends split the session into segments. A bout opens at the first
+    # Productive sample of a segment (the sample that ends the previous distraction is already
+    # spent) and closes at the start of the distraction that ends the segment, or at the last sample.
+    segment_after = np.concatenate(([-1], sig_end_indices))
+    segment_last = np.concatenate((sig_end_indices, [n - 1]))
+    segment_close_times = np.concatenate((sig_start_times, [t[-1]]))
+
+    productive_indices = np.flatnonzero(classes == PRODUCTIVE_CLASS)
+    if len(productive_indices):
+        next_productive = np.searchsorted(productive_indices, segment_after, side='right')
+        has_productive = next_productive < len(productive_indices)
+        bout_start_indices = productive_indices[np.minimum(next_productive, len(productive_indices) - 1)]
+        bout_opened = has_productive & (bout_start_indices <= segment_last)
+        bout_start_times = t[bout_start_indices]
+    else:
+        bout_opened = np.zeros(len(segment_after), dtype=bool)
+        bout_start_times = np.zeros(len(segment_after), dtype=np.float64)
+
+    bout_durs = (segment_close_times - bout_start_times)[bout_opened].tolist()
+    # Latency: from a significant distraction's end to the first Productive sample after it
+    latency_measured = bout_opened[1:] & (sig_end_times > 0)
+    latency_times = (bout_start_times[1:] - sig_end_times)[latency_measured].tolist()
+    return bout_durs, latency_times
+
+
+def compute_session_log_metrics(session_log, significant_distraction_s=SIGNIFICANT_DISTRACTION_S):
+    """compute_session_metrics over the columns of a SessionLog."""
+    return compute_session_metrics(session_log.timestamps, session_log.aoi_codes, session_log.category_table,
+                                   significant_distraction_s)
+
+
+class StreamingSessionMetrics:
+    # Incremental version of the session metrics, updated in O(1) per sample while tracking.
+    # Follows the original per-sample rules step by step, so current_metrics() matches
+    # compute_session_metrics over the same samples without rescanning the log.
+    def __init__(self, category_table=AOI_CODE_TYPES, significant_distraction_s=SIGNIFICANT_DISTRACTION_S):
+        self.significant_distraction_s = significant_distraction_s
+        self._class_of_code = _metric_classes(np.arange(len(category_table)), category_table).tolist()
+        self.sample_count = 0
+        self._dwell = [0.0, 0.0, 0.0, 0.0]  # Indexed by metric class (GAP_CLASS stays 0)
+        self._total_time = 0.0
+        self.gap_count = 0
+        self._gap_time = 0.0
+        self._last_timestamp = None
+        self._last_class = None
+        self._last_duration = None
+        self.p_to_d = 0
+        self.d_to_p = 0
+        self.bout_durs = []
+        self.latency_times = []
+        self._in_productive_bout = False
+        self._bout_start_time = 0
+        self._in_distraction_bout = False
+        self._distraction_start_time = 0
+        self._last_significant_distraction_end_time = 0
+
+    def update(self, timestamp, aoi_code):
+        sample_class = self._class_of_code[aoi_code]
+
+        # Dwell: the previous sample lasted until this one
+        last_class = self._last_class
+        if last_class is not None:
+            dt = timestamp - self._last_timestamp
+            if last_class == GAP_CLASS:
+                # Nothing is counted between a gap marker and the next sample
+                self._gap_time += dt
+                self._last_duration = 0.0
+            else:
+                self._dwell[last_class] += dt
+                self._total_time += dt
+                self._last_duration = dt
+            if last_class == PRODUCTIVE_CLASS and sample_class == DISTRACTION_CLASS: self.p_to_d += 1
+            elif last_class == DISTRACTION_CLASS and sample_class == PRODUCTIVE_CLASS: self.d_to_p += 1
+
+        is_prod = sample_class == PRODUCTIVE_CLASS
+        is_dist = sample_class == DISTRACTION_CLASS
+
+        # --- Productive Bout Logic ---
+        if is_prod and not self._in_productive_bout:
+            self._in_productive_bout = True
+            self._bout_start_time = timestamp
+            if self._last_significant_distraction_end_time > 0:
+                self.latency_times.append(timestamp - self._last_significant_distraction_end_time)
+                self._last_significant_distraction_end_time = 0
+
+        # --- Distraction Logic ---
+        if is_dist and not self._in_distraction_bout:
+            self._in_distraction_bout = True
+            self._distraction_start_time = timestamp
+        if not is_dist and self._in_distraction_bout:
+            self._in_distraction_bout = False
+            if timestamp - self._distraction_start_time >= self.significant_distraction_s:
+                if self._in_productive_bout:
+                    self.bout_durs.append(self._distraction_start_time - self._bout_start_time)
+                    self._in_productive_bout = False
+                self._last_significant_distraction_end_time = timestamp
+
+        if sample_class == GAP_CLASS:
+            # The stretch ends here: close the open bout, and start the next stretch afresh
+            if self._in_productive_bout:
+                self.bout_durs.append(timestamp - self._bout_start_time)
+                self._in_productive_bout = False
+            self._last_significant_distraction_end_time = 0
+            self.gap_count += 1
+
+        self._last_timestamp = timestamp
+        self._last_class = sample_class
+        self.sample_count += 1
+
+    def update_batch(self, timestamps, aoi_codes):
+        update = self.update
+        for timestamp, aoi_code in zip(timestamps, aoi_codes):
+            update(timestamp, aoi_code)
+
+    def current_metrics(self):
+        """Returns the metrics as if the session ended now (state is not modified)."""
+        if self.sample_count < 2:
+            return None
+        # The last sample is assumed to last as long as the one before it (a gap marker not at all)
+        last_duration = 0.0 if self._last_class == GAP_CLASS else self._last_duration
+        dwell = list(self._dwell)
+        dwell[self._last_class] += last_duration
+        total_time = self._total_time + last_duration
+        time_prod, time_dist, time_out = dwell[PRODUCTIVE_CLASS], dwell[DISTRACTION_CLASS], dwell[OUTSIDE_CLASS]
+
+        bout_durs = list(self.bout_durs)
+        if self._in_productive_bout:
+            bout_durs.append(self._last_timestamp - self._bout_start_time)
+        latency_times = self.latency_times
+
+        return {
+            "session_duration": total_time,
+            "dwell_times": {"Productive": time_prod, "Distraction": time_dist, "Outside": time_out},
+            "dwell_percentages": {
+                "Productive": (time_prod/total_time)*100 if total_time > 0 else 0,
+                "Distraction": (time_dist/total_time)*100 if total_time > 0 else 0,
+                "Outside": (time_out/total_time)*100 if total_time > 0 else 0
+            },
+            "transitions": {"P_to_D": self.p_to_d, "D_to_P": self.d_to_p},
+            "focus_bouts": {
+                "count": len(bout_durs),
+                "avg_duration": sum(bout_durs)/len(bout_durs) if bout_durs else 0,
+                "max_duration": max(bout_durs) if bout_durs else 0,
+                "durations_list": [d for d in bout_durs if d > 0.1] # Filter out tiny artifacts
+            },
+            "re_engagement_latency": {
+                "count": len(latency_times),
+                "avg_latency": sum(latency_times)/len(latency_times) if latency_times else 0
+            },
+            "gaps": {"count": self.gap_count, "total_duration": self._gap_time},
+        }
@@ -0,0 +1,140 @@
+"""Low-overhead hot-path instrumentation: stage timing histograms, queue depth, rates."""
+import json
+import time
+
+PERF_STATS_EXTENSION = ".perf"  # Written next to the session file
+HISTOGRAM_BUCKETS = 32  # Bucket i holds durations in [2**(i-1), 2**i) microseconds
+DEFAULT_LATE_AFTER_S = 0.1
+HUD_STAGES = ("socket_read", "xml_parse", "filter", "aoi_lookup", "session_log", "indicator", "preview")
+
+
+class RateCounter:
+    # Counts events; roll() turns the count of the last interval_s seconds into a rate
+    def __init__(self, interval_s=1.0):
+        self.interval_s = interval_s
+        self.total = 0
+        self.rate = 0.0
+        self._interval_start = time.monotonic()
+        self._interval_total = 0
+
+    def add(self, count=1):
+        self.total += count
+
+    def roll(self, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._interval_start
+        if elapsed >= self.interval_s:
+            self.rate = (self.total - self._interval_total) / elapsed
+            self._interval_start, self._interval_total = now, self.total
+        return self.rate
+
+
+class DurationHistogram:
+    # Count, sum, max and log2 buckets of durations in seconds
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, duration_s):
+        bucket = int(duration_s * 1e6).bit_length()
+        self.counts[bucket if bucket < HISTOGRAM_BUCKETS else HISTOGRAM_BUCKETS - 1] += 1
+        self.count += 1
+        self.total_s += duration_s
+        if duration_s > self.max_s:
+            self.max_s = duration_s
+
+    def percentile(self, q):
+        """Upper bound (in seconds) of the bucket holding the q-th percentile (0-100)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q / 100.0 * self.count, 0
+        for bucket, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return min((1 << bucket) / 1e6, self.max_s)
+        return self.max_s
+
+    def summary(self):
+        return {"count": self.count, "mean_ms": self.total_s / self.count * 1e3 if self.count else 0.0,
+                "p50_ms": self.percentile(50) * 1e3, "p95_ms": self.percentile(95) * 1e3,
+                "p99_ms": self.percentile(99) * 1e3, "max_ms": self.max_s * 1e3, "buckets_us": self.counts}
+
+
+class PerfStats:
+    # Shared by the ingest thread and the UI thread; each stage is written by one thread only.
+    # Instrumented code only holds one when instrumentation is on and checks `if stats:` before
+    # touching the clock, so with it off the cost is one branch per read or tick.
+    def __init__(self, tick_interval_s=0.030, late_after_s=DEFAULT_LATE_AFTER_S):
+        self.tick_interval_s = tick_interval_s
+        self.late_after_s = late_after_s
+        self.started = time.time()
+        self.stages = {}
+        self.tick_jitter = DurationHistogram()
+        self.samples = RateCounter()
+        self.ticks = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.late_samples = 0
+        self.dropped_samples = 0
+        self._dropped_baseline = None
+        self._last_tick = None
+
+    def record(self, stage, duration_s):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = DurationHistogram()
+        histogram.record(duration_s)
+
+    def lap(self, stage, since):
+        """Records the time since `since` (a perf_counter value) for stage; returns now."""
+        now = time.perf_counter()
+        self.record(stage, now - since)
+        return now
+
+    def start_tick(self, now):
+        """Called at the top of every UI tick with time.monotonic(); records the jitter."""
+        if self._last_tick is not None:
+            self.tick_jitter.record(abs(now - self._last_tick - self.tick_interval_s))
+        self._last_tick = now
+        self.ticks += 1
+
+    def record_drain(self, samples, dropped_total, now):
+        """Queue depth and late samples of one drain (samples oldest first), and the ring buffer's drop count."""
+        depth = len(samples)
+        self.queue_depth = depth
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        cutoff = now - self.late_after_s
+        for sample in samples:
+            if sample[0] >= cutoff:
+                break
+            self.late_samples += 1
+        if self._dropped_baseline is None:
+            self._dropped_baseline = dropped_total
+        self.dropped_samples = dropped_total - self._dropped_baseline
+
+    def snapshot(self):
+        return {"started": self.started, "duration_s": time.time() - self.started,
+                "samples": self.samples.total, "effective_hz": self.samples.roll(), "ticks": self.ticks,
+                "queue_depth": self.queue_depth, "max_queue_depth": self.max_queue_depth,
+                "late_samples": self.late_samples, "late_after_s": self.late_after_s,
+                "dropped_samples": self.dropped_samples,
+                "tick_jitter": self.tick_jitter.summary(),
+                "stages": {stage: histogram.summary() for stage, histogram in list(self.stages.items())}}
+
+    def hud_text(self):
+        """A few short lines for the session overlay."""
+        lines = [f"{self.samples.roll():.0f} Hz | queue {self.queue_depth} (max {self.max_queue_depth})",
+                 f"late {self.late_samples} | dropped {self.dropped_samples}",
+                 f"tick jitter p95 {self.tick_jitter.percentile(95) * 1e3:.1f} ms"]
+        for stage in HUD_STAGES:
+            histogram = self.stages.get(stage)
+            if histogram is not None and histogram.count:
+                lines.append(f"{stage} p95 {histogram.percentile(95) * 1e3:.2f} ms")
+        return "\n".join(lines)
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
@@ -0,0 +1,129 @@
+"""Render scheduler for the AOI preview canvas: only the Tk calls that change something are made."""
+import tkinter as tk
+
+from perf_stats import RateCounter
+
+PREVIEW_DOT_SIZE = 10
+DOT_COLORS = {
+    # AOI type: (fill, outline)
+    "Productive": ("green", "#27ae60"),
+    "Distraction": ("orange", "#f39c12"),
+    "Outside": ("red", "#c0392b"),
+    "gray": ("#7f8c8d", "#7f8c8d"),
+}
+
+
+class PreviewRenderer:
+    # Caches the canvas size from <Configure>, moves the gaze dot only by min_move_px or more,
+    # recolors it only when its AOI changes, moves AOI items in place on resize and caps frames
+    # at max_fps. Every Tk call is counted by a RateCounter.
+    def __init__(self, canvas, screen_width, screen_height, label_font, max_fps=24.0, min_move_px=1.0,
+                 tk_calls=None):
+        self.canvas = canvas
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.label_font = label_font
+        self.min_frame_interval = 1.0 / max_fps if max_fps else 0.0
+        self.min_move_px = min_move_px
+        self.tk_calls = tk_calls if tk_calls is not None else RateCounter()
+        self._size = None  # (width, height) from the last <Configure>
+        self._last_frame = float("-inf")
+        self._dot_position = None  # Canvas position the dot was last drawn at; None while hidden
+        self._dot_type = None
+        self._aoi_list = []
+        self._aoi_items = []  # [rectangle id, text id, (color, label)] per AOI
+        self._dot = canvas.create_oval(0, 0, 0, 0, fill="#3498db", outline="#2980b9", width=2)
+        self.tk_calls.add()
+
+    # --- Geometry ---
+
+    def on_configure(self, event):
+        """<Configure> handler of the canvas: caches the new size and moves the AOIs."""
+        if self._size == (event.width, event.height):
+            return
+        self._size = (event.width, event.height)
+        self._dot_position = None  # Forces the next frame to redraw the dot at the new scale
+        self._layout_aois()
+
+    def size(self):
+        if self._size is None:
+            # No <Configure> seen yet: ask Tk once
+            self._size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+            self.tk_calls.add(2)
+        return self._size
+
+    def to_canvas(self, screen_x, screen_y):
+        width, height = self.size()
+        return (screen_x / self.screen_width) * width, (screen_y / self.screen_height) * height
+
+    # --- AOIs ---
+
+    def set_aois(self, aoi_list):
+        self._aoi_list = list(aoi_list)
+        self._layout_aois()
+
+    def _layout_aois(self):
+        width, height = self.size()
+        if width <= 1 or height <= 1:
+            return
+        canvas, items = self.canvas, self._aoi_items
+        for i, aoi in enumerate(self._aoi_list):
+            xs1, ys1, xs2, ys2 = aoi['rect_screen_coords']
+            xc1, yc1 = self.to_canvas(xs1, ys1)
+            xc2, yc2 = self.to_canvas(xs2, ys2)
+            style = ("green" if aoi['type'] == "Productive" else "orange", f"{aoi['type'][0]}{i+1}")
+            if i < len(items):
+                rect_id, text_id, drawn_style = items[i]
+                canvas.coords(rect_id, xc1, yc1, xc2, yc2)
+                canvas.coords(text_id, xc1 + 7, yc1 + 7)
+                self.tk_calls.add(2)
+                if drawn_style != style:
+                    canvas.itemconfig(rect_id, outline=style[0])
+                    canvas.itemconfig(text_id, fill=style[0], text=style[1])
+                    items[i][2] = style
+                    self.tk_calls.add(2)
+            else:
+                rect_id = canvas.create_rectangle(xc1, yc1, xc2, yc2, outline=style[0], width=2, tags="aoi_preview_rect")
+                text_id = canvas.create_text(xc1 + 7, yc1 + 7, text=style[1], anchor=tk.NW, fill=style[0],
+                                             font=self.label_font, tags="aoi_preview_label")
+                items.append([rect_id, text_id, style])
+                self.tk_calls.add(2)
+        for rect_id, text_id, _ in items[len(self._aoi_list):]:
+            canvas.delete(rect_id, text_id)
+            self.tk_calls.add()
+        del items[len(self._aoi_list):]
+        # Keep the gaze dot above newly created AOIs
+        canvas.tag_raise(self._dot)
+        self.tk_calls.add()
+
+    # --- Gaze dot ---
+
+    def frame_due(self, now):
+        return now - self._last_frame >= self.min_frame_interval
+
+    def draw_gaze(self, screen_x, screen_y, aoi_type, now):
+        """Draws one frame of the gaze dot; returns its canvas position, or None if nothing changed."""
+        self._last_frame = now
+        width, height = self.size()
+        if width <= 1 or height <= 1:
+            return None
+        x, y = self.to_canvas(screen_x, screen_y)
+        moved = self._dot_position is None or max(abs(x - self._dot_position[0]), abs(y - self._dot_position[1])) >= self.min_move_px
+        if moved:
+            half = PREVIEW_DOT_SIZE / 2
+            self.canvas.coords(self._dot, x - half, y - half, x + half, y + half)
+            self._dot_position = (x, y)
+            self.tk_calls.add()
+        if aoi_type != self._dot_type:
+            fill, outline = DOT_COLORS.get(aoi_type, DOT_COLORS["Outside"])
+            self.canvas.itemconfig(self._dot, fill=fill, outline=outline)
+            self._dot_type = aoi_type
+            self.tk_calls.add()
+        elif not moved:
+            return None
+        return x, y
+
+    def hide_gaze(self):
+        self.canvas.coords(self._dot, 0, 0, 0, 0)
+        self._dot_position = None
+        self.tk_calls.add()
@@ -0,0 +1,148 @@
+import numpy as np
+
+from aoi_index import GAP_AOI_TYPE
+
+# Timeline y-level for each AOI status; anything else is drawn as Outside. Gaps are left blank.
+TIMELINE_GAP_LEVEL = 3
+TIMELINE_STATUS_LEVELS = {"Productive": 2, "Distraction": 1, "Outside": 0, GAP_AOI_TYPE: TIMELINE_GAP_LEVEL}
+TIMELINE_LEVEL_LABELS = ['Outside', 'Distraction', 'Productive']
+TIMELINE_TAIL_S = 0.5 # How far the last sample's segment extends past its timestamp
+
+DWELL_PIE_LABELS = ['Productive', 'Distraction', 'Outside AOIs']
+DWELL_PIE_COLORS = ['#5cb85c', '#f0ad4e', '#d9534f']
+
+
+def timeline_runs(timestamps, levels, tail=TIMELINE_TAIL_S):
+    """Run-length encodes a timeline: returns (run_start, run_end, run_level) arrays."""
+    t = np.asarray(timestamps, dtype=np.float64)
+    levels = np.asarray(levels)
+    run_starts = np.concatenate(([0], np.flatnonzero(levels[1:] != levels[:-1]) + 1))
+    run_start = t[run_starts]
+    run_end = np.append(run_start[1:], t[-1] + tail)
+    return run_start, run_end, levels[run_starts]
+
+
+def downsample_runs(run_start, run_end, run_level, bins, level_count=TIMELINE_GAP_LEVEL + 1):
+    """Resamples runs onto `bins` equal time bins, each showing the level with the most dwell in it."""
+    edges = np.linspace(run_start[0], run_end[-1], bins + 1)
+    boundaries = np.append(run_start, run_end[-1])
+    run_durations = run_end - run_start
+    dwell_per_bin = np.empty((level_count, bins))
+    for level in range(level_count):
+        # Cumulative dwell at each run boundary, interpolated at the bin edges
+        cumulative = np.concatenate(([0.0], np.cumsum(np.where(run_level == level, run_durations, 0.0))))
+        dwell_per_bin[level] = np.diff(np.interp(edges, boundaries, cumulative))
+    bin_level = dwell_per_bin.argmax(axis=0)
+    keep = np.concatenate(([True], bin_level[1:] != bin_level[:-1]))
+    new_start = edges[:-1][keep]
+    return new_start, np.append(new_start[1:], edges[-1]), bin_level[keep]
+
+
+def draw_dwell_pie(ax, dwell_times, text_color, edge_color, label_color, font_size):
+    """Draws the dwell time pie chart onto `ax` and returns the Productive/Distraction/Outside colors used."""
+    sizes = [dwell_times.get('Productive',0), dwell_times.get('Distraction',0), dwell_times.get('Outside',0)]
+    pie_colors = DWELL_PIE_COLORS if sum(sizes) > 0 else ['#777777']*3
+    valid_sizes = any(s > 0 for s in sizes)
+    explode = (0.05 if dwell_times.get('Productive',0) > 0 and valid_sizes else 0, 0, 0)
+
+    if valid_sizes:
+        wedges, texts_pie, autotexts = ax.pie(sizes, explode=explode, labels=None, colors=pie_colors,
+                                              autopct=lambda p: '{:.1f}%\n({:.1f}s)'.format(p, p * sum(sizes) / 100.0) if p > 1 else '',
+                                              shadow=False, startangle=120, pctdistance=0.8,
+                                              textprops={'color': label_color, 'fontsize': font_size, 'weight':'bold'},
+                                              wedgeprops={'edgecolor': edge_color, 'linewidth': 0.5})
+        ax.legend(wedges, DWELL_PIE_LABELS, title="AOI Types", loc="center left",
+                  bbox_to_anchor=(0.98, 0, 0.5, 1), fontsize=font_size,
+                  labelcolor=text_color, title_fontproperties={'size': font_size, 'weight':'bold'})
+    else:
+        ax.text(0.5, 0.5, "No dwell data", ha='center', va='center', color=text_color)
+    return pie_colors
+
+
+def session_log_runs(session_log, max_runs=None):
+    """Timeline runs of a SessionLog, optionally downsampled to at most max_runs equal time bins."""
+    level_of_code = np.array([TIMELINE_STATUS_LEVELS.get(category, 0) for category in session_log.category_table], dtype=np.uint8)
+    run_start, run_end, run_level = timeline_runs(session_log.timestamps, level_of_code[session_log.aoi_codes])
+    if max_runs is not None and len(run_start) > max_runs:
+        run_start, run_end, run_level = downsample_runs(run_start, run_end, run_level, max_runs)
+    return run_start, run_end, run_level
+
+
+def draw_timeline_runs(ax, run_start, run_end, run_level, status_colors, linewidth=5):
+    """Draws timeline runs onto `ax` as a single LineCollection (status_colors: Productive, Distraction, Outside)."""
+    from matplotlib.collections import LineCollection
+    level_colors = np.array([status_colors[2], status_colors[1], status_colors[0], None], dtype=object)
+    run_level = np.asarray(run_level, dtype=np.intp)
+    # One horizontal segment per run plus the vertical step into the next run, both in the run's color;
+    # gap runs and the steps into and out of them are not drawn
+    drawn = run_level != TIMELINE_GAP_LEVEL
+    stepped = drawn[:-1] & drawn[1:]
+    horizontal = np.stack([np.column_stack((run_start, run_level)), np.column_stack((run_end, run_level))], axis=1)[drawn]
+    vertical = np.stack([np.column_stack((run_end[:-1], run_level[:-1])), np.column_stack((run_end[:-1], run_level[1:]))], axis=1)[stepped]
+    segments = np.concatenate((horizontal, vertical)).astype(np.float64)
+    colors = np.concatenate((level_colors[run_level[drawn]], level_colors[run_level[:-1][stepped]])).tolist()
+    ax.add_collection(LineCollection(segments, colors=colors, linewidths=linewidth, capstyle='projecting'))
+    ax.set_xlim(run_start[0], run_end[-1])
+
+
+def draw_attention_timeline(ax, session_log, status_colors, text_color, grid_color, max_pixels=None):
+    """Draws the AOI status timeline of a SessionLog onto `ax` as a single LineCollection.
+
+    status_colors holds the Productive, Distraction and Outside colors. Segments are
+    downsampled to the axis width in pixels (or max_pixels), so the drawing cost depends on
+    the screen size rather than the session length.
+    """
+    if max_pixels is None:
+        max_pixels = max(1, int(ax.get_window_extent().width))
+    draw_timeline_runs(ax, *session_log_runs(session_log, max_pixels), status_colors)
+
+    ax.set_yticks([0,1,2]); ax.set_yticklabels(TIMELINE_LEVEL_LABELS)
+    ax.set_xlabel("Time (s)"); ax.set_ylabel("AOI Status")
+    ax.grid(True, axis='y', linestyle=':', linewidth=0.5, color=grid_color)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_color(text_color)
+    ax.spines['left'].set_color(text_color)
+    ax.set_ylim(-0.5, 2.5)
+
+
+def draw_trend_chart(ax, periods, values, value_label, line_color, text_color, grid_color, max_ticks=12):
+    """Draws a metric over time periods (e.g. from trends.trend_series) as a line with markers."""
+    if not periods:
+        ax.text(0.5, 0.5, "No sessions in this range", ha='center', va='center', color=text_color)
+        ax.set_xticks([]); ax.set_yticks([])
+        return
+    x = np.arange(len(periods))
+    ax.plot(x, values, color=line_color, marker='o', markersize=3 if len(periods) > 60 else 5, linewidth=1.5)
+    step = max(1, -(-len(periods) // max_ticks))
+    ax.set_xticks(x[::step]); ax.set_xticklabels(periods[::step], rotation=30, ha='right')
+    ax.set_xlim(-0.5, len(periods) - 0.5)
+    ax.set_ylabel(value_label)
+    ax.grid(True, axis='y', linestyle=':', linewidth=0.5, color=grid_color)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_color(text_color)
+    ax.spines['left'].set_color(text_color)
+
+
+def draw_timeline_small_multiples(fig, timelines, names, status_colors, text_color, grid_color):
+    """Draws one thin timeline row per session on a shared time axis (seconds since session start).
+
+    timelines holds (run_start, run_end, run_level) per session, e.g. already downsampled runs.
+    """
+    axes = fig.subplots(len(timelines), 1, sharex=True, squeeze=False)[:, 0]
+    # Rows are drawn from their first run, so the axis spans the longest first-to-last run
+    longest = max((run_end[-1] - run_start[0] for run_start, run_end, _ in timelines if len(run_end)), default=1.0)
+    for ax, (run_start, run_end, run_level), name in zip(axes, timelines, names):
+        if len(run_start):
+            draw_timeline_runs(ax, run_start - run_start[0], run_end - run_start[0], run_level, status_colors, linewidth=3)
+        ax.set_xlim(0, longest)
+        ax.set_ylim(-0.5, 2.5)
+        ax.set_yticks([])
+        ax.set_ylabel(name, rotation=0, ha='right', va='center', color=text_color, fontsize='small')
+        ax.grid(True, axis='x', linestyle=':', linewidth=0.5, color=grid_color)
+        for side in ('top', 'right', 'left'):
+            ax.spines[side].set_visible(False)
+        ax.spines['bottom'].set_color(text_color)
+    axes[-1].set_xlabel("Time since session start (s)")
+    return axes
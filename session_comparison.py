@@ -0,0 +1,83 @@
+"""N-way comparison of saved sessions from small per-session summaries built in worker processes."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from event_log import report_metric_log
+from report_charts import session_log_runs
+from session_library import load_report_file
+from session_log import report_summary
+
+COMPARISON_TIMELINE_RUNS = 400  # Max. timeline runs kept per session
+
+# (label, report path, format) rows of the aligned metrics table
+COMPARISON_METRICS = (
+    ("Duration (min)", ("session_duration",), lambda v: f"{v / 60:.1f}"),
+    ("Productive (%)", ("dwell_percentages", "Productive"), lambda v: f"{v:.1f}"),
+    ("Distraction (%)", ("dwell_percentages", "Distraction"), lambda v: f"{v:.1f}"),
+    ("Outside (%)", ("dwell_percentages", "Outside"), lambda v: f"{v:.1f}"),
+    ("P -> D transitions", ("transitions", "P_to_D"), lambda v: f"{v}"),
+    ("D -> P transitions", ("transitions", "D_to_P"), lambda v: f"{v}"),
+    ("Focus bouts", ("focus_bouts", "count"), lambda v: f"{v}"),
+    ("Avg. bout (s)", ("focus_bouts", "avg_duration"), lambda v: f"{v:.1f}"),
+    ("Longest bout (s)", ("focus_bouts", "max_duration"), lambda v: f"{v:.1f}"),
+    ("Re-engagements", ("re_engagement_latency", "count"), lambda v: f"{v}"),
+    ("Avg. latency (s)", ("re_engagement_latency", "avg_latency"), lambda v: f"{v:.2f}"),
+)
+
+
+def comparison_summary(report_data, name, timeline_runs=COMPARISON_TIMELINE_RUNS):
+    """Reduces a loaded report to its metrics and a downsampled timeline (drops raw_log and event_log)."""
+    summary = report_summary(report_data)
+    log = report_metric_log(report_data)
+    summary["name"] = name
+    event_log = report_data.get("event_log")
+    summary["sample_count"] = event_log.sample_count if event_log is not None else len(log)
+    if len(log) > 1:
+        # Copies, so the summary does not keep a (memory-mapped) sample file alive
+        summary["timeline"] = tuple(np.array(column) for column in session_log_runs(log, timeline_runs))
+    else:
+        summary["timeline"] = (np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.uint8))
+    return summary
+
+
+def load_comparison_summary(path, timeline_runs=COMPARISON_TIMELINE_RUNS):
+    """comparison_summary of a saved .ffs or JSON report (runs in a worker process)."""
+    summary = comparison_summary(load_report_file(path), os.path.basename(path), timeline_runs)
+    summary["path"] = path
+    return summary
+
+
+def _load_comparison_summary_safely(args):
+    path = args[0]
+    try:
+        return load_comparison_summary(*args)
+    except Exception as e:
+        return {"name": os.path.basename(path), "path": path, "error": str(e)}
+
+
+def load_comparison_summaries(paths, workers=None, timeline_runs=COMPARISON_TIMELINE_RUNS):
+    """Loads comparison summaries for many files in parallel; failed files come back with an 'error'."""
+    jobs = [(path, timeline_runs) for path in paths]
+    if workers == 1 or len(jobs) <= 1:
+        return [_load_comparison_summary_safely(job) for job in jobs]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_load_comparison_summary_safely, jobs))
+
+
+def _metric_value(summary, keys):
+    value = summary
+    for key in keys:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def comparison_table(summaries):
+    """Aligned metric rows: [(label, [formatted value per session]), ...]; missing values show as '-'."""
+    rows = []
+    for label, keys, fmt in COMPARISON_METRICS:
+        values = [_metric_value(summary, keys) for summary in summaries]
+        rows.append((label, [fmt(value) if value is not None else "-" for value in values]))
+    return rows
@@ -0,0 +1,268 @@
+"""Binary FocusFlow session container (.ffs); the layout is described in the README."""
+import json
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from aoi_index import AOI_CODE_TYPES
+from event_log import EVENT_COLUMN_NAMES, EVENT_COLUMNS, EventLog
+from session_log import SessionLog, report_summary
+
+SESSION_FILE_EXTENSION = ".ffs"
+FILE_MAGIC = b"FFSESS01"
+FILE_VERSION = 1
+BLOCK_HEADER = struct.Struct("<4sIB3xI")
+SAMPLES_BLOCK = b"SMPL"
+EVENTS_BLOCK = b"EVNT"
+META_BLOCK = b"META"
+FLAG_ZLIB = 0x01
+
+COLUMN_DTYPES = (np.dtype('<f8'), np.dtype('<f4'), np.dtype('<f4'), np.dtype('u1'))
+BYTES_PER_SAMPLE = sum(dtype.itemsize for dtype in COLUMN_DTYPES)
+EVENT_COLUMN_DTYPES = tuple(np.dtype(dtype).newbyteorder('<') for _, dtype in EVENT_COLUMNS)
+
+# Where sessions are streamed to while tracking
+DEFAULT_SESSION_DIR = os.path.join(os.path.expanduser("~"), ".focusflow", "sessions")
+
+
+def _padding(length, alignment=8):
+    return (-length) % alignment
+
+
+def _meta_block(report_summary):
+    summary_bytes = json.dumps(report_summary or {}).encode('utf-8')
+    summary_bytes += b" " * _padding(len(summary_bytes))
+    return BLOCK_HEADER.pack(META_BLOCK, 0, 0, len(summary_bytes)) + summary_bytes
+
+
+def _encode_columns(columns, dtypes=COLUMN_DTYPES):
+    columns = [np.ascontiguousarray(column, dtype=dtype) for column, dtype in zip(columns, dtypes)]
+    payload = b"".join(column.tobytes() for column in columns)
+    return payload + b"\0" * _padding(len(payload))
+
+
+def _decode_columns(payload, count, dtypes=COLUMN_DTYPES):
+    columns, offset = [], 0
+    for dtype in dtypes:
+        columns.append(payload[offset:offset + count * dtype.itemsize].view(dtype))
+        offset += count * dtype.itemsize
+    return columns
+
+
+class SessionFileWriter:
+    # Streams samples into a .ffs file in fixed-size blocks while a session is running
+    def __init__(self, path, category_table=AOI_CODE_TYPES, metadata=None, block_size=65536, compress=False):
+        self.path = path
+        self.block_size = block_size
+        self.compress = compress
+        self.sample_count = 0
+        self.event_count = 0
+        self._pending = SessionLog(capacity=block_size, category_table=category_table)
+        self._pending_events = EventLog(category_table=category_table)
+        self._file = open(path, 'wb')
+
+        header = {"version": FILE_VERSION, "created": time.time(), "category_table": list(category_table),
+                  "metadata": metadata or {}}
+        header_bytes = json.dumps(header).encode('utf-8')
+        header_bytes += b" " * _padding(len(FILE_MAGIC) + 4 + len(header_bytes))
+        self._file.write(FILE_MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+
+    def append_samples(self, timestamps, raw_x, raw_y, aoi_codes):
+        self._pending.extend(timestamps, raw_x, raw_y, aoi_codes)
+        if len(self._pending) >= self.block_size:
+            self._write_pending_block()
+
+    def append_events(self, event_log):
+        """Buffers closed events (an EventLog); they are written with the next flush or close."""
+        self._pending_events.extend(event_log)
+        if len(self._pending_events) >= self.block_size:
+            self._write_pending_events()
+
+    def _write_block(self, kind, count, payload):
+        flags = 0
+        if self.compress:
+            payload = zlib.compress(payload, 1)
+            payload += b"\0" * _padding(len(payload))
+            flags |= FLAG_ZLIB
+        self._file.write(BLOCK_HEADER.pack(kind, count, flags, len(payload)))
+        self._file.write(payload)
+
+    def _write_pending_block(self):
+        pending = self._pending
+        if not len(pending):
+            return
+        self._write_block(SAMPLES_BLOCK, len(pending),
+                          _encode_columns((pending.timestamps, pending.raw_x, pending.raw_y, pending.aoi_codes)))
+        self.sample_count += len(pending)
+        self._pending = SessionLog(capacity=self.block_size, category_table=pending.category_table)
+
+    def _write_pending_events(self):
+        pending = self._pending_events
+        if not len(pending):
+            return
+        self._write_block(EVENTS_BLOCK, len(pending),
+                          _encode_columns([pending.column(name) for name in EVENT_COLUMN_NAMES], EVENT_COLUMN_DTYPES))
+        self.event_count += len(pending)
+        self._pending_events = EventLog(category_table=pending.category_table)
+
+    def flush(self, fsync=False):
+        """Writes any buffered samples and events as (short) blocks and flushes the file."""
+        self._write_pending_block()
+        self._write_pending_events()
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self, report_summary=None, fsync=False):
+        """Writes the remaining samples and events and the report summary block, then closes the file."""
+        if self._file.closed:
+            return
+        self._write_pending_block()
+        self._write_pending_events()
+        self._file.write(_meta_block(report_summary))
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+
+class SessionFileReader:
+    # Memory-maps a .ffs file; uncompressed sample blocks are zero-copy NumPy views
+    def __init__(self, path):
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode='r') if os.path.getsize(path) else np.zeros(0, np.uint8)
+        if bytes(self._data[:len(FILE_MAGIC)]) != FILE_MAGIC:
+            raise ValueError(f"{path} is not a FocusFlow session file.")
+        header_length = struct.unpack_from("<I", self._data, len(FILE_MAGIC))[0]
+        header_start = len(FILE_MAGIC) + 4
+        self.header = json.loads(bytes(self._data[header_start:header_start + header_length]))
+        self.category_table = self.header.get("category_table", list(AOI_CODE_TYPES))
+        self.summary = None  # Report summary; None means the session was never finished
+        self._sample_blocks = []  # (offset, sample count, flags, payload length)
+        self._event_blocks = []  # (offset, event count, flags, payload length)
+        self.data_end = header_start + header_length  # End of the last intact block
+        self._scan_blocks(self.data_end)
+
+    def _scan_blocks(self, offset):
+        file_size = len(self._data)
+        while offset + BLOCK_HEADER.size <= file_size:
+            kind, count, flags, length = BLOCK_HEADER.unpack_from(self._data, offset)
+            payload_start = offset + BLOCK_HEADER.size
+            if payload_start + length > file_size:
+                break  # Truncated block from an interrupted write
+            if kind == SAMPLES_BLOCK:
+                self._sample_blocks.append((payload_start, count, flags, length))
+            elif kind == EVENTS_BLOCK:
+                self._event_blocks.append((payload_start, count, flags, length))
+            elif kind == META_BLOCK:
+                self.summary = json.loads(bytes(self._data[payload_start:payload_start + length]))
+            else:
+                break  # Unknown or corrupt block: stop at the last good one
+            offset = payload_start + length
+            self.data_end = offset
+
+    @property
+    def is_finished(self):
+        return self.summary is not None
+
+    @property
+    def sample_count(self):
+        return sum(count for _, count, _, _ in self._sample_blocks)
+
+    @property
+    def event_count(self):
+        return sum(count for _, count, _, _ in self._event_blocks)
+
+    def _payload(self, payload_start, flags, length):
+        payload = self._data[payload_start:payload_start + length]
+        if flags & FLAG_ZLIB:
+            payload = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+        return payload
+
+    def iter_blocks(self):
+        """Yields (timestamps, raw_x, raw_y, aoi_codes) column arrays for each sample block."""
+        for payload_start, count, flags, length in self._sample_blocks:
+            yield tuple(_decode_columns(self._payload(payload_start, flags, length), count))
+
+    def load_event_log(self):
+        """Returns all stored events as an EventLog (empty if the file has none)."""
+        blocks = [_decode_columns(self._payload(payload_start, flags, length), count, EVENT_COLUMN_DTYPES)
+                  for payload_start, count, flags, length in self._event_blocks]
+        if not blocks:
+            return EventLog(category_table=self.category_table)
+        columns = blocks[0] if len(blocks) == 1 else [np.concatenate(column) for column in zip(*blocks)]
+        return EventLog.from_columns(dict(zip(EVENT_COLUMN_NAMES, columns)), self.category_table)
+
+    @property
+    def recorded_sample_count(self):
+        """Samples recorded in the session, also for files that only kept events."""
+        if self._sample_blocks or not self._event_blocks:
+            return self.sample_count
+        return self.load_event_log().sample_count
+
+    def load_session_log(self):
+        """Returns all samples as a SessionLog (zero-copy when the file has a single plain block).
+
+        Files that only kept events return the events' metric samples (EventLog.to_session_log).
+        """
+        if not self._sample_blocks and self._event_blocks:
+            return self.load_event_log().to_session_log()
+        blocks = list(self.iter_blocks())
+        if len(blocks) == 1:
+            return SessionLog.from_columns(*blocks[0], category_table=self.category_table)
+        if not blocks:
+            return SessionLog(category_table=self.category_table)
+        return SessionLog.from_columns(*(np.concatenate(column) for column in zip(*blocks)), category_table=self.category_table)
+
+    def close(self):
+        # Dropping the last reference to the memmap closes the mapping
+        self._data = None
+
+
+def write_session_file(path, report_data, compress=False, block_size=65536):
+    """Writes a whole report (SessionLog raw_log, event_log if any, summary metrics) as a .ffs file.
+
+    raw_log is skipped when the report says raw samples were not kept (it is then derived from the events).
+    """
+    session_log = report_data["raw_log"]
+    writer = SessionFileWriter(path, session_log.category_table, block_size=block_size, compress=compress)
+    if report_data.get("raw_samples_kept", True):
+        for start in range(0, len(session_log), block_size):
+            block = session_log[start:start + block_size]
+            writer.append_samples(block.timestamps, block.raw_x, block.raw_y, block.aoi_codes)
+    if report_data.get("event_log") is not None:
+        writer.append_events(report_data["event_log"])
+    writer.close(report_summary(report_data))
+
+
+def read_session_file(path):
+    """Loads a .ffs file as a report dict: the stored summary plus raw_log as a SessionLog (and event_log)."""
+    reader = SessionFileReader(path)
+    report_data = dict(reader.summary or {})
+    report_data["raw_log"] = reader.load_session_log()
+    if reader.event_count:
+        report_data["event_log"] = reader.load_event_log()
+    return report_data
+
+
+def read_session_summary(path):
+    """Returns only the stored report summary of a .ffs file, without touching the samples."""
+    return SessionFileReader(path).summary
+
+
+def finalize_session_file(path, report_summary):
+    """Finishes an interrupted .ffs file in place: drops any torn trailing block and appends the summary."""
+    reader = SessionFileReader(path)
+    data_end, finished = reader.data_end, reader.is_finished
+    reader.close()
+    if finished:
+        return
+    with open(path, 'r+b') as f:
+        f.truncate(data_end)
+        f.seek(data_end)
+        f.write(_meta_block(report_summary))
+        f.flush()
+        os.fsync(f.fileno())
@@ -0,0 +1,114 @@
+"""Crash-safe session journal: samples and events are appended to the .ffs file by a writer thread."""
+import glob
+import os
+import queue
+import threading
+import time
+
+from aoi_index import AOI_CODE_TYPES
+from event_log import EventLog
+from metrics_engine import compute_session_log_metrics
+from session_file import DEFAULT_SESSION_DIR, SESSION_FILE_EXTENSION, SessionFileReader, SessionFileWriter, finalize_session_file
+
+# "never" leaves syncing to the OS, "close" syncs once when the session ends, "flush" after every block
+FSYNC_POLICIES = ("never", "close", "flush")
+JOURNAL_FLUSH_INTERVAL_S = 1.0
+JOURNAL_FLUSH_SAMPLES = 1024
+JOURNAL_FSYNC_POLICY = "close"
+
+_CLOSE = object()
+
+
+class SessionJournal:
+    # Owns a SessionFileWriter on a background thread; append_samples() only enqueues, so the UI
+    # tick never waits on the disk. Buffered data is written as a block every flush_interval_s
+    # seconds or flush_samples samples, whichever comes first.
+    def __init__(self, path, category_table=AOI_CODE_TYPES, metadata=None, flush_interval_s=JOURNAL_FLUSH_INTERVAL_S,
+                 flush_samples=JOURNAL_FLUSH_SAMPLES, fsync_policy=JOURNAL_FSYNC_POLICY):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self.flush_samples = flush_samples
+        self.fsync_policy = fsync_policy
+        self.flush_count = 0
+        self.error = None # First write error; the caller shows it (writing goes on, data may be missing)
+        self._writer = SessionFileWriter(path, category_table, metadata)
+        self._queue = queue.SimpleQueue()
+        self._close_summary = None
+        self._thread = threading.Thread(target=self._run, name="SessionJournal", daemon=True)
+        self._thread.start()
+
+    def append_samples(self, timestamps, raw_x, raw_y, aoi_codes):
+        """Queues a batch for the writer thread. The sequences must not be modified afterwards."""
+        self._queue.put((timestamps, raw_x, raw_y, aoi_codes))
+
+    def append_events(self, event_log):
+        """Queues closed events (an EventLog, e.g. EventLogBuilder.pop_closed()) for the writer thread."""
+        if len(event_log):
+            self._queue.put(event_log)
+
+    def close(self, report_summary=None, timeout=None):
+        """Writes everything still queued plus the report summary and waits for the writer thread."""
+        if not self._thread.is_alive():
+            return
+        self._close_summary = report_summary
+        self._queue.put(_CLOSE)
+        self._thread.join(timeout)
+
+    def _run(self):
+        writer = self._writer
+        pending = 0
+        next_flush = time.monotonic() + self.flush_interval_s
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _CLOSE:
+                break
+            try:
+                if isinstance(item, EventLog):
+                    writer.append_events(item)
+                    pending += len(item)
+                elif item is not None:
+                    writer.append_samples(*item)
+                    pending += len(item[0])
+                if pending and (pending >= self.flush_samples or time.monotonic() >= next_flush):
+                    writer.flush(fsync=self.fsync_policy == "flush")
+                    self.flush_count += 1
+                    pending = 0
+            except OSError as e:
+                self._report_error(e)
+            if time.monotonic() >= next_flush:
+                next_flush = time.monotonic() + self.flush_interval_s
+        try:
+            writer.close(self._close_summary, fsync=self.fsync_policy != "never")
+        except OSError as e:
+            self._report_error(e)
+
+    def _report_error(self, error):
+        # Keep draining the queue so the UI thread never blocks on a broken journal
+        if self.error is None:
+            self.error = error
+
+
+def recover_unfinished_sessions(session_dir=DEFAULT_SESSION_DIR):
+    """Finishes every journal in session_dir that was never closed.
+
+    Returns the recovered paths and (path, error) for every journal that could not be recovered.
+    """
+    recovered, failed = [], []
+    for path in sorted(glob.glob(os.path.join(session_dir, f"*{SESSION_FILE_EXTENSION}"))):
+        try:
+            reader = SessionFileReader(path)
+            if reader.is_finished:
+                continue
+            summary = compute_session_log_metrics(reader.load_session_log()) or {}
+            reader.close()
+            summary["recovered"] = True
+            finalize_session_file(path, summary)
+            recovered.append(path)
+        except (OSError, ValueError) as e:
+            failed.append((path, e))
+    return recovered, failed
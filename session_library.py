@@ -0,0 +1,259 @@
+"""Indexed SQLite catalog of saved FocusFlow sessions, with the daily rollups trends use."""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from metrics_engine import compute_session_log_metrics
+from session_file import DEFAULT_SESSION_DIR, SESSION_FILE_EXTENSION, SessionFileReader, read_session_file
+from session_log import report_from_json_dict
+from trends import ROLLUP_SCHEMA, load_trend_rollups, refresh_daily_rollups
+
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.expanduser("~"), ".focusflow", "library.sqlite3")
+REPORT_EXTENSIONS = (SESSION_FILE_EXTENSION, ".json")
+SCHEMA_VERSION = 1
+
+# Columns that queries may sort by
+SORT_COLUMNS = ("started_at", "session_duration", "productive_pct", "distraction_pct", "focus_bout_count",
+                "avg_latency", "path")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    file_size INTEGER NOT NULL,
+    file_mtime REAL NOT NULL,
+    started_at REAL NOT NULL,
+    day TEXT,
+    session_duration REAL,
+    productive_s REAL,
+    distraction_s REAL,
+    outside_s REAL,
+    productive_pct REAL,
+    distraction_pct REAL,
+    outside_pct REAL,
+    focus_bout_count INTEGER,
+    avg_bout_duration REAL,
+    max_bout_duration REAL,
+    reengagement_count INTEGER,
+    avg_latency REAL,
+    p_to_d INTEGER,
+    d_to_p INTEGER,
+    sample_count INTEGER,
+    aoi_layout_hash TEXT,
+    recovered INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_started_at ON sessions (started_at);
+CREATE INDEX IF NOT EXISTS sessions_productive_pct ON sessions (productive_pct);
+CREATE INDEX IF NOT EXISTS sessions_layout ON sessions (aoi_layout_hash, started_at);
+CREATE INDEX IF NOT EXISTS sessions_day ON sessions (day);
+"""
+
+
+def aoi_layout_hash(aoi_list):
+    """Stable hash of an AOI layout (rectangles and types, in any order); None without a layout."""
+    if not aoi_list:
+        return None
+    layout = sorted((list(aoi['rect_screen_coords']), aoi['type']) for aoi in aoi_list)
+    return hashlib.sha1(json.dumps(layout).encode('utf-8')).hexdigest()[:16]
+
+
+def load_report_file(path):
+    """Loads a saved .ffs or JSON report as a report dict with a SessionLog raw_log."""
+    if path.lower().endswith(SESSION_FILE_EXTENSION):
+        report_data = read_session_file(path)
+        if "session_duration" not in report_data:
+            # Unfinished session file: recompute the summary from its samples
+            report_data.update(compute_session_log_metrics(report_data["raw_log"]) or {})
+        return report_data
+    with open(path, 'r') as f:
+        return report_from_json_dict(json.load(f))
+
+
+def session_day(timestamp):
+    """Local calendar day (YYYY-MM-DD) a session is rolled up under."""
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp))
+
+
+def _read_catalog_entry(path):
+    # Summary, start time, sample count and AOI layout of one report file
+    if path.lower().endswith(SESSION_FILE_EXTENSION):
+        reader = SessionFileReader(path)
+        metadata = reader.header.get("metadata", {})
+        summary = reader.summary
+        if not summary:
+            summary = compute_session_log_metrics(reader.load_session_log()) or {}
+        sample_count = reader.recorded_sample_count
+        started_at = metadata.get("session_start_time") or summary.get("session_start_time") or reader.header.get("created")
+        aoi_list = metadata.get("aoi_list") or summary.get("aoi_list")
+        reader.close()
+    else:
+        with open(path, 'r') as f:
+            summary = json.load(f)
+        sample_count = len(summary.get("raw_log") or []) or sum(event["sample_count"] for event in summary.get("event_log") or [])
+        aoi_list = summary.get("aoi_list")
+        started_at = summary.get("session_start_time")
+        if started_at is None and "report_generated_timestamp" in summary:
+            started_at = summary["report_generated_timestamp"] - summary.get("session_duration", 0)
+    if started_at is None:
+        started_at = os.path.getmtime(path)
+    return summary, started_at, sample_count, aoi_list
+
+
+class SessionLibrary:
+    # SQLite catalog of saved sessions; use as a context manager or call close()
+    def __init__(self, db_path=DEFAULT_LIBRARY_PATH):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self._dirty_days = set()
+        with self.connection:
+            self.connection.executescript(_SCHEMA + ROLLUP_SCHEMA)
+            self.connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _commit(self):
+        refresh_daily_rollups(self.connection, self._dirty_days)
+        self._dirty_days.clear()
+        self.connection.commit()
+
+    def index_file(self, path, _commit=True):
+        """Adds or refreshes one report file; returns False if it was already up to date."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self.connection.execute("SELECT file_size, file_mtime FROM sessions WHERE path = ?", (path,)).fetchone()
+        if row and row["file_size"] == stat.st_size and row["file_mtime"] == stat.st_mtime:
+            return False
+
+        summary, started_at, sample_count, aoi_list = _read_catalog_entry(path)
+        self.add_session(path, summary, started_at, sample_count, aoi_list, stat.st_size, stat.st_mtime, _commit)
+        return True
+
+    def add_session(self, path, summary, started_at, sample_count=0, aoi_list=None, file_size=0, file_mtime=0,
+                    _commit=True):
+        """Adds or replaces the catalog row of a session from its report summary (no file access)."""
+        path = os.path.abspath(path)
+        previous = self.connection.execute("SELECT day FROM sessions WHERE path = ?", (path,)).fetchone()
+        if previous:
+            self._dirty_days.add(previous["day"])
+        day = session_day(started_at)
+        self._dirty_days.add(day)
+
+        dwell_times = summary.get("dwell_times", {})
+        percentages = summary.get("dwell_percentages", {})
+        bouts = summary.get("focus_bouts", {})
+        latency = summary.get("re_engagement_latency", {})
+        transitions = summary.get("transitions", {})
+        self.connection.execute(
+            """INSERT INTO sessions (path, file_size, file_mtime, started_at, day, session_duration, productive_s,
+                   distraction_s, outside_s, productive_pct, distraction_pct, outside_pct, focus_bout_count,
+                   avg_bout_duration, max_bout_duration, reengagement_count, avg_latency, p_to_d, d_to_p,
+                   sample_count, aoi_layout_hash, recovered)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (path) DO UPDATE SET
+                   file_size = excluded.file_size, file_mtime = excluded.file_mtime, started_at = excluded.started_at,
+                   day = excluded.day, session_duration = excluded.session_duration,
+                   productive_s = excluded.productive_s, distraction_s = excluded.distraction_s,
+                   outside_s = excluded.outside_s, productive_pct = excluded.productive_pct,
+                   distraction_pct = excluded.distraction_pct, outside_pct = excluded.outside_pct,
+                   focus_bout_count = excluded.focus_bout_count, avg_bout_duration = excluded.avg_bout_duration,
+                   max_bout_duration = excluded.max_bout_duration, reengagement_count = excluded.reengagement_count,
+                   avg_latency = excluded.avg_latency, p_to_d = excluded.p_to_d, d_to_p = excluded.d_to_p,
+                   sample_count = excluded.sample_count, aoi_layout_hash = excluded.aoi_layout_hash,
+                   recovered = excluded.recovered""",
+            (path, file_size, file_mtime, started_at, day, summary.get("session_duration"),
+             dwell_times.get("Productive"), dwell_times.get("Distraction"), dwell_times.get("Outside"),
+             percentages.get("Productive"), percentages.get("Distraction"), percentages.get("Outside"),
+             bouts.get("count"), bouts.get("avg_duration"), bouts.get("max_duration"),
+             latency.get("count"), latency.get("avg_latency"), transitions.get("P_to_D"), transitions.get("D_to_P"),
+             sample_count, aoi_layout_hash(aoi_list), int(bool(summary.get("recovered")))))
+        if _commit:
+            self._commit()
+
+    def index_directory(self, directory=DEFAULT_SESSION_DIR, recursive=False):
+        """Incrementally re-indexes a directory: new and changed files are read, deleted ones dropped.
+
+        Returns (indexed, removed) counts.
+        """
+        directory = os.path.abspath(directory)
+        on_disk = set()
+        for root, dirs, files in os.walk(directory):
+            on_disk.update(os.path.join(root, name) for name in files if name.lower().endswith(REPORT_EXTENSIONS))
+            if not recursive:
+                break
+
+        indexed = 0
+        try:
+            for path in sorted(on_disk):
+                try:
+                    indexed += self.index_file(path, _commit=False)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Could not index {path}: {e}")
+            prefix = os.path.join(directory, "")
+            known = [row["path"] for row in self.connection.execute(
+                "SELECT path FROM sessions WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))]
+            stale = [path for path in known
+                     if path not in on_disk and (recursive or os.path.dirname(path) == directory)]
+            for path in stale:
+                self.remove(path, _commit=False)
+            self._commit()
+        except BaseException:
+            self._dirty_days.clear()
+            self.connection.rollback()
+            raise
+        return indexed, len(stale)
+
+    def remove(self, path, _commit=True):
+        path = os.path.abspath(path)
+        row = self.connection.execute("SELECT day FROM sessions WHERE path = ?", (path,)).fetchone()
+        if row:
+            self._dirty_days.add(row["day"])
+            self.connection.execute("DELETE FROM sessions WHERE path = ?", (path,))
+        if _commit:
+            self._commit()
+
+    def _where(self, since, until, min_productive, max_productive, aoi_layout_hash):
+        clauses, params = [], []
+        for clause, value in (("started_at >= ?", since), ("started_at < ?", until),
+                              ("productive_pct >= ?", min_productive), ("productive_pct <= ?", max_productive),
+                              ("aoi_layout_hash = ?", aoi_layout_hash)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, since=None, until=None, min_productive=None, max_productive=None, aoi_layout_hash=None,
+              order_by="started_at", descending=True, limit=50, offset=0):
+        """Returns one page of catalog rows (as dicts) matching the filters; times are Unix timestamps."""
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort sessions by {order_by}")
+        where, params = self._where(since, until, min_productive, max_productive, aoi_layout_hash)
+        sql = (f"SELECT * FROM sessions{where} ORDER BY {order_by} {'DESC' if descending else 'ASC'}, id"
+               f" LIMIT ? OFFSET ?")
+        return [dict(row) for row in self.connection.execute(sql, params + [limit, offset])]
+
+    def count(self, since=None, until=None, min_productive=None, max_productive=None, aoi_layout_hash=None):
+        """Number of catalog rows matching the filters (for pagination)."""
+        where, params = self._where(since, until, min_productive, max_productive, aoi_layout_hash)
+        return self.connection.execute(f"SELECT COUNT(*) FROM sessions{where}", params).fetchone()[0]
+
+    def trend_rollups(self, period="day", since_day=None, until_day=None):
+        """Summed daily rollups per day/week/month (see trends.load_trend_rollups)."""
+        return load_trend_rollups(self.connection, period, since_day, until_day)
+
+
+def days_ago(days):
+    """Unix timestamp `days` days before now, for the since/until filters."""
+    return time.time() - days * 86400
@@ -0,0 +1,199 @@
+import numpy as np
+from aoi_index import AOI_CODE_TYPES
+
+TIMESTAMP_DTYPE = np.float64
+COORD_DTYPE = np.float32
+AOI_CODE_DTYPE = np.uint8
+
+
+class SessionLog:
+    # Columnar, growable storage for session samples.
+    # Replaces the list of {'timestamp', 'raw_x', 'raw_y', 'aoi_status'} dicts: timestamps
+    # are float64, coordinates float32 and AOI statuses uint8 codes into category_table.
+    def __init__(self, capacity=4096, category_table=AOI_CODE_TYPES):
+        capacity = max(1, capacity)
+        self._timestamps = np.empty(capacity, dtype=TIMESTAMP_DTYPE)
+        self._raw_x = np.empty(capacity, dtype=COORD_DTYPE)
+        self._raw_y = np.empty(capacity, dtype=COORD_DTYPE)
+        self._aoi_codes = np.empty(capacity, dtype=AOI_CODE_DTYPE)
+        self._size = 0
+        self.category_table = list(category_table)
+        self._category_codes = {category: code for code, category in enumerate(self.category_table)}
+
+    # --- Zero-copy column views (valid until the next append grows the log) ---
+    @property
+    def timestamps(self):
+        return self._timestamps[:self._size]
+
+    @property
+    def raw_x(self):
+        return self._raw_x[:self._size]
+
+    @property
+    def raw_y(self):
+        return self._raw_y[:self._size]
+
+    @property
+    def aoi_codes(self):
+        return self._aoi_codes[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def category_code(self, aoi_status):
+        code = self._category_codes.get(aoi_status)
+        if code is None:
+            if len(self.category_table) > np.iinfo(AOI_CODE_DTYPE).max:
+                raise ValueError("Too many AOI categories for the session log.")
+            code = len(self.category_table)
+            self.category_table.append(aoi_status)
+            self._category_codes[aoi_status] = code
+        return code
+
+    def _reserve(self, extra):
+        required = self._size + extra
+        capacity = len(self._timestamps)
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2)
+        for name in ("_timestamps", "_raw_x", "_raw_y", "_aoi_codes"):
+            old_column = getattr(self, name)
+            new_column = np.empty(new_capacity, dtype=old_column.dtype)
+            new_column[:self._size] = old_column[:self._size]
+            setattr(self, name, new_column)
+
+    def append(self, timestamp, raw_x, raw_y, aoi_status):
+        self._reserve(1)
+        i = self._size
+        self._timestamps[i] = timestamp
+        self._raw_x[i] = raw_x
+        self._raw_y[i] = raw_y
+        self._aoi_codes[i] = aoi_status if isinstance(aoi_status, (int, np.integer)) else self.category_code(aoi_status)
+        self._size = i + 1
+
+    def extend(self, timestamps, raw_x, raw_y, aoi_codes):
+        """Appends whole arrays at once; aoi_codes must already be codes into category_table."""
+        count = len(timestamps)
+        self._reserve(count)
+        start, end = self._size, self._size + count
+        self._timestamps[start:end] = timestamps
+        self._raw_x[start:end] = raw_x
+        self._raw_y[start:end] = raw_y
+        self._aoi_codes[start:end] = aoi_codes
+        self._size = end
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # Slices share memory with this log; appending to one gives it its own buffers
+            start, stop, step = index.indices(self._size)
+            if step != 1:
+                raise ValueError("SessionLog slices must be contiguous.")
+            sliced = SessionLog.__new__(SessionLog)
+            sliced._timestamps = self._timestamps[start:stop]
+            sliced._raw_x = self._raw_x[start:stop]
+            sliced._raw_y = self._raw_y[start:stop]
+            sliced._aoi_codes = self._aoi_codes[start:stop]
+            sliced._size = max(0, stop - start)
+            sliced.category_table = list(self.category_table)
+            sliced._category_codes = dict(self._category_codes)
+            return sliced
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("SessionLog index out of range")
+        # Same shape as the old per-sample dicts
+        return {
+            'timestamp': float(self._timestamps[index]),
+            'raw_x': float(self._raw_x[index]), 'raw_y': float(self._raw_y[index]),
+            'aoi_status': self.category_table[self._aoi_codes[index]]
+        }
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def aoi_statuses(self):
+        """Returns the AOI status strings as a list (one per sample)."""
+        table = self.category_table
+        return [table[code] for code in self.aoi_codes.tolist()]
+
+    def to_records(self):
+        """Returns the log as the list of dicts used by the JSON report format."""
+        return [
+            {'timestamp': timestamp, 'raw_x': raw_x, 'raw_y': raw_y, 'aoi_status': aoi_status}
+            for timestamp, raw_x, raw_y, aoi_status in zip(
+                self.timestamps.tolist(), self.raw_x.tolist(), self.raw_y.tolist(), self.aoi_statuses())
+        ]
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds a log from a list of per-sample dicts (e.g. a loaded report's raw_log)."""
+        log = cls(capacity=len(records))
+        if records:
+            log.extend([entry['timestamp'] for entry in records],
+                       [entry['raw_x'] for entry in records], [entry['raw_y'] for entry in records],
+                       [log.category_code(entry['aoi_status']) for entry in records])
+        return log
+
+    @classmethod
+    def from_columns(cls, timestamps, raw_x, raw_y, aoi_codes, category_table=AOI_CODE_TYPES):
+        """Wraps existing column arrays (e.g. memory-mapped ones) without copying when dtypes match."""
+        log = cls.__new__(cls)
+        log._timestamps = np.asarray(timestamps, dtype=TIMESTAMP_DTYPE)
+        log._raw_x = np.asarray(raw_x, dtype=COORD_DTYPE)
+        log._raw_y = np.asarray(raw_y, dtype=COORD_DTYPE)
+        log._aoi_codes = np.asarray(aoi_codes, dtype=AOI_CODE_DTYPE)
+        log._size = len(log._timestamps)
+        log.category_table = list(category_table)
+        log._category_codes = {category: code for code, category in enumerate(log.category_table)}
+        return log
+
+    @property
+    def nbytes(self):
+        """Bytes used by the stored samples (excluding spare capacity)."""
+        return self._size * (self._timestamps.itemsize + self._raw_x.itemsize + self._raw_y.itemsize + self._aoi_codes.itemsize)
+
+
+def as_session_log(raw_log):
+    # Reports loaded from JSON carry a list of dicts; everything else is already a SessionLog
+    if isinstance(raw_log, SessionLog):
+        return raw_log
+    return SessionLog.from_records(raw_log or [])
+
+
+# Report keys holding per-sample or per-event data rather than summary values
+REPORT_LOG_KEYS = ("raw_log", "event_log")
+
+
+def report_summary(report_data):
+    """Returns the summary part of a report (everything except the sample and event logs)."""
+    return {key: value for key, value in report_data.items() if key not in REPORT_LOG_KEYS}
+
+
+def report_to_json_dict(report_data):
+    """Returns a copy of a report whose raw_log and event_log are JSON-friendly lists of dicts.
+
+    raw_log is left out when raw samples were not kept, since it is rebuilt from the events on load.
+    """
+    json_report = dict(report_data)
+    if json_report.get("event_log") is not None:
+        json_report["event_log"] = json_report["event_log"].to_records()
+        if not json_report.get("raw_samples_kept", True):
+            json_report.pop("raw_log", None)
+    if isinstance(json_report.get("raw_log"), SessionLog):
+        json_report["raw_log"] = json_report["raw_log"].to_records()
+    return json_report
+
+
+def report_from_json_dict(loaded_data):
+    """Converts the raw_log (and event_log) of a report loaded from JSON into columnar logs (in place)."""
+    if loaded_data.get("event_log") is not None:
+        from event_log import EventLog
+        loaded_data["event_log"] = EventLog.from_records(loaded_data["event_log"])
+        if "raw_log" not in loaded_data:
+            loaded_data["raw_log"] = loaded_data["event_log"].to_session_log()
+    if "raw_log" in loaded_data:
+        loaded_data["raw_log"] = as_session_log(loaded_data["raw_log"])
+    return loaded_data
@@ -0,0 +1,157 @@
+"""The original per-sample metric loops, kept verbatim as the golden reference for metrics_engine."""
+import math
+import random
+
+from aoi_index import GAP_AOI_TYPE
+
+# The categories the original loops knew about (gap markers are checked separately)
+REFERENCE_AOI_TYPES = ("Outside", "Distraction", "Productive")
+
+
+def reference_session_metrics(log):
+    # The original pure-Python implementation, kept verbatim as the golden reference
+    durations = [(log[i+1]['timestamp'] - log[i]['timestamp']) for i in range(len(log) - 1)]
+    durations.append(durations[-1] if durations else 0.03)
+    time_prod, time_dist, time_out = 0, 0, 0
+    total_time = sum(durations)
+    report_data = {"session_duration": total_time}
+    for i, entry in enumerate(log):
+        dt = durations[i]
+        if entry['aoi_status'] == "Productive": time_prod += dt
+        elif entry['aoi_status'] == "Distraction": time_dist += dt
+        else: time_out += dt
+    report_data["dwell_times"] = {"Productive": time_prod, "Distraction": time_dist, "Outside": time_out}
+    report_data["dwell_percentages"] = {
+        "Productive": (time_prod/total_time)*100 if total_time > 0 else 0,
+        "Distraction": (time_dist/total_time)*100 if total_time > 0 else 0,
+        "Outside": (time_out/total_time)*100 if total_time > 0 else 0
+    }
+    p_to_d, d_to_p = 0, 0
+    for i in range(1, len(log)):
+        prev, curr = log[i-1]['aoi_status'], log[i]['aoi_status']
+        if prev == "Productive" and curr == "Distraction": p_to_d += 1
+        elif prev == "Distraction" and curr == "Productive": d_to_p += 1
+    report_data["transitions"] = {"P_to_D": p_to_d, "D_to_P": d_to_p}
+
+    bout_durs, latency_times = [], []
+    in_productive_bout, bout_start_time = False, 0
+    in_distraction_bout, distraction_start_time = False, 0
+    last_significant_distraction_end_time = 0
+    for entry in log:
+        is_prod = entry['aoi_status'] == "Productive"
+        is_dist = entry['aoi_status'] == "Distraction"
+        timestamp = entry['timestamp']
+        if is_prod and not in_productive_bout:
+            in_productive_bout = True
+            bout_start_time = timestamp
+            if last_significant_distraction_end_time > 0:
+                latency_times.append(bout_start_time - last_significant_distraction_end_time)
+                last_significant_distraction_end_time = 0
+        if is_dist and not in_distraction_bout:
+            in_distraction_bout = True
+            distraction_start_time = timestamp
+        if not is_dist and in_distraction_bout:
+            in_distraction_bout = False
+            if timestamp - distraction_start_time >= 3.0:
+                if in_productive_bout:
+                    bout_durs.append(distraction_start_time - bout_start_time)
+                    in_productive_bout = False
+                last_significant_distraction_end_time = timestamp
+    if in_productive_bout:
+        bout_durs.append(log[-1]['timestamp'] - bout_start_time)
+
+    report_data["focus_bouts"] = {
+        "count": len(bout_durs),
+        "avg_duration": sum(bout_durs)/len(bout_durs) if bout_durs else 0,
+        "max_duration": max(bout_durs) if bout_durs else 0,
+        "durations_list": [d for d in bout_durs if d > 0.1]
+    }
+    report_data["re_engagement_latency"] = {
+        "count": len(latency_times),
+        "avg_latency": sum(latency_times)/len(latency_times) if latency_times else 0
+    }
+    return report_data
+
+
+def reference_metrics_with_gaps(log):
+    # The reference loops run stretch by stretch, each stretch ending at (and including) its gap
+    # marker. They count a marker as Outside for as long as the interval before it, so that is
+    # taken back out; a lone sample after the last marker has no interval before it and lasts 0.
+    stretches, stretch = [], []
+    for entry in log:
+        stretch.append(entry)
+        if entry['aoi_status'] == GAP_AOI_TYPE:
+            stretches.append(stretch)
+            stretch = []
+    if stretch:
+        stretches.append(stretch)
+
+    dwell = {"Productive": 0.0, "Distraction": 0.0, "Outside": 0.0}
+    transitions = {"P_to_D": 0, "D_to_P": 0}
+    bout_count, bout_total, bout_max, bout_list = 0, 0.0, 0, []
+    latency_count, latency_total = 0, 0.0
+    for stretch in stretches:
+        metrics = reference_session_metrics(stretch)
+        for name, value in metrics["dwell_times"].items():
+            dwell[name] += value
+        last_duration = stretch[-1]['timestamp'] - stretch[-2]['timestamp'] if len(stretch) > 1 else 0.03
+        if stretch[-1]['aoi_status'] == GAP_AOI_TYPE:
+            dwell["Outside"] -= last_duration
+        elif len(stretch) == 1 and len(stretches) > 1:
+            dwell[stretch[-1]['aoi_status'] if stretch[-1]['aoi_status'] in dwell else "Outside"] -= last_duration
+        for name, value in metrics["transitions"].items():
+            transitions[name] += value
+        bouts, latencies = metrics["focus_bouts"], metrics["re_engagement_latency"]
+        bout_count += bouts["count"]
+        bout_total += bouts["avg_duration"] * bouts["count"]
+        bout_max = max(bout_max, bouts["max_duration"])
+        bout_list += bouts["durations_list"]
+        latency_count += latencies["count"]
+        latency_total += latencies["avg_latency"] * latencies["count"]
+
+    total_time = sum(dwell.values())
+    gap_times = [log[i + 1]['timestamp'] - log[i]['timestamp'] for i in range(len(log) - 1)
+                 if log[i]['aoi_status'] == GAP_AOI_TYPE]
+    return {
+        "session_duration": total_time,
+        "dwell_times": dwell,
+        "dwell_percentages": {name: (value/total_time)*100 if total_time > 0 else 0 for name, value in dwell.items()},
+        "transitions": transitions,
+        "focus_bouts": {"count": bout_count, "avg_duration": bout_total/bout_count if bout_count else 0,
+                        "max_duration": bout_max, "durations_list": bout_list},
+        "re_engagement_latency": {"count": latency_count,
+                                  "avg_latency": latency_total/latency_count if latency_count else 0},
+        "gaps": {"count": sum(1 for entry in log if entry['aoi_status'] == GAP_AOI_TYPE),
+                 "total_duration": sum(gap_times)},
+    }
+
+
+def synthetic_log(sample_count, seed, sample_interval=1/30, switch_probability=0.01):
+    # Dwell-style trace: long stays in one AOI category with occasional jitter and dropouts
+    rnd = random.Random(seed)
+    timestamp, status, log = 0.0, "Productive", []
+    for _ in range(sample_count):
+        if rnd.random() < switch_probability:
+            status = rnd.choice(REFERENCE_AOI_TYPES)
+        timestamp += sample_interval * rnd.choice((1, 1, 1, 0, 2)) + (5.0 if rnd.random() < 0.0005 else 0.0)
+        log.append({'timestamp': timestamp, 'raw_x': 0.0, 'raw_y': 0.0, 'aoi_status': status})
+    return log
+
+
+def with_gap_markers(log, seed, gap_probability=0.01):
+    # Turns random samples of a synthetic log into gap markers
+    rnd = random.Random(seed)
+    return [dict(entry, raw_x=math.nan, raw_y=math.nan, aoi_status=GAP_AOI_TYPE) if rnd.random() < gap_probability
+            else entry for entry in log]
+
+
+def assert_metrics_match(expected, actual, path="metrics"):
+    if isinstance(expected, dict):
+        for key, value in expected.items():
+            assert_metrics_match(value, actual[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert len(expected) == len(actual), f"{path}: {len(expected)} != {len(actual)} items"
+        for expected_item, actual_item in zip(expected, actual):
+            assert_metrics_match(expected_item, actual_item, path)
+    else:
+        assert math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-9), f"{path}: {expected} != {actual}"
@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+import pytest
+
+from aoi_index import AOI_TYPE_CODES, AOIIndex, reclassify_raw_log
+
+
+def brute_force_lookup(aoi_list, x, y):
+    # The original per-sample hit test: smallest containing AOI, earlier definition first on ties
+    for aoi in sorted(aoi_list, key=lambda aoi: (aoi['rect_screen_coords'][2] - aoi['rect_screen_coords'][0]) *
+                      (aoi['rect_screen_coords'][3] - aoi['rect_screen_coords'][1])):
+        x1, y1, x2, y2 = aoi['rect_screen_coords']
+        if x1 <= x <= x2 and y1 <= y <= y2:
+            return aoi['type']
+    return "Outside"
+
+
+def random_layout(rnd, count):
+    aoi_list = []
+    for _ in range(count):
+        x1, y1 = rnd.choice((rnd.randint(0, 1900), rnd.uniform(0, 1900))), rnd.randint(0, 1060)
+        width, height = rnd.choice((0, 1, rnd.randint(2, 600))), rnd.choice((0, rnd.randint(1, 400)))
+        aoi_list.append({'rect_screen_coords': (x1, y1, x1 + width, y1 + height),
+                         'type': rnd.choice(("Productive", "Distraction"))})
+    return aoi_list
+
+
+def probe_points(rnd, aoi_list, count):
+    # Random points plus every AOI corner and edge midpoint, where off-by-one errors show
+    points = [(rnd.uniform(-50, 1970), rnd.uniform(-50, 1130)) for _ in range(count)]
+    for aoi in aoi_list:
+        x1, y1, x2, y2 = aoi['rect_screen_coords']
+        points += [(x1, y1), (x2, y2), (x1, y2), (x2, y1), ((x1 + x2) / 2, y1), (x2, (y1 + y2) / 2),
+                   (x2 + 1e-9, y2), (x1 - 1e-9, y1)]
+    return points
+
+
+@pytest.mark.parametrize("seed", range(40))
+@pytest.mark.parametrize("grid_size", [1, 7, 64])
+def test_lookup_matches_brute_force(seed, grid_size):
+    rnd = random.Random(seed)
+    aoi_list = random_layout(rnd, rnd.choice((1, 2, 5, 30)))
+    index = AOIIndex(aoi_list, grid_size=grid_size)
+    points = probe_points(rnd, aoi_list, 500)
+    expected = [brute_force_lookup(aoi_list, x, y) for x, y in points]
+    assert [index.lookup(x, y) for x, y in points] == expected
+    xs, ys = zip(*points)
+    assert index.classify_batch(xs, ys).tolist() == [AOI_TYPE_CODES[aoi_type] for aoi_type in expected]
+
+
+def test_equal_areas_resolve_to_the_first_defined():
+    aoi_list = [{'rect_screen_coords': (0, 0, 100, 100), 'type': "Distraction"},
+                {'rect_screen_coords': (50, 50, 150, 150), 'type': "Productive"}]
+    index = AOIIndex(aoi_list)
+    assert index.lookup(75, 75) == "Distraction"
+    assert index.lookup(125, 125) == "Productive"
+
+
+def test_empty_layout_is_all_outside():
+    index = AOIIndex([])
+    assert len(index) == 0
+    assert index.lookup(0, 0) == "Outside"
+    assert index.classify_batch([0.0, 10.0], [0.0, 10.0]).tolist() == [AOI_TYPE_CODES["Outside"]] * 2
+
+
+def test_nan_coordinates_are_outside():
+    index = AOIIndex([{'rect_screen_coords': (0, 0, 1920, 1080), 'type': "Productive"}])
+    assert index.lookup(float("nan"), 10.0) == "Outside"
+    assert index.classify_batch(np.array([np.nan]), np.array([10.0])).tolist() == [AOI_TYPE_CODES["Outside"]]
+
+
+def test_reclassify_raw_log():
+    raw_log = [{'timestamp': 0.0, 'raw_x': 10.0, 'raw_y': 10.0, 'aoi_status': "Outside"},
+               {'timestamp': 0.5, 'raw_x': 500.0, 'raw_y': 10.0, 'aoi_status': "Productive"}]
+    aoi_list = [{'rect_screen_coords': (0, 0, 100, 100), 'type': "Productive"}]
+    assert [entry['aoi_status'] for entry in reclassify_raw_log(raw_log, aoi_list)] == ["Productive", "Outside"]
+    assert raw_log[0]['aoi_status'] == "Outside"  # A copy is returned
@@ -0,0 +1,107 @@
+import random
+
+import numpy as np
+import pytest
+
+from event_log import EVENT_COLUMN_NAMES, EventLog, EventLogBuilder, report_metric_log
+from metrics_engine import compute_session_log_metrics
+from session_log import SessionLog
+from tests.reference_metrics import assert_metrics_match
+
+
+def random_stream(seed, sample_count):
+    rnd = random.Random(seed)
+    timestamps = np.cumsum([rnd.choice((0.0, 1 / 60, 1 / 30, 0.5)) for _ in range(sample_count)])
+    codes, fixations, code, fixation = [], [], 2, True
+    for _ in range(sample_count):
+        if rnd.random() < 0.1:
+            code = rnd.choice((0, 1, 2))
+        if rnd.random() < 0.15:
+            fixation = not fixation
+        codes.append(code)
+        fixations.append(fixation)
+    xs = [rnd.uniform(0, 1920) for _ in range(sample_count)]
+    ys = [rnd.uniform(0, 1080) for _ in range(sample_count)]
+    return timestamps, np.array(xs), np.array(ys), np.array(codes, dtype=np.uint8), np.array(fixations)
+
+
+def assert_events_equal(actual, expected):
+    assert len(actual) == len(expected)
+    for name in EVENT_COLUMN_NAMES:
+        if name in ("x", "y"):
+            np.testing.assert_allclose(actual.column(name), expected.column(name), rtol=1e-6)
+        else:
+            np.testing.assert_array_equal(actual.column(name), expected.column(name))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_builder_matches_from_samples(seed):
+    timestamps, xs, ys, codes, fixations = random_stream(seed, random.Random(seed).randint(1, 400))
+    builder = EventLogBuilder()
+    streamed = EventLog()
+    rnd = random.Random(seed)
+    start = 0
+    while start < len(timestamps):
+        stop = start + rnd.randint(1, 50)  # UI-tick sized batches
+        builder.extend(timestamps[start:stop].tolist(), xs[start:stop].tolist(), ys[start:stop].tolist(),
+                       codes[start:stop].tolist(), fixations[start:stop].tolist())
+        streamed.extend(builder.pop_closed())
+        start = stop
+    assert_events_equal(builder.current_log(), EventLog.from_samples(timestamps, xs, ys, codes, fixations))
+    streamed.extend(builder.finish()[len(streamed):])
+    expected = EventLog.from_samples(timestamps, xs, ys, codes, fixations)
+    assert_events_equal(streamed, expected)
+    assert expected.sample_count == builder.sample_count == len(timestamps)
+
+
+def test_events_split_on_aoi_and_fixation_changes():
+    builder = EventLogBuilder()
+    builder.extend([0.0, 0.1, 0.2, 0.3, 0.4], [0, 2, 4, 6, 8], [0, 0, 0, 0, 0], [2, 2, 2, 1, 1],
+                   [True, True, False, False, False])
+    log = builder.finish()
+    records = log.to_records()
+    assert [(r["aoi_status"], r["is_fixation"], r["sample_count"]) for r in records] == \
+        [("Productive", True, 2), ("Productive", False, 1), ("Distraction", False, 2)]
+    assert (records[0]["start"], records[0]["second"], records[0]["end"], records[0]["x"]) == (0.0, 0.1, 0.1, 1.0)
+    assert records[2]["end_interval"] == pytest.approx(0.1)
+
+    dwell_only = EventLogBuilder(split_on_fixation=False)
+    dwell_only.extend([0.0, 0.1, 0.2, 0.3, 0.4], [0] * 5, [0] * 5, [2, 2, 2, 1, 1], [True, True, False, False, False])
+    assert [r["sample_count"] for r in dwell_only.finish().to_records()] == [3, 2]
+
+
+def test_records_round_trip_and_unknown_categories():
+    timestamps, xs, ys, codes, fixations = random_stream(1, 200)
+    log = EventLog.from_samples(timestamps, xs, ys, codes, fixations)
+    assert_events_equal(EventLog.from_records(log.to_records()), log)
+
+    records = log.to_records()[:2]
+    records[1]["aoi_status"] = "Reading"
+    restored = EventLog.from_records(records)
+    assert restored.category_table[-1] == "Reading" and restored.to_records()[1]["aoi_status"] == "Reading"
+
+
+def test_slices_share_memory_and_must_be_contiguous():
+    log = EventLog.from_samples(*random_stream(2, 100)[:4])
+    tail = log[2:]
+    assert len(tail) == len(log) - 2 and np.shares_memory(tail.column("start"), log.column("start"))
+    with pytest.raises(ValueError):
+        log[::2]
+    with pytest.raises(TypeError):
+        log[0]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_metric_samples_reproduce_the_session_metrics(seed):
+    timestamps, xs, ys, codes, fixations = random_stream(seed, 300)
+    log = EventLog.from_samples(timestamps, xs, ys, codes, fixations)
+    full = compute_session_log_metrics(SessionLog.from_columns(timestamps, xs, ys, codes))
+    assert_metrics_match(full, compute_session_log_metrics(log.to_session_log()))
+    assert len(log.to_session_log()) <= 3 * len(log) + 1
+    assert_metrics_match(full, compute_session_log_metrics(report_metric_log({"event_log": log, "raw_log": None})))
+
+
+def test_empty_logs():
+    assert len(EventLog.from_samples([], [], [], [])) == 0
+    assert len(EventLogBuilder().finish()) == 0
+    assert len(EventLog().to_session_log()) == 0
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from focus_indicator import FRAGMENTED_COLOR, INDICATOR_COLORS, INDICATOR_IDLE_COLOR, FocusIndicator
+
+STATUSES = ("Productive", "Distraction", "Outside")
+
+
+def brute_force_colors(samples, thresholds, window_s=10.0, fragmented=4):
+    # Re-derives every color from the whole history: the AOI changes in the last window_s
+    # and how long the current status has lasted
+    colors, changes, status, since = [], [], "Outside", 0.0
+    for aoi_status, now in samples:
+        if aoi_status != status:
+            status, since = aoi_status, now
+            changes.append(now)
+        if sum(1 for t in changes if now - t < window_s) >= fragmented:
+            colors.append(FRAGMENTED_COLOR)
+        elif aoi_status in INDICATOR_COLORS:
+            colors.append(INDICATOR_COLORS[aoi_status][now - since > thresholds[aoi_status]])
+        else:
+            colors.append(INDICATOR_IDLE_COLOR)
+    return colors
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_brute_force(seed):
+    rnd = random.Random(seed)
+    now, samples, status = 0.0, [], "Productive"
+    for _ in range(2000):
+        if rnd.random() < rnd.choice((0.005, 0.05, 0.3)):
+            status = rnd.choice(STATUSES + ("Gap",))
+        now += rnd.choice((0.0, 1 / 60, 1 / 30, 0.25, 2.0))
+        samples.append((status, now))
+    indicator = FocusIndicator()
+    colors = [indicator.update(aoi_status, t) for aoi_status, t in samples]
+    assert colors == brute_force_colors(samples, indicator.thresholds)
+
+
+def test_thresholds_switch_to_the_second_color_strictly_after():
+    indicator = FocusIndicator(consistent_focus_s=5.0)
+    indicator.reset(0.0, "Productive")
+    assert indicator.update("Productive", 5.0) == INDICATOR_COLORS["Productive"][0]
+    assert indicator.update("Productive", 5.001) == INDICATOR_COLORS["Productive"][1]
+    assert indicator.update("Distraction", 6.0) == INDICATOR_COLORS["Distraction"][0]
+    assert indicator.update("Distraction", 9.5) == INDICATOR_COLORS["Distraction"][1]
+
+
+def test_fragmented_attention_turns_yellow_until_changes_leave_the_window():
+    indicator = FocusIndicator(transition_window_s=10.0, fragmented_transitions=4)
+    for i, status in enumerate(("Productive", "Distraction", "Productive", "Distraction")):
+        color = indicator.update(status, float(i))
+    assert color == FRAGMENTED_COLOR
+    assert indicator.update("Distraction", 9.9) == FRAGMENTED_COLOR
+    assert indicator.update("Distraction", 10.0) == INDICATOR_COLORS["Distraction"][1]  # The change at 0 s left
+
+
+def test_unknown_status_is_idle_and_batches_match_single_updates():
+    indicator = FocusIndicator()
+    assert indicator.update("Gap", 1.0) == INDICATOR_IDLE_COLOR
+    statuses, times = ["Productive", "Productive", "Outside", "Outside"], [0.0, 6.0, 7.0, 13.0]
+    single = FocusIndicator()
+    expected = [single.update(status, t) for status, t in zip(statuses, times)][-1]
+    assert FocusIndicator().update_batch(statuses, times) == expected == INDICATOR_COLORS["Outside"][1]
+
+
+def test_reset_clears_history():
+    indicator = FocusIndicator()
+    for i in range(6):
+        indicator.update(STATUSES[i % 2], float(i))
+    indicator.reset(100.0)
+    assert indicator.color == INDICATOR_IDLE_COLOR and not indicator.transition_times
+    assert indicator.update("Outside", 100.5) == INDICATOR_COLORS["Outside"][0]
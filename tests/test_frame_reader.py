@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from gaze_client import LengthPrefixedFrameReader, get_7bit_encoded_int_bytes
+
+
+class ChunkedSocket:
+    # Delivers the given bytes in recv_into calls of at most the given sizes (then at most max_chunk)
+    def __init__(self, data, chunk_sizes=(), max_chunk=1 << 20):
+        self.data = memoryview(data)
+        self.chunk_sizes = list(chunk_sizes)
+        self.max_chunk = max_chunk
+        self.recv_calls = 0
+
+    def recv_into(self, view):
+        self.recv_calls += 1
+        size = self.chunk_sizes.pop(0) if self.chunk_sizes else self.max_chunk
+        size = min(size, len(view), len(self.data))
+        view[:size] = self.data[:size]
+        self.data = self.data[size:]
+        return size
+
+
+def encode_frames(payloads):
+    return b"".join(get_7bit_encoded_int_bytes(len(payload)) + payload for payload in payloads)
+
+
+def test_read_frame_returns_payloads_in_order():
+    payloads = [b"ok", b"", b"<GazeData/>", b"x" * 200]  # 200 needs a two-byte length prefix
+    reader = LengthPrefixedFrameReader(ChunkedSocket(encode_frames(payloads)))
+    assert [reader.read_frame() for _ in payloads] == payloads
+
+
+def test_read_frames_yields_every_complete_frame_from_one_recv():
+    payloads = [f"<GazeData>{i}</GazeData>".encode() for i in range(50)]
+    sock = ChunkedSocket(encode_frames(payloads))
+    reader = LengthPrefixedFrameReader(sock)
+    assert reader.read_frames() == payloads
+    assert sock.recv_calls == 1
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_frames_split_across_reads(seed):
+    rnd = random.Random(seed)
+    payloads = [bytes(rnd.randrange(256) for _ in range(rnd.choice((0, 1, 127, 128, 300)))) for _ in range(40)]
+    data = encode_frames(payloads)
+    # Partial reads that cut through length prefixes and payloads alike
+    sock = ChunkedSocket(data, [rnd.randint(1, 7) for _ in range(len(data))])
+    reader = LengthPrefixedFrameReader(sock, buffer_size=64)
+    received = []
+    while len(received) < len(payloads):
+        received.extend(reader.read_frames())
+    assert received == payloads
+
+
+def test_buffer_grows_for_a_frame_larger_than_the_buffer():
+    payloads = [b"a" * 10, b"b" * 5000, b"c" * 3]
+    reader = LengthPrefixedFrameReader(ChunkedSocket(encode_frames(payloads), max_chunk=100), buffer_size=16)
+    assert [reader.read_frame() for _ in payloads] == payloads
+    assert len(reader._buffer) >= 5000
+
+
+def test_closed_socket_raises():
+    reader = LengthPrefixedFrameReader(ChunkedSocket(encode_frames([b"complete"])[:-2]))
+    with pytest.raises(ConnectionAbortedError):
+        reader.read_frame()
+
+
+def test_overlong_length_prefix_is_a_protocol_error():
+    reader = LengthPrefixedFrameReader(ChunkedSocket(b"\xff" * 8))
+    with pytest.raises(ValueError):
+        reader.read_frame()
@@ -0,0 +1,67 @@
+import pytest
+
+from benchmarks.gaze_corpus import load_corpus
+from gaze_decoder import (ALL_EXTRA_FIELDS, HEAD_POSE_FIELDS, TIMESTAMP_FIELDS, ElementTreeGazeDecoder, FastGazeDecoder,
+                          make_gaze_decoder)
+from gaze_server import encode_gaze_frame
+
+EXTRA_FIELD_SETS = [(), TIMESTAMP_FIELDS, ("HeadX", "HeadYaw"), HEAD_POSE_FIELDS, ALL_EXTRA_FIELDS]
+
+
+@pytest.mark.parametrize("extra_fields", EXTRA_FIELD_SETS)
+def test_fast_decoder_matches_element_tree(extra_fields):
+    fast, reference = FastGazeDecoder(extra_fields), ElementTreeGazeDecoder(extra_fields)
+    for record in load_corpus(count=500):
+        assert fast.decode(record) == reference.decode(record)
+    assert fast.fallback_count == 0
+
+
+def test_stand_in_server_frames_decode_with_timestamp():
+    frame = encode_gaze_frame(12.3456, 100.25, 200.5)
+    record = frame[1:]  # Short records have a one-byte length prefix
+    assert FastGazeDecoder(TIMESTAMP_FIELDS).decode(record) == {'GazeX': 100.25, 'GazeY': 200.5, 'Timestamp': 12345.6}
+
+
+def test_extras_before_gaze_fields_and_value_types():
+    record = (b"<GazeData><Valid> true </Valid><Timestamp>17</Timestamp>"
+              b"<GazeX> 1.5 </GazeX><GazeY>2</GazeY><HeadX>n/a</HeadX></GazeData>")
+    for extra_fields in (("Valid", "Timestamp"), ("Valid", "Timestamp", "HeadX")):
+        decoded = FastGazeDecoder(extra_fields).decode(record)
+        assert decoded == ElementTreeGazeDecoder(extra_fields).decode(record)
+        assert decoded["Valid"] is True and decoded["Timestamp"] == 17.0
+    assert FastGazeDecoder(("HeadX",)).decode(record)["HeadX"] == "n/a"
+
+
+def test_missing_extra_field_is_left_out():
+    assert FastGazeDecoder(TIMESTAMP_FIELDS).decode(b"<GazeData><GazeX>1</GazeX><GazeY>2</GazeY></GazeData>") == \
+        {'GazeX': 1.0, 'GazeY': 2.0}
+
+
+@pytest.mark.parametrize("record", [
+    b"<GazeData><GazeY>2</GazeY><GazeX>1</GazeX></GazeData>",  # Unusual field order
+    b"<GazeData><GazeX>1</GazeX><!-- note --><GazeY>2</GazeY></GazeData>",
+])
+def test_unusual_records_fall_back_to_element_tree(record):
+    fast = FastGazeDecoder()
+    assert fast.decode(record) == ElementTreeGazeDecoder().decode(record) == {'GazeX': 1.0, 'GazeY': 2.0}
+    assert fast.fallback_count == 1
+
+
+@pytest.mark.parametrize("record", [b"<GazeData><GazeX>1</GazeX></GazeData>", b"<GazeData><GazeX>1"])
+def test_invalid_records_decode_to_none(record, capsys):
+    decoder = FastGazeDecoder()
+    assert decoder.decode(record) is None
+    assert decoder.fallback_count == 1
+
+
+def test_str_and_memoryview_input():
+    record = load_corpus(count=1)[0]
+    decoder = FastGazeDecoder(HEAD_POSE_FIELDS)
+    assert decoder.decode(record.decode('utf-8')) == decoder.decode(memoryview(record)) == decoder.decode(record)
+
+
+def test_make_gaze_decoder():
+    assert isinstance(make_gaze_decoder("fast", TIMESTAMP_FIELDS), FastGazeDecoder)
+    assert isinstance(make_gaze_decoder("etree"), ElementTreeGazeDecoder)
+    with pytest.raises(ValueError):
+        make_gaze_decoder("sax")
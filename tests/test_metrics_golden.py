@@ -0,0 +1,73 @@
+import glob
+import os
+import random
+
+import numpy as np
+import pytest
+
+from aoi_index import AOI_TYPE_CODES
+from event_log import EventLog
+from metrics_engine import StreamingSessionMetrics, compute_session_log_metrics, compute_session_metrics
+from session_library import load_report_file
+from session_log import SessionLog
+from tests.reference_metrics import (assert_metrics_match, reference_metrics_with_gaps, reference_session_metrics,
+                                     synthetic_log, with_gap_markers)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+# Saved sessions (.ffs or JSON reports) dropped into tests/data are checked too
+RECORDED_SESSIONS = sorted(glob.glob(os.path.join(DATA_DIR, "*.ffs")) + glob.glob(os.path.join(DATA_DIR, "*.json")))
+GOLDEN_SEEDS = range(60)
+
+
+def golden_log(seed):
+    rnd = random.Random(seed)
+    return synthetic_log(rnd.choice((2, 3, 50, 2000, 20_000)), seed, switch_probability=rnd.choice((0.01, 0.2, 0.6)))
+
+
+def engine_metrics(log):
+    return compute_session_log_metrics(SessionLog.from_records(log))
+
+
+@pytest.mark.parametrize("seed", GOLDEN_SEEDS)
+def test_synthetic_log_matches_reference(seed):
+    log = golden_log(seed)
+    assert_metrics_match(reference_session_metrics(log), engine_metrics(log))
+
+
+@pytest.mark.parametrize("seed", GOLDEN_SEEDS)
+def test_gap_markers_match_reference(seed):
+    log = with_gap_markers(golden_log(seed), seed, random.Random(seed).choice((0.001, 0.01, 0.3)))
+    assert_metrics_match(reference_metrics_with_gaps(log), engine_metrics(log))
+
+
+def test_recorded_sessions_present():
+    assert RECORDED_SESSIONS, f"no recorded sessions in {DATA_DIR}"
+
+
+@pytest.mark.parametrize("path", RECORDED_SESSIONS, ids=os.path.basename)
+def test_recorded_session_matches_reference(path):
+    report_data = load_report_file(path)
+    expected = reference_metrics_with_gaps(report_data["raw_log"].to_records())
+    assert_metrics_match(expected, compute_session_log_metrics(report_data["raw_log"]))
+    assert_metrics_match(expected, report_data)  # The summary saved with the session
+
+
+@pytest.mark.parametrize("seed", range(500))
+def test_streaming_and_event_metrics_match_full_pass(seed):
+    # Short logs with repeated timestamps, long distractions and gap markers (never two in a row)
+    rnd = random.Random(seed)
+    timestamp, timestamps, codes = rnd.choice((0.0, 0.5)), [], []
+    gap_code = AOI_TYPE_CODES["Gap"]
+    for _ in range(rnd.randint(2, 40)):
+        codes.append(rnd.choice((0, 1, 1, 2, 2, gap_code) if not codes or codes[-1] != gap_code else (0, 1, 2)))
+        timestamps.append(timestamp)
+        timestamp += rnd.choice((0.0, 0.25, 0.5, 1.0, 2.0, 3.0))
+    full = compute_session_metrics(timestamps, codes)
+
+    streaming = StreamingSessionMetrics()
+    streaming.update_batch(timestamps, codes)
+    assert_metrics_match(full, streaming.current_metrics())
+
+    event_log = EventLog.from_samples(np.array(timestamps), np.full(len(codes), np.nan), np.full(len(codes), np.nan),
+                                      np.array(codes, dtype=np.uint8))
+    assert_metrics_match(full, compute_session_log_metrics(event_log.to_session_log()))
@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+import pytest
+
+from event_log import EVENT_COLUMN_NAMES, EventLog
+from session_file import (SessionFileReader, SessionFileWriter, finalize_session_file, read_session_file,
+                          read_session_summary, write_session_file)
+from session_log import SessionLog
+from tests.reference_metrics import synthetic_log, with_gap_markers
+
+
+def sample_log(sample_count=1000, seed=0):
+    log = SessionLog.from_records(with_gap_markers(synthetic_log(sample_count, seed, switch_probability=0.1), seed))
+    rng = np.random.default_rng(seed)
+    raw_x, raw_y = rng.uniform(0, 1920, len(log)).astype(np.float32), rng.uniform(0, 1080, len(log)).astype(np.float32)
+    gaps = np.isnan(np.asarray(log.raw_x))
+    raw_x[gaps], raw_y[gaps] = np.nan, np.nan
+    return SessionLog.from_columns(log.timestamps, raw_x, raw_y, log.aoi_codes)
+
+
+def assert_logs_equal(actual, expected):
+    assert len(actual) == len(expected)
+    assert actual.category_table == expected.category_table
+    np.testing.assert_array_equal(actual.timestamps, expected.timestamps)
+    np.testing.assert_array_equal(actual.raw_x, expected.raw_x)  # NaN positions must match too
+    np.testing.assert_array_equal(actual.raw_y, expected.raw_y)
+    np.testing.assert_array_equal(actual.aoi_codes, expected.aoi_codes)
+
+
+def assert_events_equal(actual, expected):
+    assert len(actual) == len(expected)
+    for name in EVENT_COLUMN_NAMES:
+        np.testing.assert_array_equal(actual.column(name), expected.column(name))
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("block_size", [1, 64, 65536])
+def test_write_read_round_trip(tmp_path, compress, block_size):
+    log = sample_log()
+    events = EventLog.from_samples(np.asarray(log.timestamps), np.asarray(log.raw_x), np.asarray(log.raw_y),
+                                   np.asarray(log.aoi_codes))
+    path = str(tmp_path / "session.ffs")
+    write_session_file(path, {"raw_log": log, "event_log": events, "session_duration": 12.5, "aoi_list": []},
+                       compress=compress, block_size=block_size)
+
+    report_data = read_session_file(path)
+    assert_logs_equal(report_data["raw_log"], log)
+    assert_events_equal(report_data["event_log"], events)
+    assert report_data["session_duration"] == 12.5 and report_data["aoi_list"] == []
+    assert read_session_summary(path)["session_duration"] == 12.5
+
+
+def test_events_only_file_rebuilds_metric_samples(tmp_path):
+    log = sample_log()
+    events = EventLog.from_samples(np.asarray(log.timestamps), np.asarray(log.raw_x), np.asarray(log.raw_y),
+                                   np.asarray(log.aoi_codes))
+    path = str(tmp_path / "events.ffs")
+    write_session_file(path, {"raw_log": log, "event_log": events, "raw_samples_kept": False})
+    reader = SessionFileReader(path)
+    assert reader.sample_count == 0 and reader.recorded_sample_count == len(log)
+    assert_logs_equal(reader.load_session_log(), events.to_session_log())
+
+
+def test_streaming_writer_flushes_readable_blocks(tmp_path):
+    log = sample_log(300)
+    path = str(tmp_path / "streaming.ffs")
+    writer = SessionFileWriter(path, metadata={"session_start_time": 1.0}, block_size=128)
+    for start in range(0, len(log), 50):
+        block = log[start:start + 50]
+        writer.append_samples(block.timestamps, block.raw_x, block.raw_y, block.aoi_codes)
+    writer.flush()
+    reader = SessionFileReader(path)
+    assert not reader.is_finished
+    assert reader.sample_count == len(log)  # Full blocks plus the flushed short one
+    assert reader.header["metadata"] == {"session_start_time": 1.0}
+    writer.close({"session_duration": 1.0})
+    assert SessionFileReader(path).is_finished
+
+
+def test_finalize_drops_a_torn_block_and_appends_the_summary(tmp_path):
+    log = sample_log(500)
+    path = str(tmp_path / "crashed.ffs")
+    writer = SessionFileWriter(path, block_size=100)
+    writer.append_samples(log.timestamps, log.raw_x, log.raw_y, log.aoi_codes)
+    writer._file.flush()
+    writer._file.close()  # Crash: no META block
+    with open(path, 'ab') as f:
+        f.write(b"SMPL\x10\x00\x00\x00\x00\x00\x00\x00\xff\xff\x00\x00" + b"\x00" * 40)  # Torn block header and payload
+
+    reader = SessionFileReader(path)
+    assert not reader.is_finished and reader.sample_count == len(log)
+    reader.close()
+    finalize_session_file(path, {"session_duration": 3.0, "recovered": True})
+    report_data = read_session_file(path)
+    assert report_data["recovered"] is True
+    assert_logs_equal(report_data["raw_log"], log)
+
+    size = os.path.getsize(path)
+    finalize_session_file(path, {"session_duration": 4.0})  # Finished files are left alone
+    assert os.path.getsize(path) == size and read_session_summary(path)["session_duration"] == 3.0
+
+
+def test_empty_and_foreign_files(tmp_path):
+    path = str(tmp_path / "empty.ffs")
+    write_session_file(path, {"raw_log": SessionLog()})
+    assert len(read_session_file(path)["raw_log"]) == 0
+
+    foreign = tmp_path / "foreign.ffs"
+    foreign.write_bytes(b"not a session file")
+    with pytest.raises(ValueError):
+        SessionFileReader(str(foreign))
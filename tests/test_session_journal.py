@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+from event_log import EventLog
+from metrics_engine import compute_session_log_metrics
+from session_file import SessionFileReader, read_session_file
+from session_journal import SessionJournal, recover_unfinished_sessions
+from session_log import SessionLog
+from tests.reference_metrics import assert_metrics_match, synthetic_log
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def journal_samples(journal, log, batch_size=37):
+    for start in range(0, len(log), batch_size):
+        block = log[start:start + batch_size]
+        journal.append_samples(block.timestamps, block.raw_x, block.raw_y, block.aoi_codes)
+
+
+def test_closed_journal_is_a_finished_session_file(tmp_path):
+    log = SessionLog.from_records(synthetic_log(2000, 1, switch_probability=0.05))
+    events = EventLog.from_samples(np.asarray(log.timestamps), np.asarray(log.raw_x), np.asarray(log.raw_y),
+                                   np.asarray(log.aoi_codes))
+    path = str(tmp_path / "session.ffs")
+    journal = SessionJournal(path, metadata={"aoi_list": []}, flush_samples=256, fsync_policy="flush")
+    journal_samples(journal, log)
+    journal.append_events(events)
+    journal.close({"session_duration": 1.5})
+
+    assert journal.error is None and journal.flush_count > 0
+    report_data = read_session_file(path)
+    assert report_data["session_duration"] == 1.5
+    np.testing.assert_array_equal(report_data["raw_log"].timestamps, log.timestamps)
+    np.testing.assert_array_equal(report_data["raw_log"].aoi_codes, log.aoi_codes)
+    assert len(report_data["event_log"]) == len(events)
+
+
+def test_unknown_fsync_policy(tmp_path):
+    with pytest.raises(ValueError):
+        SessionJournal(str(tmp_path / "session.ffs"), fsync_policy="always")
+
+
+def test_recover_a_journal_from_a_killed_process(tmp_path):
+    # The process dies (no close, no atexit) once the journal flushed its first 1000 samples
+    script = textwrap.dedent(f"""
+        import os, time
+        from session_journal import SessionJournal
+        from session_log import SessionLog
+        from tests.reference_metrics import synthetic_log
+        log = SessionLog.from_records(synthetic_log(1000, 2, switch_probability=0.05))
+        journal = SessionJournal({str(tmp_path / "crashed.ffs")!r}, flush_samples=500, flush_interval_s=60)
+        journal.append_samples(log.timestamps, log.raw_x, log.raw_y, log.aoi_codes)
+        journal.append_samples([99.0], [0.0], [0.0], [0])  # Still buffered when the process dies
+        while journal.flush_count < 1:
+            time.sleep(0.01)
+        os._exit(1)
+    """)
+    subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, check=False, timeout=60)
+    finished = str(tmp_path / "finished.ffs")
+    SessionJournal(finished).close({"session_duration": 0.0})
+    (tmp_path / "broken.ffs").write_bytes(b"garbage")
+
+    reader = SessionFileReader(str(tmp_path / "crashed.ffs"))
+    assert not reader.is_finished
+    flushed = reader.load_session_log()
+    reader.close()
+    assert len(flushed) == 1000
+
+    recovered, failed = recover_unfinished_sessions(str(tmp_path))
+    assert recovered == [str(tmp_path / "crashed.ffs")]
+    assert [path for path, _ in failed] == [str(tmp_path / "broken.ffs")]
+    report_data = read_session_file(recovered[0])
+    assert report_data["recovered"] is True
+    assert_metrics_match(compute_session_log_metrics(flushed), report_data)
+    assert "recovered" not in read_session_file(finished)
+
+    recovered, failed = recover_unfinished_sessions(str(tmp_path))  # Recovered files are finished now
+    assert recovered == [] and len(failed) == 1
@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+
+from metrics_engine import compute_session_log_metrics
+from session_file import write_session_file
+from session_library import SessionLibrary, aoi_layout_hash
+from session_log import SessionLog, report_to_json_dict
+from tests.reference_metrics import synthetic_log
+
+DAY = 86400.0
+START = 1_700_000_000.0
+LAYOUT_A = [{'rect_screen_coords': (0, 0, 960, 1080), 'type': "Productive"}]
+LAYOUT_B = [{'rect_screen_coords': (0, 0, 960, 1080), 'type': "Distraction"}]
+
+
+def make_report(seed, started_at, aoi_list):
+    log = SessionLog.from_records(synthetic_log(300, seed, switch_probability=0.05))
+    report_data = compute_session_log_metrics(log)
+    report_data.update(raw_log=log, session_start_time=started_at, aoi_list=aoi_list)
+    return report_data
+
+
+@pytest.fixture
+def session_dir(tmp_path):
+    # Six sessions a day apart, alternating .ffs and JSON files and two AOI layouts
+    directory = tmp_path / "sessions"
+    directory.mkdir()
+    for i in range(6):
+        report_data = make_report(i, START + i * DAY, LAYOUT_A if i % 2 == 0 else LAYOUT_B)
+        if i % 2 == 0:
+            write_session_file(str(directory / f"session_{i}.ffs"), report_data)
+        else:
+            with open(directory / f"session_{i}.json", 'w') as f:
+                json.dump(report_to_json_dict(report_data), f)
+    return directory
+
+
+@pytest.fixture
+def library(tmp_path):
+    with SessionLibrary(str(tmp_path / "library.sqlite3")) as library:
+        yield library
+
+
+def test_index_directory_is_incremental(library, session_dir):
+    assert library.index_directory(str(session_dir)) == (6, 0)
+    assert library.index_directory(str(session_dir)) == (0, 0)  # Nothing changed on disk
+
+    write_session_file(str(session_dir / "session_0.ffs"), make_report(10, START, LAYOUT_A))
+    os.utime(session_dir / "session_0.ffs", (START, START))
+    os.remove(session_dir / "session_5.json")
+    (session_dir / "notes.txt").write_text("not a session")
+    assert library.index_directory(str(session_dir)) == (1, 1)
+    assert library.count() == 5
+
+
+def test_catalog_rows_match_the_reports(library, session_dir):
+    library.index_directory(str(session_dir))
+    for row in library.query(limit=100):
+        path = row["path"]
+        report_data = make_report(int(os.path.splitext(path)[0].rsplit("_", 1)[1]), row["started_at"],
+                                  LAYOUT_A if path.endswith(".ffs") else LAYOUT_B)
+        assert row["sample_count"] == 300
+        assert row["session_duration"] == pytest.approx(report_data["session_duration"])
+        assert row["productive_pct"] == pytest.approx(report_data["dwell_percentages"]["Productive"])
+        assert row["focus_bout_count"] == report_data["focus_bouts"]["count"]
+        assert row["p_to_d"] == report_data["transitions"]["P_to_D"]
+        assert row["aoi_layout_hash"] == aoi_layout_hash(report_data["aoi_list"])
+
+
+def test_query_filters_sorting_and_pages(library, session_dir):
+    library.index_directory(str(session_dir))
+    rows = library.query(descending=False)
+    assert [row["started_at"] for row in rows] == [START + i * DAY for i in range(6)]
+
+    assert [row["started_at"] for row in library.query(since=START + DAY, until=START + 3 * DAY, descending=False)] == \
+        [START + DAY, START + 2 * DAY]
+    layout_a = library.query(aoi_layout_hash=aoi_layout_hash(LAYOUT_A))
+    assert len(layout_a) == library.count(aoi_layout_hash=aoi_layout_hash(LAYOUT_A)) == 3
+    assert all(row["path"].endswith(".ffs") for row in layout_a)
+
+    productive = sorted(row["productive_pct"] for row in rows)
+    threshold = productive[2]
+    assert library.count(min_productive=threshold) == sum(value >= threshold for value in productive)
+    by_productive = library.query(order_by="productive_pct", descending=True)
+    assert [row["productive_pct"] for row in by_productive] == sorted(productive, reverse=True)
+
+    pages = [library.query(limit=4, offset=0), library.query(limit=4, offset=4)]
+    assert [len(page) for page in pages] == [4, 2]
+    assert [row["path"] for row in pages[0] + pages[1]] == [row["path"] for row in library.query()]
+
+    with pytest.raises(ValueError):
+        library.query(order_by="path; DROP TABLE sessions")
+
+
+def test_remove_and_add_session(library):
+    summary = {"session_duration": 60.0, "dwell_percentages": {"Productive": 50.0}}
+    library.add_session("/sessions/a.ffs", summary, START, sample_count=10, aoi_list=LAYOUT_A)
+    library.add_session("/sessions/a.ffs", dict(summary, recovered=True), START + 5, sample_count=20)
+    [row] = library.query()
+    assert (row["started_at"], row["sample_count"], row["recovered"], row["aoi_layout_hash"]) == (START + 5, 20, 1, None)
+    library.remove("/sessions/a.ffs")
+    assert library.count() == 0
+
+
+def test_aoi_layout_hash_ignores_order():
+    layout = LAYOUT_A + [{'rect_screen_coords': (960, 0, 1920, 540), 'type': "Distraction"}]
+    assert aoi_layout_hash(layout) == aoi_layout_hash(list(reversed(layout)))
+    assert aoi_layout_hash(layout) != aoi_layout_hash(LAYOUT_A)
+    assert aoi_layout_hash([]) is None
@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+import pytest
+
+from tracker_clock import HostClock, TrackerClock
+
+HOST_EPOCH = 1_700_000_000.0
+
+
+def simulate(minutes, drift_ppm, seed, tracker_start_s=5000.0, rate_hz=60.0):
+    # Tracker timestamps (ms) and receive times of samples that arrive after a random transport delay
+    rng = np.random.default_rng(seed)
+    true_times = np.arange(0.0, minutes * 60.0, 1.0 / rate_hz)
+    tracker_ms = (tracker_start_s + true_times * (1.0 + drift_ppm * 1e-6)) * 1e3
+    receive_times = np.maximum.accumulate(true_times + 1e-3 + rng.exponential(4e-3, len(true_times)))
+    return true_times + HOST_EPOCH, tracker_ms, receive_times + HOST_EPOCH
+
+
+def map_all(clock, tracker_ms, receive_times):
+    return np.array([clock.to_host(ts, rt) for ts, rt in zip(tracker_ms.tolist(), receive_times.tolist())])
+
+
+@pytest.mark.parametrize("drift_ppm", [-80.0, 0.0, 50.0])
+@pytest.mark.parametrize("seed", range(3))
+def test_drift_estimate_and_mapped_times(drift_ppm, seed):
+    true_times, tracker_ms, receive_times = simulate(10, drift_ppm, seed)
+    clock = TrackerClock()
+    mapped = map_all(clock, tracker_ms, receive_times)
+    assert clock.drift_ppm == pytest.approx(drift_ppm, abs=2.0)
+    assert np.all(mapped <= receive_times) and np.all(np.diff(mapped) >= 0)
+    settled = slice(len(mapped) // 2, None)  # Past the first few fit windows
+    assert np.max(np.abs(mapped[settled] - true_times[settled])) < 5e-3
+    assert clock.restarts == 0
+
+
+def test_backward_and_large_jumps_restart_the_estimate():
+    _, tracker_ms, receive_times = simulate(1, 50.0, 0)
+    clock = TrackerClock()
+    mapped = map_all(clock, tracker_ms, receive_times)
+    after_restart = clock.to_host(0.0, receive_times[-1] + 0.02)  # The tracker clock restarted at zero
+    assert clock.restarts == 1 and after_restart >= mapped[-1]
+    clock.to_host(2 * clock.max_jump_s / clock.scale, receive_times[-1] + 0.04)
+    assert clock.restarts == 2 and clock.drift == 0.0
+
+    clock.reset()
+    assert clock.offset is None and clock.restarts == 2
+    assert clock.to_host(1000.0, HOST_EPOCH + 5.0) == pytest.approx(HOST_EPOCH + 5.0)
+
+
+def test_host_clock_follows_wall_time():
+    clock = HostClock()
+    before, now, after = time.time(), clock.now(), time.time()
+    assert before - 0.01 <= now <= after + 0.01
+    assert clock.now() >= now
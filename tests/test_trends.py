@@ -0,0 +1,117 @@
+import random
+import time
+from collections import defaultdict
+
+import pytest
+
+from session_library import SessionLibrary, session_day
+from trends import TREND_METRICS, rebuild_all_rollups, trend_series
+
+START = 1_700_000_000.0
+
+
+def random_summary(rnd):
+    duration = rnd.uniform(60, 7200)
+    productive, distraction = duration * rnd.uniform(0, 0.7), duration * rnd.uniform(0, 0.2)
+    bouts = rnd.randint(0, 30)
+    latencies = rnd.randint(0, 10)
+    return {"session_duration": duration,
+            "dwell_times": {"Productive": productive, "Distraction": distraction,
+                            "Outside": duration - productive - distraction},
+            "dwell_percentages": {"Productive": 100 * productive / duration},
+            "focus_bouts": {"count": bouts, "avg_duration": rnd.uniform(5, 300) if bouts else 0.0,
+                            "max_duration": rnd.uniform(300, 900) if bouts else 0.0},
+            "re_engagement_latency": {"count": latencies, "avg_latency": rnd.uniform(1, 20) if latencies else 0.0},
+            "transitions": {"P_to_D": rnd.randint(0, 40), "D_to_P": rnd.randint(0, 40)}}
+
+
+def brute_force_rollups(sessions, period_of):
+    # Sums every session's summary per period straight from the summaries
+    periods = defaultdict(lambda: defaultdict(float))
+    for started_at, summary in sessions.values():
+        row = periods[period_of(session_day(started_at))]
+        row["session_count"] += 1
+        row["total_s"] += summary["session_duration"]
+        row["productive_s"] += summary["dwell_times"]["Productive"]
+        row["distraction_s"] += summary["dwell_times"]["Distraction"]
+        row["outside_s"] += summary["dwell_times"]["Outside"]
+        row["bout_count"] += summary["focus_bouts"]["count"]
+        row["bout_total_s"] += summary["focus_bouts"]["count"] * summary["focus_bouts"]["avg_duration"]
+        row["bout_max_s"] = max(row["bout_max_s"], summary["focus_bouts"]["max_duration"])
+        row["latency_count"] += summary["re_engagement_latency"]["count"]
+        row["latency_total_s"] += summary["re_engagement_latency"]["count"] * summary["re_engagement_latency"]["avg_latency"]
+        row["p_to_d"] += summary["transitions"]["P_to_D"]
+        row["d_to_p"] += summary["transitions"]["D_to_P"]
+    return [dict(row, period=period) for period, row in sorted(periods.items())]
+
+
+def week_of(day):
+    date = time.strptime(day, "%Y-%m-%d")
+    monday = time.mktime((date.tm_year, date.tm_mon, date.tm_mday - date.tm_wday, 12, 0, 0, 0, 0, -1))
+    return time.strftime("%Y-%m-%d", time.localtime(monday))
+
+
+PERIODS = {"day": lambda day: day, "week": week_of, "month": lambda day: day[:7]}
+
+
+def assert_rollups_match(actual, expected):
+    assert [row["period"] for row in actual] == [row["period"] for row in expected]
+    for actual_row, expected_row in zip(actual, expected):
+        for key, value in expected_row.items():
+            if key != "period":
+                assert actual_row[key] == pytest.approx(value), (actual_row["period"], key)
+
+
+@pytest.fixture
+def library():
+    with SessionLibrary(":memory:") as library:
+        yield library
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rollups_match_brute_force_through_adds_updates_and_removals(library, seed):
+    rnd = random.Random(seed)
+    sessions = {}  # path: (started_at, summary)
+    for _ in range(200):
+        path = f"/sessions/{rnd.randrange(120)}.ffs"
+        if path in sessions and rnd.random() < 0.2:
+            library.remove(path)
+            del sessions[path]
+        else:
+            # Several sessions per day over about three months; a re-added path may move to another day
+            sessions[path] = (START + rnd.uniform(0, 90) * 86400, random_summary(rnd))
+            library.add_session(path, sessions[path][1], sessions[path][0])
+    for period, period_of in PERIODS.items():
+        assert_rollups_match(library.trend_rollups(period), brute_force_rollups(sessions, period_of))
+
+
+def test_batched_index_and_rebuild(library):
+    rnd = random.Random(7)
+    sessions = {f"/sessions/{i}.ffs": (START + i * 3600 * 7, random_summary(rnd)) for i in range(400)}
+    for path, (started_at, summary) in sessions.items():
+        library.add_session(path, summary, started_at, _commit=False)
+    library._commit()
+    expected = brute_force_rollups(sessions, PERIODS["day"])
+    assert_rollups_match(library.trend_rollups("day"), expected)
+
+    rebuild_all_rollups(library.connection)
+    assert_rollups_match(library.trend_rollups("day"), expected)
+    since, until = expected[3]["period"], expected[10]["period"]
+    assert_rollups_match(library.trend_rollups("day", since, until), expected[3:11])
+
+
+def test_trend_series(library):
+    rnd = random.Random(3)
+    sessions = {f"/sessions/{i}.ffs": (START + i * 86400, random_summary(rnd)) for i in range(3)}
+    for path, (started_at, summary) in sessions.items():
+        library.add_session(path, summary, started_at)
+    rollups = library.trend_rollups("day")
+    periods, values = trend_series(rollups, "productive_pct")
+    assert periods == [session_day(started_at) for started_at, _ in sessions.values()]
+    assert values == pytest.approx([summary["dwell_percentages"]["Productive"] for _, summary in sessions.values()])
+    for metric in TREND_METRICS:
+        assert len(trend_series(rollups, metric)[1]) == 3
+    with pytest.raises(ValueError):
+        trend_series(rollups, "happiness")
+    with pytest.raises(ValueError):
+        library.trend_rollups("fortnight")
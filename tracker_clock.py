@@ -0,0 +1,92 @@
+"""Sample timestamps: the tracker's own clock mapped onto the host clock."""
+import time
+
+TRACKER_TIMESTAMP_SCALE = 1e-3  # GazeFlow Timestamp is in milliseconds
+DRIFT_WINDOW_S = 10.0
+DRIFT_WINDOWS = 30  # The drift fit covers the last 5 minutes
+MAX_TRACKER_JUMP_S = 3600.0  # A larger step forward (or any step back) restarts the estimate
+
+
+class HostClock:
+    # Wall-clock seconds (the time.time() epoch) read from time.monotonic_ns
+    def __init__(self):
+        self._offset_ns = time.time_ns() - time.monotonic_ns()
+
+    def now(self):
+        return (time.monotonic_ns() + self._offset_ns) / 1e9
+
+
+class TrackerClock:
+    # receive_time - tracker_time is offset + transport delay, and the delay is never negative, so
+    # the minimum per window_s of tracker time is the offset; a least-squares line through the last
+    # `windows` minima gives offset and drift. Mapped times never pass the receive time or go back.
+    def __init__(self, scale=TRACKER_TIMESTAMP_SCALE, window_s=DRIFT_WINDOW_S, windows=DRIFT_WINDOWS,
+                 max_jump_s=MAX_TRACKER_JUMP_S):
+        self.scale = scale
+        self.window_s = window_s
+        self.windows = windows
+        self.max_jump_s = max_jump_s
+        self.restarts = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets the estimate (call when the tracker clock may have restarted)."""
+        self._origin = None  # Tracker time the fit is relative to
+        self._last_tracker_time = None
+        self._last_host_time = float("-inf")
+        self._window_end = None
+        self._window_min = None  # (offset, tracker time) of the lowest difference in the current window
+        self._minima = []  # One (tracker time, offset) per completed window
+        self.offset = None  # Host minus tracker time at _origin
+        self.drift = 0.0  # Offset change per tracker second; negative when the tracker clock runs fast
+
+    @property
+    def drift_ppm(self):
+        """How fast the tracker clock runs against the host clock, in ppm (negative: slow)."""
+        return -self.drift / (1.0 + self.drift) * 1e6
+
+    def to_host(self, tracker_timestamp, receive_time):
+        """Host time of a sample with the given tracker timestamp, received at receive_time (HostClock)."""
+        tracker_time = tracker_timestamp * self.scale
+        last = self._last_tracker_time
+        if last is not None and not 0.0 <= tracker_time - last <= self.max_jump_s:
+            self.reset()
+            self.restarts += 1
+        self._last_tracker_time = tracker_time
+
+        difference = receive_time - tracker_time
+        if self._origin is None:
+            self._origin, self._window_end = tracker_time, tracker_time + self.window_s
+            self.offset = difference
+        if self._window_min is None or difference < self._window_min[0]:
+            self._window_min = (difference, tracker_time)
+        if tracker_time >= self._window_end:
+            self._close_window()
+        elif not self._minima and difference < self.offset:
+            self.offset = difference  # No fit yet: the lowest difference so far
+
+        host_time = tracker_time + self.offset + self.drift * (tracker_time - self._origin)
+        # A sample cannot arrive before it was taken, and timestamps never go backwards
+        host_time = min(host_time, receive_time)
+        if host_time < self._last_host_time:
+            host_time = self._last_host_time
+        self._last_host_time = host_time
+        return host_time
+
+    def _close_window(self):
+        offset, tracker_time = self._window_min
+        self._minima.append((tracker_time - self._origin, offset))
+        del self._minima[:-self.windows]
+        self._window_min = None
+        self._window_end = tracker_time + self.window_s
+        if len(self._minima) < 2:
+            self.offset = min(self.offset, offset)
+            return
+        # Least-squares line through the window minima: offset(t) = intercept + drift * t
+        count = len(self._minima)
+        mean_t = sum(t for t, _ in self._minima) / count
+        mean_offset = sum(o for _, o in self._minima) / count
+        variance = sum((t - mean_t) ** 2 for t, _ in self._minima)
+        if variance > 0:
+            self.drift = sum((t - mean_t) * (o - mean_offset) for t, o in self._minima) / variance
+        self.offset = mean_offset - self.drift * mean_t
@@ -0,0 +1,98 @@
+"""Historical trends over saved sessions, computed from the library's daily rollups only."""
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT PRIMARY KEY,
+    session_count INTEGER NOT NULL,
+    total_s REAL NOT NULL,
+    productive_s REAL NOT NULL,
+    distraction_s REAL NOT NULL,
+    outside_s REAL NOT NULL,
+    bout_count INTEGER NOT NULL,
+    bout_total_s REAL NOT NULL,
+    bout_max_s REAL NOT NULL,
+    latency_count INTEGER NOT NULL,
+    latency_total_s REAL NOT NULL,
+    p_to_d INTEGER NOT NULL,
+    d_to_p INTEGER NOT NULL
+);
+"""
+
+ROLLUP_BATCH_DAYS = 500  # Days per statement (stays below SQLite's bound-parameter limit)
+
+# SQL expression grouping daily rows into each trend period
+TREND_PERIODS = {
+    "day": "day",
+    "week": "date(day, 'weekday 0', '-6 days')",  # Monday of the week
+    "month": "substr(day, 1, 7)",
+}
+
+# name: (label, function of the summed rollup columns of one period)
+TREND_METRICS = {
+    "productive_pct": ("Productive (%)", lambda r: 100 * r["productive_s"] / r["total_s"] if r["total_s"] else 0.0),
+    "focus_minutes": ("Productive Time (min)", lambda r: r["productive_s"] / 60),
+    "avg_bout_duration": ("Avg. Focus Bout (s)", lambda r: r["bout_total_s"] / r["bout_count"] if r["bout_count"] else 0.0),
+    "max_bout_duration": ("Longest Focus Bout (s)", lambda r: r["bout_max_s"]),
+    "bouts_per_hour": ("Focus Bouts per Hour", lambda r: 3600 * r["bout_count"] / r["total_s"] if r["total_s"] else 0.0),
+    "avg_latency": ("Avg. Re-engagement Latency (s)",
+                    lambda r: r["latency_total_s"] / r["latency_count"] if r["latency_count"] else 0.0),
+    "distractions_per_hour": ("Productive -> Distraction per Hour",
+                              lambda r: 3600 * r["p_to_d"] / r["total_s"] if r["total_s"] else 0.0),
+    "session_count": ("Sessions", lambda r: r["session_count"]),
+}
+
+
+def refresh_daily_rollups(connection, days):
+    """Recomputes the rollup rows of the given days from the session catalog (after rows changed)."""
+    days = sorted(day for day in days if day is not None)
+    for start in range(0, len(days), ROLLUP_BATCH_DAYS):
+        _refresh_rollup_batch(connection, days[start:start + ROLLUP_BATCH_DAYS])
+
+
+def _refresh_rollup_batch(connection, days):
+    placeholders = ", ".join("?" * len(days))
+    connection.execute(f"DELETE FROM daily_rollups WHERE day IN ({placeholders})", days)
+    connection.execute(
+        f"""INSERT INTO daily_rollups
+            SELECT day, COUNT(*), TOTAL(session_duration), TOTAL(productive_s), TOTAL(distraction_s), TOTAL(outside_s),
+                   TOTAL(focus_bout_count), TOTAL(avg_bout_duration * focus_bout_count), IFNULL(MAX(max_bout_duration), 0),
+                   TOTAL(reengagement_count), TOTAL(avg_latency * reengagement_count), TOTAL(p_to_d), TOTAL(d_to_p)
+            FROM sessions WHERE day IN ({placeholders}) GROUP BY day""", days)
+
+
+def load_trend_rollups(connection, period="day", since_day=None, until_day=None):
+    """Returns one dict of summed rollup columns per period (oldest first), keyed by 'period'.
+
+    since_day/until_day are inclusive YYYY-MM-DD bounds on the underlying days.
+    """
+    if period not in TREND_PERIODS:
+        raise ValueError(f"Unknown trend period: {period}")
+    clauses, params = [], []
+    if since_day is not None:
+        clauses.append("day >= ?"); params.append(since_day)
+    if until_day is not None:
+        clauses.append("day <= ?"); params.append(until_day)
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    cursor = connection.execute(
+        f"""SELECT {TREND_PERIODS[period]} AS period, SUM(session_count) AS session_count, SUM(total_s) AS total_s,
+                   SUM(productive_s) AS productive_s, SUM(distraction_s) AS distraction_s, SUM(outside_s) AS outside_s,
+                   SUM(bout_count) AS bout_count, SUM(bout_total_s) AS bout_total_s, MAX(bout_max_s) AS bout_max_s,
+                   SUM(latency_count) AS latency_count, SUM(latency_total_s) AS latency_total_s,
+                   SUM(p_to_d) AS p_to_d, SUM(d_to_p) AS d_to_p
+            FROM daily_rollups{where} GROUP BY period ORDER BY period""", params)
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+
+def trend_series(rollups, metric):
+    """(period labels, metric values) for TREND_METRICS[metric] over load_trend_rollups() rows."""
+    if metric not in TREND_METRICS:
+        raise ValueError(f"Unknown trend metric: {metric}")
+    value_of = TREND_METRICS[metric][1]
+    return [row["period"] for row in rollups], [value_of(row) for row in rollups]
+
+
+def rebuild_all_rollups(connection):
+    """Recomputes every rollup row from the catalog (e.g. after editing the database by hand)."""
+    days = [row[0] for row in connection.execute("SELECT DISTINCT day FROM sessions")]
+    connection.execute("DELETE FROM daily_rollups")
+    refresh_daily_rollups(connection, days)